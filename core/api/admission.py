@@ -0,0 +1,150 @@
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import (
+    dataclass,
+    field,
+)
+from functools import cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpRequest
+from ninja.errors import Throttled
+from ninja.throttling import BaseThrottle
+
+from core.api.auth import CustomerTokenAuth
+from core.apps.customers.entities import CustomerEntity
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Token bucket per client kept in a Django cache shared by all
+    workers.
+
+    Requests with a valid customer token get the bucket of that customer,
+    everyone else (including invalid tokens) is limited by IP. The bucket
+    is stored as GCRA "theoretical arrival time" in integer microseconds
+    and advanced with ``incr``, so concurrent workers reserve distinct
+    slots instead of overwriting each other; a denied request gives its
+    slot back with ``decr``.
+    """
+
+    def __init__(
+        self,
+        ip_rate: float,
+        ip_burst: int,
+        token_rate: float,
+        token_burst: int,
+        cache_alias: str = "default",
+        key_prefix: str = "throttle",
+        key_ttl: int = 3600,
+    ):
+        self.limits = {
+            "ip": (ip_rate, ip_burst),
+            "token": (token_rate, token_burst),
+        }
+        self.cache_alias = cache_alias
+        self.key_prefix = key_prefix
+        self.key_ttl = key_ttl
+        self._local = threading.local()
+
+    def get_client_key(self, request: HttpRequest) -> tuple[str, str]:
+        # Аутентификация операции выполняется до throttling, иначе проверяем токен сами
+        customer = getattr(request, "auth", None)
+        if not isinstance(customer, CustomerEntity):
+            customer = CustomerTokenAuth()(request)
+
+        if customer is not None:
+            return "token", str(customer.id)
+
+        # IP за доверенными прокси: NINJA_NUM_PROXIES
+        return "ip", self.get_ident(request) or "unknown"
+
+    def allow_request(self, request: HttpRequest) -> bool:
+        scope, ident = self.get_client_key(request)
+        rate, burst = self.limits[scope]
+        interval = int(1_000_000 / rate)
+        # Насколько TAT может опережать текущее время, чтобы запрос ещё прошёл
+        tolerance = interval * (burst - 1)
+
+        cache = caches[self.cache_alias]
+        key = f"{self.key_prefix}:{scope}:{ident}"
+        now = time.time_ns() // 1000
+
+        try:
+            arrival = cache.incr(key, interval)
+        except ValueError:
+            cache.add(key, now, timeout=self.key_ttl)
+            arrival = cache.incr(key, interval)
+
+        if arrival - interval < now:
+            # Клиент простаивал: отсчёт с текущего момента
+            arrival = now + interval
+            cache.set(key, arrival, timeout=self.key_ttl)
+
+        if arrival - interval - now > tolerance:
+            cache.decr(key, interval)
+            self._local.wait = (arrival - interval - now - tolerance) / 1_000_000
+            return False
+
+        self._local.wait = None
+        return True
+
+    def wait(self) -> float | None:
+        return getattr(self._local, "wait", None)
+
+
+@dataclass(eq=False)
+class ConcurrencyLimiter:
+    """Caps the number of expensive queries running at once in the
+    process.
+
+    A request that cannot get a slot within ``timeout`` seconds is shed
+    with 429 instead of queueing behind the others.
+    """
+
+    limit: int
+    timeout: float = 0.0
+    retry_after: float = 1.0
+    _slots: threading.BoundedSemaphore = field(init=False)
+
+    def __post_init__(self):
+        self._slots = threading.BoundedSemaphore(self.limit)
+
+    @contextmanager
+    def slot(self, expensive: bool = True):
+        if not expensive:
+            yield
+            return
+
+        if not self._slots.acquire(timeout=self.timeout):
+            raise Throttled(wait=self.retry_after)
+
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+
+def get_api_throttles() -> list[BaseThrottle]:
+    if not settings.API_THROTTLE_ENABLED:
+        return []
+
+    return [
+        TokenBucketThrottle(
+            ip_rate=settings.API_THROTTLE_IP_RATE,
+            ip_burst=settings.API_THROTTLE_IP_BURST,
+            token_rate=settings.API_THROTTLE_TOKEN_RATE,
+            token_burst=settings.API_THROTTLE_TOKEN_BURST,
+            cache_alias=settings.API_THROTTLE_CACHE,
+        ),
+    ]
+
+
+@cache
+def get_expensive_query_limiter() -> ConcurrencyLimiter:
+    return ConcurrencyLimiter(
+        limit=settings.API_MAX_CONCURRENT_EXPENSIVE_QUERIES,
+        timeout=settings.API_EXPENSIVE_QUERY_WAIT,
+        retry_after=settings.API_EXPENSIVE_QUERY_RETRY_AFTER,
+    )
@@ -0,0 +1,20 @@
+from django.http import HttpRequest
+from ninja.security import HttpBearer
+
+from core.apps.customers.entities import CustomerEntity
+from core.apps.customers.exceptions.customer import CustomerTokenInvalidException
+from core.apps.customers.services.customers import BaseCustomerService
+from core.project.containers import get_container
+
+
+class CustomerTokenAuth(HttpBearer):
+    """``Authorization: Bearer <token>``; the customer ends up in
+    ``request.auth``."""
+
+    def authenticate(self, request: HttpRequest, token: str) -> CustomerEntity | None:
+        service: BaseCustomerService = get_container().resolve(BaseCustomerService)
+
+        try:
+            return service.get_by_token(token)
+        except CustomerTokenInvalidException:
+            return None
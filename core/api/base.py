@@ -0,0 +1,147 @@
+from functools import wraps
+from math import ceil
+from time import perf_counter
+from typing import Any
+
+from django.conf import settings
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+)
+from ninja import NinjaAPI
+from ninja.errors import Throttled
+from ninja.operation import Operation
+
+from core.api.schemas import (
+    ApiError,
+    ApiResponse,
+)
+from core.apps.common.budgets import query_budget
+from core.apps.common.exceptions import QueryBudgetExceededException
+from core.apps.common.instrumentation import get_request_stats
+from core.apps.common.metrics import record_query_budget_exceeded
+
+
+def _timed_view(view_func):
+    @wraps(view_func)
+    def wrapper(request: HttpRequest, *args, **kwargs):
+        stats = get_request_stats()
+        if stats is None:
+            return view_func(request, *args, **kwargs)
+
+        try:
+            with stats.measure("handler"):
+                return view_func(request, *args, **kwargs)
+        finally:
+            stats.handler_finished_at = perf_counter()
+
+    wrapper._is_timed = True
+    return wrapper
+
+
+def _budgeted_view(view_func, budget_ms: float):
+    @wraps(view_func)
+    def wrapper(request: HttpRequest, *args, **kwargs):
+        with query_budget(budget_ms):
+            return view_func(request, *args, **kwargs)
+
+    return wrapper
+
+
+def get_query_budget_ms(route: str) -> float:
+    return settings.API_QUERY_BUDGETS_MS.get(route, settings.API_QUERY_BUDGET_MS)
+
+
+def query_budget_error(
+    exception: QueryBudgetExceededException, target: str | None = None
+) -> ApiError:
+    return ApiError(
+        code="query_budget_exceeded",
+        message=exception.message,
+        target=target,
+        details={"budget_ms": exception.budget_ms},
+    )
+
+
+class CatalogNinjaAPI(NinjaAPI):
+    """NinjaAPI that splits each request into handler and serialization
+    time and optionally reports them in ApiResponse.meta.
+
+    Every sync operation runs under its SQL time budget (``API_QUERY_BUDGETS_MS``
+    by url name); a request that exceeds it gets 503 with the error in
+    ``ApiResponse.errors``.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.add_exception_handler(Throttled, self._on_throttled)
+        self.add_exception_handler(
+            QueryBudgetExceededException, self._on_query_budget_exceeded
+        )
+
+    def _on_throttled(self, request: HttpRequest, exc: Throttled) -> HttpResponse:
+        response = self.create_response(request, {"detail": exc.message}, status=429)
+        if exc.wait is not None:
+            response["Retry-After"] = str(max(1, ceil(exc.wait)))
+        return response
+
+    def _on_query_budget_exceeded(
+        self, request: HttpRequest, exc: QueryBudgetExceededException
+    ) -> HttpResponse:
+        match = request.resolver_match
+        record_query_budget_exceeded(
+            match.url_name if match is not None else "unmatched", "rejected"
+        )
+
+        data = ApiResponse(errors=[query_budget_error(exc)]).model_dump()
+        return self.create_response(request, data, status=503)
+
+    @property
+    def urls(self):
+        for _, router in self._routers:
+            for path_view in router.path_operations.values():
+                for operation in path_view.operations:
+                    self._instrument_operation(operation)
+
+        return super().urls
+
+    def _instrument_operation(self, operation: Operation) -> None:
+        # Обёртки синхронные: у async-операции они завершились бы до её выполнения
+        if operation.is_async or getattr(operation.view_func, "_is_timed", False):
+            return
+
+        view_func = operation.view_func
+        budget_ms = get_query_budget_ms(view_func.__name__)
+        if budget_ms:
+            view_func = _budgeted_view(view_func, budget_ms)
+
+        operation.view_func = _timed_view(view_func)
+
+    def create_response(
+        self,
+        request: HttpRequest,
+        data: Any,
+        *,
+        status: int | None = None,
+        temporal_response: HttpResponse | None = None,
+    ) -> HttpResponse:
+        stats = get_request_stats()
+
+        if stats is None or stats.handler_finished_at is None:
+            return super().create_response(
+                request, data, status=status, temporal_response=temporal_response
+            )
+
+        stats.add("serialize", perf_counter() - stats.handler_finished_at)
+
+        if (
+            settings.API_TIMING_META
+            and isinstance(data, dict)
+            and isinstance(data.get("meta"), dict)
+        ):
+            data["meta"]["timing"] = stats.as_meta()
+
+        with stats.measure("render"):
+            return super().create_response(
+                request, data, status=status, temporal_response=temporal_response
+            )
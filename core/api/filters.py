@@ -1,12 +1,17 @@
-from ninja import Schema
+from django.conf import settings
+from ninja import (
+    Field,
+    Schema,
+)
 
 
 class PaginationOut(Schema):
     offset: int
     limit: int
-    total: int
+    # None, если точный подсчёт не уложился в бюджет запроса
+    total: int | None
 
 
 class PaginationIn(Schema):
-    offset: int = 0
-    limit: int = 20
+    offset: int = Field(0, ge=0)
+    limit: int = Field(20, ge=1, le=settings.API_MAX_PAGE_SIZE)
@@ -0,0 +1,142 @@
+import cProfile
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+)
+
+from core.apps.common.instrumentation import (
+    collect_request_stats,
+    RequestStats,
+)
+from core.apps.common.metrics import registry
+from core.apps.common.profiling import (
+    PROFILE_HEADER,
+    should_profile,
+    store_profile,
+)
+from core.apps.common.routers import (
+    is_pinned_to_primary,
+    use_primary,
+)
+
+
+PRIMARY_COOKIE = "db_primary"
+
+
+class RequestStatsMiddleware:
+    """Counts SQL queries and DB time for the request, reports them in the
+    Server-Timing header and records per-route metrics."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        with collect_request_stats() as stats, ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+
+            response = self.get_response(request)
+
+        if settings.API_SERVER_TIMING:
+            response["Server-Timing"] = stats.as_server_timing()
+
+        if settings.METRICS_ENABLED:
+            self._record_metrics(request, response, stats)
+
+        return response
+
+    def _record_metrics(
+        self, request: HttpRequest, response: HttpResponse, stats: RequestStats
+    ) -> None:
+        match = request.resolver_match
+        route = match.url_name if match is not None and match.url_name else "unmatched"
+        labels = {"route": route}
+
+        registry.inc(
+            "api_requests_total",
+            {
+                "route": route,
+                "method": request.method,
+                "status": str(response.status_code),
+            },
+        )
+        registry.observe("api_request_duration_seconds", labels, stats.total)
+        registry.observe("api_request_db_queries", labels, stats.queries)
+        registry.inc("api_request_db_seconds_total", labels, stats.db_time)
+
+
+class PrimaryPinningMiddleware:
+    """Keeps read-your-writes for the replica router.
+
+    The router pins the request to the primary on its first write. After
+    such a request the client gets a short-lived cookie so that its next
+    reads also skip the lagging replica.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        sticky = PRIMARY_COOKIE in request.COOKIES
+
+        with use_primary(pinned=sticky):
+            response = self.get_response(request)
+            wrote = not sticky and is_pinned_to_primary()
+
+        if wrote and settings.DATABASE_PRIMARY_STICKY_SECONDS:
+            response.set_cookie(
+                PRIMARY_COOKIE,
+                "1",
+                max_age=settings.DATABASE_PRIMARY_STICKY_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+
+        return response
+
+
+class ProfilingMiddleware:
+    """Runs sampled or explicitly requested API calls under cProfile and
+    stores the profiles per route."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        return self.get_response(request)
+
+    def process_view(
+        self, request: HttpRequest, view_func, view_args, view_kwargs
+    ) -> HttpResponse | None:
+        match = request.resolver_match
+        if not settings.PROFILING_ENABLED or match is None or match.app_name != "ninja":
+            return None
+
+        # runcall вернул бы корутину, не выполнив её: асинхронные
+        # представления (поток изменений) не профилируются
+        if iscoroutinefunction(view_func):
+            return None
+
+        if not should_profile(
+            request.headers.get(PROFILE_HEADER),
+            settings.PROFILING_SAMPLE_RATE,
+            settings.PROFILING_TOKEN_MAX_AGE,
+        ):
+            return None
+
+        profiler = cProfile.Profile()
+        response = profiler.runcall(view_func, request, *view_args, **view_kwargs)
+        path = store_profile(
+            profiler,
+            settings.PROFILING_DIR,
+            match.url_name or "unmatched",
+            settings.PROFILING_MAX_PER_ROUTE,
+        )
+        response["X-Profile-Id"] = f"{path.parent.name}/{path.name}"
+
+        return response
@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import (
     Any,
     Generic,
@@ -17,6 +18,20 @@ class PingResponseSchema(Schema):
     response: bool
 
 
+class ReadinessSchema(Schema):
+    ready: bool
+    # Время последнего прогрева кеша сотрудников в этом воркере
+    warmed_at: datetime | None = None
+
+
+class ApiError(Schema):
+    code: str
+    message: str
+    # Часть ответа, к которой относится ошибка (например, "pagination.total")
+    target: str | None = None
+    details: dict[str, Any] = {}
+
+
 class ListPaginatedResponse(Schema, Generic[TListItem]):
     items: list[TListItem]
     pagination: PaginationOut
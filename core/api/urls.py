@@ -1,15 +1,33 @@
-from django.http import HttpRequest
+import hmac
+from ipaddress import (
+    ip_address,
+    ip_network,
+)
+
+from django.conf import settings
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+)
 from django.urls import path
-from ninja import NinjaAPI
+from ninja.errors import HttpError
 
-from core.api.schemas import PingResponseSchema
+from core.api.admission import get_api_throttles
+from core.api.base import CatalogNinjaAPI
+from core.api.schemas import (
+    PingResponseSchema,
+    ReadinessSchema,
+)
 from core.api.v1.urls import router as v1_router
+from core.apps.common.metrics import registry
+from core.apps.employee.services.warmup import get_employee_cache_warmer
 
 
-api = NinjaAPI(
+api = CatalogNinjaAPI(
     title="Django Example API",
     description="API for Django Example Project",
     version="1.0.0",
+    throttle=get_api_throttles(),
 )
 
 
@@ -18,6 +36,37 @@ def ping(request: HttpRequest) -> PingResponseSchema:
     return PingResponseSchema(response=True)
 
 
+@api.get("/ready", response={200: ReadinessSchema, 503: ReadinessSchema}, throttle=[])
+def ready(request: HttpRequest):
+    # Балансировщик направляет трафик только на воркеры с прогретым кешем
+    warmer = get_employee_cache_warmer()
+    if warmer is None:
+        return 200, ReadinessSchema(ready=True)
+
+    schema = ReadinessSchema(ready=warmer.ready, warmed_at=warmer.warmed_at)
+    return (200 if schema.ready else 503), schema
+
+
+@api.get("/metrics", include_in_schema=False, throttle=[])
+def metrics(request: HttpRequest) -> HttpResponse:
+    client = ip_address(request.META.get("REMOTE_ADDR", "0.0.0.0"))
+    if not any(
+        client in ip_network(network) for network in settings.METRICS_ALLOWED_NETWORKS
+    ):
+        raise HttpError(status_code=404, message="Not Found")
+
+    # За прокси REMOTE_ADDR - адрес прокси, поэтому сети мало: нужен ещё токен
+    if settings.METRICS_TOKEN and not hmac.compare_digest(
+        request.headers.get("Authorization", ""),
+        f"Bearer {settings.METRICS_TOKEN}",
+    ):
+        raise HttpError(status_code=404, message="Not Found")
+
+    return HttpResponse(
+        registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 api.add_router("v1/", v1_router)
 
 
@@ -10,13 +10,13 @@ from core.api.v1.customers.schemas import (
     TokenOutSchema,
 )
 from core.apps.common.exceptions import ServiceException
-from core.apps.customers.services.auth import (
-    AuthService,
-    BaseAuthService,
+from core.apps.customers.exceptions.codes import (
+    CodeAttemptsExceededException,
+    CodeRequestsExceededException,
 )
-from core.apps.customers.services.codes import DjangoCacheCodeService
-from core.apps.customers.services.customers import ORMCustomerService
-from core.apps.customers.services.sender import DummySendService
+from core.apps.customers.exceptions.delivery import CodeDeliveryQueueFullException
+from core.apps.customers.services.auth import BaseAuthService
+from core.project.containers import get_container
 
 
 router = Router(tags=["customers"])
@@ -27,13 +27,14 @@ def authenticate_handler(
     request: HttpRequest,
     schema: AuthInSchema,
 ) -> ApiResponse[AuthOutSchema]:
-    service: BaseAuthService = AuthService(
-        customer_service=ORMCustomerService(),
-        codes_service=DjangoCacheCodeService(),
-        send_service=DummySendService(),
-    )
+    service: BaseAuthService = get_container().resolve(BaseAuthService)
 
-    service.authenticate(schema.phone)
+    try:
+        service.authenticate(schema.phone)
+    except CodeRequestsExceededException as exception:
+        raise HttpError(status_code=429, message=exception.message)
+    except CodeDeliveryQueueFullException as exception:
+        raise HttpError(status_code=503, message=exception.message)
 
     return ApiResponse[AuthOutSchema](
         data=AuthOutSchema(message=f"Code sent to phone {schema.phone}"),
@@ -45,14 +46,12 @@ def get_token_handler(
     request: HttpRequest,
     schema: TokenInSchema,
 ) -> ApiResponse[TokenOutSchema]:
-    service: BaseAuthService = AuthService(
-        customer_service=ORMCustomerService(),
-        codes_service=DjangoCacheCodeService(),
-        send_service=DummySendService(),
-    )
+    service: BaseAuthService = get_container().resolve(BaseAuthService)
 
     try:
         token = service.confirm(schema.code, schema.phone)
+    except CodeAttemptsExceededException as exception:
+        raise HttpError(status_code=429, message=exception.message)
     except ServiceException as exception:
         raise HttpError(status_code=400, message=exception.message)
 
@@ -1,9 +1,21 @@
-from django.http import HttpRequest
+import asyncio
+from typing import AsyncIterator
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import (
+    HttpRequest,
+    StreamingHttpResponse,
+)
 from ninja import (
     Query,
     Router,
 )
+from ninja.errors import HttpError
 
+from core.api.admission import get_expensive_query_limiter
+from core.api.auth import CustomerTokenAuth
+from core.api.base import query_budget_error
 from core.api.filters import (
     PaginationIn,
     PaginationOut,
@@ -12,15 +24,39 @@ from core.api.schemas import (
     ApiResponse,
     ListPaginatedResponse,
 )
-from core.api.v1.employees.schemas import EmployeeSchema
-from core.apps.employee.filters import EmployeeFilters
+from core.api.v1.employees.schemas import (
+    EmployeeBatchInSchema,
+    EmployeeBatchOutSchema,
+    EmployeeChangeEventSchema,
+    EmployeeChangesInSchema,
+    EmployeeChangesSchema,
+    EmployeeSchema,
+)
+from core.apps.common.exceptions import QueryBudgetExceededException
+from core.apps.common.metrics import record_query_budget_exceeded
+from core.apps.employee.exceptions.changes import (
+    ChangeCursorExpiredException,
+    ChangeCursorInvalidException,
+)
+from core.apps.employee.filters import (
+    EmployeeFilters,
+    EmployeeIncludes,
+)
 from core.apps.employee.services import (
+    BaseEmployeeChangesService,
     BaseEmployeeService,
-    ORMEmployeeService,
 )
+from core.apps.employee.services.stream import (
+    EmployeeChangeBroadcaster,
+    get_employee_change_listener,
+)
+from core.project.containers import get_container
 
 
-router = Router(tags=["employees"])
+router = Router(
+    tags=["employees"],
+    auth=CustomerTokenAuth() if settings.EMPLOYEES_REQUIRE_AUTH else None,
+)
 
 
 @router.get("", response=ApiResponse[ListPaginatedResponse[EmployeeSchema]])
@@ -28,10 +64,29 @@ def get_employees_list_handler(
     request: HttpRequest,
     filters: Query[EmployeeFilters],
     pagination_in: Query[PaginationIn],
+    includes: Query[EmployeeIncludes],
 ) -> ApiResponse[ListPaginatedResponse[EmployeeSchema]]:
-    service: BaseEmployeeService = ORMEmployeeService()
-    employee_list = service.get_employee_list(filters=filters, pagination=pagination_in)
-    employee_count = service.get_employee_count(filters=filters)
+    service: BaseEmployeeService = get_container().resolve(BaseEmployeeService)
+    expensive = (
+        filters.has_text_search
+        or pagination_in.offset >= settings.API_EXPENSIVE_QUERY_OFFSET
+    )
+
+    errors = []
+
+    with get_expensive_query_limiter().slot(expensive):
+        employee_list = service.get_employee_list(
+            filters=filters,
+            pagination=pagination_in,
+            includes=includes,
+        )
+        try:
+            employee_count = service.get_employee_count(filters=filters)
+        except QueryBudgetExceededException as exception:
+            # Страница уже получена: отдаём её без точного total
+            employee_count = None
+            errors.append(query_budget_error(exception, target="pagination.total"))
+            record_query_budget_exceeded(request.resolver_match.url_name, "degraded")
 
     items = [EmployeeSchema.from_entity(employee) for employee in employee_list]
 
@@ -46,4 +101,114 @@ def get_employees_list_handler(
             items=items,
             pagination=pagination_out,
         ),
+        errors=errors,
+    )
+
+
+@router.post("batch", response=ApiResponse[EmployeeBatchOutSchema])
+def get_employees_batch_handler(
+    request: HttpRequest,
+    schema: EmployeeBatchInSchema,
+) -> ApiResponse[EmployeeBatchOutSchema]:
+    service: BaseEmployeeService = get_container().resolve(BaseEmployeeService)
+    employees = service.get_employees_by_ids(schema.ids)
+
+    items = [
+        EmployeeSchema.from_entity(employee) if employee is not None else None
+        for employee in employees
+    ]
+    missing = list(
+        dict.fromkeys(
+            employee_id
+            for employee_id, employee in zip(schema.ids, employees)
+            if employee is None
+        ),
+    )
+
+    return ApiResponse[EmployeeBatchOutSchema](
+        data=EmployeeBatchOutSchema(items=items, missing=missing),
+    )
+
+
+@router.get("changes", response=ApiResponse[EmployeeChangesSchema])
+def get_employees_changes_handler(
+    request: HttpRequest,
+    schema: Query[EmployeeChangesInSchema],
+) -> ApiResponse[EmployeeChangesSchema]:
+    service: BaseEmployeeChangesService = get_container().resolve(
+        BaseEmployeeChangesService,
+    )
+    try:
+        changes = service.get_changes(cursor=schema.cursor, limit=schema.limit)
+    except ChangeCursorInvalidException as exception:
+        raise HttpError(status_code=400, message=exception.message)
+    except ChangeCursorExpiredException as exception:
+        # Клиент должен перечитать список целиком и начать ленту без курсора
+        raise HttpError(status_code=410, message=exception.message)
+
+    return ApiResponse[EmployeeChangesSchema](
+        data=EmployeeChangesSchema.from_entity(changes),
+    )
+
+
+async def _stream_events(
+    broadcaster: EmployeeChangeBroadcaster,
+    filters: EmployeeFilters,
+    subtree: int | None,
+) -> AsyncIterator[str]:
+    # Подписка создаётся при первом чтении потока: оборванный до начала запрос её не оставит
+    subscription = broadcaster.subscribe(filters, subtree)
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.get(),
+                    settings.EMPLOYEE_STREAM_HEARTBEAT,
+                )
+            except TimeoutError:
+                # Комментарий SSE: клиенту не виден, прокси не закрывают тихое соединение
+                yield ": ping\n\n"
+                continue
+
+            data = EmployeeChangeEventSchema.from_entity(event).model_dump_json()
+            yield f"event: {event.event}\ndata: {data}\n\n"
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+
+@router.get(
+    "stream",
+    response={200: EmployeeChangeEventSchema},
+    openapi_extra={
+        "responses": {
+            200: {
+                "description": "Server-Sent Events insert, update, delete, reset",
+                "content": {"text/event-stream": {}},
+            },
+        },
+    },
+)
+async def stream_employees_changes_handler(
+    request: HttpRequest,
+    filters: Query[EmployeeFilters],
+    subtree: int | None = None,
+) -> StreamingHttpResponse:
+    if not isinstance(request, ASGIRequest):
+        # Под WSGI бесконечный поток занял бы поток воркера целиком
+        raise HttpError(status_code=501, message="The stream is served only under ASGI")
+
+    listener = get_employee_change_listener()
+    if listener.broadcaster.full:
+        raise HttpError(status_code=503, message="Too many stream connections")
+    # Слушатель один на процесс и запускается с первым соединением
+    if settings.INVALIDATION_BUS_ENABLED:
+        listener.start()
+
+    response = StreamingHttpResponse(
+        _stream_events(listener.broadcaster, filters, subtree),
+        content_type="text/event-stream",
     )
+    response["Cache-Control"] = "no-cache"
+    # nginx не должен буферизовать поток
+    response["X-Accel-Buffering"] = "no"
+    return response
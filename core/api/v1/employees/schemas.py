@@ -1,8 +1,35 @@
 from datetime import datetime
+from typing import Any
 
+from django.conf import settings
 from ninja import Schema
 
-from core.apps.employee.entities import EmployeeEntity
+from pydantic import Field
+
+from core.apps.employee.entities import (
+    EmployeeChangeEntity,
+    EmployeeChangeEventEntity,
+    EmployeeChangesEntity,
+    EmployeeEntity,
+)
+
+
+class EmployeeBriefSchema(Schema):
+    id: int
+    first_name: str
+    last_name: str
+    middle_name: str
+    position: str
+
+    @staticmethod
+    def from_entity(entity: EmployeeEntity) -> "EmployeeBriefSchema":
+        return EmployeeBriefSchema(
+            id=entity.id,
+            first_name=entity.first_name,
+            last_name=entity.last_name,
+            middle_name=entity.middle_name,
+            position=entity.position,
+        )
 
 
 class EmployeeSchema(Schema):
@@ -16,6 +43,9 @@ class EmployeeSchema(Schema):
     manager_id: int | None = None
     created_at: datetime
     updated_at: datetime | None = None
+    # Заполняются при include=manager / include=subordinates
+    manager: EmployeeBriefSchema | None = None
+    subordinates: list[EmployeeBriefSchema] | None = None
 
     @staticmethod
     def from_entity(entity: EmployeeEntity) -> "EmployeeSchema":
@@ -27,10 +57,94 @@ class EmployeeSchema(Schema):
             position=entity.position,
             date_hired=entity.date_hired,
             salary=entity.salary,
-            manager_id=entity.manager.id if entity.manager else None,
+            manager_id=entity.manager_id,
             created_at=entity.created_at,
             updated_at=entity.updated_at,
+            manager=(
+                EmployeeBriefSchema.from_entity(entity.manager)
+                if entity.manager
+                else None
+            ),
+            subordinates=(
+                [
+                    EmployeeBriefSchema.from_entity(subordinate)
+                    for subordinate in entity.subordinates
+                ]
+                if entity.subordinates is not None
+                else None
+            ),
         )
 
 
 EmployeeListSchema = list[EmployeeSchema]
+
+
+class EmployeeBatchInSchema(Schema):
+    ids: list[int] = Field(min_length=1, max_length=settings.EMPLOYEE_BATCH_MAX_IDS)
+
+
+class EmployeeBatchOutSchema(Schema):
+    # Порядок совпадает с запрошенными ids, на месте отсутствующих - null
+    items: list[EmployeeSchema | None]
+    missing: list[int]
+
+
+class EmployeeChangeSchema(Schema):
+    id: int
+    deleted: bool
+    changed_at: datetime
+    # Текущее состояние сотрудника; null для удалённого
+    employee: EmployeeSchema | None = None
+
+    @staticmethod
+    def from_entity(entity: EmployeeChangeEntity) -> "EmployeeChangeSchema":
+        return EmployeeChangeSchema(
+            id=entity.id,
+            deleted=entity.deleted,
+            changed_at=entity.changed_at,
+            employee=(
+                EmployeeSchema.from_entity(entity.employee)
+                if entity.employee is not None
+                else None
+            ),
+        )
+
+
+class EmployeeChangesInSchema(Schema):
+    # Курсор из предыдущего ответа; без него лента читается с начала
+    cursor: str | None = None
+    limit: int = Field(default=100, ge=1, le=settings.EMPLOYEE_CHANGES_MAX_LIMIT)
+
+
+class EmployeeChangesSchema(Schema):
+    items: list[EmployeeChangeSchema]
+    cursor: str | None
+    has_more: bool
+
+    @staticmethod
+    def from_entity(entity: EmployeeChangesEntity) -> "EmployeeChangesSchema":
+        return EmployeeChangesSchema(
+            items=[EmployeeChangeSchema.from_entity(item) for item in entity.items],
+            cursor=entity.cursor,
+            has_more=entity.has_more,
+        )
+
+
+class EmployeeChangeEventSchema(Schema):
+    event: str
+    id: int | None = None
+    # Новые значения изменённых полей; все поля, если сотрудник только попал в подписку
+    fields: dict[str, Any] | None = None
+    manager_id: int | None = None
+    # false - сотрудник больше не подходит под подписку, его нужно убрать
+    matches: bool = True
+
+    @staticmethod
+    def from_entity(entity: EmployeeChangeEventEntity) -> "EmployeeChangeEventSchema":
+        return EmployeeChangeEventSchema(
+            event=entity.event,
+            id=entity.id,
+            fields=entity.fields,
+            manager_id=entity.manager_id,
+            matches=entity.matches,
+        )
@@ -0,0 +1,86 @@
+import json
+
+from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import (
+    connections,
+    DatabaseError,
+)
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+
+
+class EstimatedCountPaginator(Paginator):
+    """Changelist paginator that does not count large tables exactly.
+
+    An unfiltered changelist takes the row count from ``pg_class``
+    statistics, a filtered one from the planner estimate. Only when the
+    estimate is below ``exact_count_threshold`` an exact ``COUNT(*)`` is
+    run, so small result sets still get precise page numbers.
+    """
+
+    exact_count_threshold = 10000
+
+    @cached_property
+    def count(self) -> int:
+        queryset = self.object_list
+        connection = connections[queryset.db]
+
+        if connection.vendor != "postgresql":
+            return super().count
+
+        try:
+            estimate = self._estimate(queryset.order_by(), connection)
+        except DatabaseError:
+            estimate = None
+
+        if estimate is None or estimate < self.exact_count_threshold:
+            return super().count
+
+        return estimate
+
+    def _estimate(self, queryset, connection) -> int | None:
+        if not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+
+            # -1: таблица ещё не анализировалась
+            return row[0] if row and row[0] >= 0 else None
+
+        plan = json.loads(queryset.explain(format="json"))
+        return plan[0]["Plan"]["Plan Rows"]
+
+
+class InputFilter(admin.SimpleListFilter):
+    """List filter with a text input instead of a list of choices.
+
+    Nothing is queried to render the filter; subclasses apply the typed
+    value in ``queryset()``.
+    """
+
+    template = "admin/input_filter.html"
+
+    def lookups(self, request, model_admin):
+        # Django скрывает фильтр без вариантов, поэтому один пустой вариант
+        return ((None, None),)
+
+    def get_facet_counts(self, pk_attname, filtered_qs):
+        return {}
+
+    def choices(self, changelist):
+        yield {
+            "selected": self.value() is None,
+            "query_string": changelist.get_query_string(remove=[self.parameter_name]),
+            "display": _("All"),
+            # Остальные фильтры, поиск и сортировка сохраняются скрытыми полями формы
+            "query_parts": [
+                (name, value)
+                for name, values in changelist.filter_params.items()
+                if name != self.parameter_name
+                for value in values
+            ],
+        }
@@ -1,6 +1,29 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db import models
 
 
 class CommonConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
-    name = "common"
+    name = "core.apps.common"
+    verbose_name = "Общее"
+
+    def ready(self):
+        from core.apps.common import checks  # noqa: F401
+        from core.apps.common.lookups import AnyLookup
+        from core.apps.common.metrics import configure_registry
+
+        models.IntegerField.register_lookup(AnyLookup)
+
+        configure_registry(settings.METRICS_DIR, settings.METRICS_FLUSH_INTERVAL)
+
+        if settings.SLOW_QUERY_LOG_ENABLED:
+            from core.apps.common.slow_queries import enable_slow_query_log
+
+            enable_slow_query_log(
+                threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+                explain=settings.SLOW_QUERY_EXPLAIN,
+                path=settings.SLOW_QUERY_LOG_PATH,
+                max_bytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+                backup_count=settings.SLOW_QUERY_LOG_BACKUP_COUNT,
+            )
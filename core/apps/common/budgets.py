@@ -0,0 +1,119 @@
+from contextlib import (
+    contextmanager,
+    ExitStack,
+)
+from dataclasses import (
+    dataclass,
+    field,
+)
+from math import ceil
+from time import perf_counter
+from typing import (
+    Any,
+    Callable,
+)
+
+from django.db import (
+    connections,
+    DatabaseError,
+    OperationalError,
+)
+
+from core.apps.common.exceptions import QueryBudgetExceededException
+
+
+# SQLSTATE query_canceled: statement_timeout или pg_cancel_backend
+QUERY_CANCELED = "57014"
+
+SET_STATEMENT_TIMEOUT_SQL = "SELECT set_config('statement_timeout', %s, false)"
+RESET_STATEMENT_TIMEOUT_SQL = "RESET statement_timeout"
+
+
+@dataclass(eq=False)
+class QueryBudget:
+    """DB execute wrapper that bounds all statements of a request by one
+    deadline.
+
+    Before a statement Postgres gets the remaining budget as
+    ``statement_timeout``; a cancelled statement is raised as
+    ``QueryBudgetExceededException``. The timeout is only lowered again
+    once the remaining budget is noticeably below the value already set,
+    so most statements cost no extra round trip.
+    """
+
+    budget_ms: float
+    started_at: float = field(default_factory=perf_counter)
+    # Текущий statement_timeout по алиасам соединений, которые мы изменили
+    _timeouts: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def remaining_ms(self) -> float:
+        return self.budget_ms - (perf_counter() - self.started_at) * 1000
+
+    def __call__(
+        self,
+        execute: Callable,
+        sql: str,
+        params: Any,
+        many: bool,
+        context: dict,
+    ) -> Any:
+        remaining_ms = self.remaining_ms
+        if remaining_ms <= 0:
+            raise QueryBudgetExceededException(budget_ms=self.budget_ms)
+
+        connection = context["connection"]
+        if connection.vendor == "postgresql":
+            self._set_timeout(connection.alias, context["cursor"], remaining_ms)
+
+        try:
+            return execute(sql, params, many, context)
+        except OperationalError as error:
+            if getattr(error.__cause__, "sqlstate", None) != QUERY_CANCELED:
+                raise
+            raise QueryBudgetExceededException(budget_ms=self.budget_ms) from error
+
+    def _set_timeout(self, alias: str, cursor, remaining_ms: float) -> None:
+        timeout = max(1, ceil(remaining_ms))
+        current = self._timeouts.get(alias)
+        if current is not None and timeout >= current * 0.8:
+            return
+
+        # Сырой курсор драйвера: не проходит через execute wrappers
+        with cursor.db.wrap_database_errors:
+            cursor.cursor.execute(SET_STATEMENT_TIMEOUT_SQL, [f"{timeout}ms"])
+        self._timeouts[alias] = timeout
+
+    def reset(self) -> None:
+        """Returns the changed connections to the server default, so a
+        pooled connection does not carry the timeout into the next
+        request."""
+        for alias in self._timeouts:
+            connection = connections[alias]
+            if connection.connection is None:
+                continue
+
+            try:
+                with connection.wrap_database_errors, connection.cursor() as cursor:
+                    cursor.cursor.execute(RESET_STATEMENT_TIMEOUT_SQL)
+            except DatabaseError:
+                # Соединение в сбойной транзакции: откат вернёт исходное значение
+                pass
+
+        self._timeouts.clear()
+
+
+@contextmanager
+def query_budget(budget_ms: float):
+    """Runs the block with a shared statement_timeout budget on every
+    database connection."""
+    budget = QueryBudget(budget_ms=budget_ms)
+
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(budget))
+
+            yield budget
+    finally:
+        budget.reset()
@@ -0,0 +1,79 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import (
+    dataclass,
+    field,
+)
+from typing import (
+    Any,
+    Hashable,
+)
+
+from core.apps.common.metrics import record_cache_access
+
+
+_MISSING = object()
+
+
+@dataclass(eq=False)
+class TTLCache:
+    """Thread-safe in-process LRU cache with per-entry expiration.
+
+    Holds at most ``maxsize`` entries: the least recently used entry is
+    evicted first, expired entries are dropped on access. Hits and misses
+    are reported to the metrics registry under ``name``.
+    """
+
+    name: str
+    maxsize: int = 1024
+    ttl: float = 60.0
+    _entries: OrderedDict = field(default_factory=OrderedDict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            value = self._get(key)
+
+        record_cache_access(self.name, hit=value is not _MISSING)
+        return default if value is _MISSING else value
+
+    def _get(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return _MISSING
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            value = self._get(key)
+            self._entries.pop(key, None)
+
+        return default if value is _MISSING else value
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
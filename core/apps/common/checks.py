@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+
+@checks.register(checks.Tags.caches)
+def check_throttle_cache(app_configs, **kwargs) -> list[checks.CheckMessage]:
+    if not settings.API_THROTTLE_ENABLED:
+        return []
+
+    if not isinstance(caches[settings.API_THROTTLE_CACHE], LocMemCache):
+        return []
+
+    return [
+        checks.Warning(
+            "API rate limit state is kept in a process-local cache",
+            hint=(
+                "Each worker enforces its own limit. Point CACHE_URL (or "
+                "API_THROTTLE_CACHE) at a shared cache such as rediscache://."
+            ),
+            id="common.W001",
+        ),
+    ]
@@ -6,3 +6,12 @@ class ServiceException(Exception):
     @property
     def message(self) -> str:
         return "Application service error occured"
+
+
+@dataclass(eq=False)
+class QueryBudgetExceededException(ServiceException):
+    budget_ms: float
+
+    @property
+    def message(self) -> str:
+        return "Query time budget exceeded, narrow the filters and try again"
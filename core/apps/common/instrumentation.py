@@ -0,0 +1,86 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import (
+    dataclass,
+    field,
+)
+from time import perf_counter
+from typing import (
+    Any,
+    Callable,
+)
+
+
+@dataclass(eq=False)
+class RequestStats:
+    """Per-request counters filled by the DB execute wrapper and the API."""
+
+    started_at: float = field(default_factory=perf_counter)
+    queries: int = 0
+    db_time: float = 0.0
+    timings: dict[str, float] = field(default_factory=dict)
+    handler_finished_at: float | None = None
+
+    def __call__(
+        self, execute: Callable, sql: str, params: Any, many: bool, context: dict
+    ) -> Any:
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += perf_counter() - start
+
+    @contextmanager
+    def measure(self, name: str):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, perf_counter() - start)
+
+    def add(self, name: str, duration: float) -> None:
+        self.timings[name] = self.timings.get(name, 0.0) + duration
+
+    @property
+    def total(self) -> float:
+        return perf_counter() - self.started_at
+
+    def as_server_timing(self) -> str:
+        metrics = [f'db;dur={self.db_time * 1000:.2f};desc="{self.queries} queries"']
+        metrics.extend(
+            f"{name};dur={duration * 1000:.2f}"
+            for name, duration in self.timings.items()
+        )
+        metrics.append(f"total;dur={self.total * 1000:.2f}")
+        return ", ".join(metrics)
+
+    def as_meta(self) -> dict[str, Any]:
+        return {
+            "queries": self.queries,
+            "db_ms": round(self.db_time * 1000, 2),
+            **{
+                f"{name}_ms": round(duration * 1000, 2)
+                for name, duration in self.timings.items()
+            },
+            "total_ms": round(self.total * 1000, 2),
+        }
+
+
+_current_request_stats: ContextVar[RequestStats | None] = ContextVar(
+    "current_request_stats", default=None
+)
+
+
+def get_request_stats() -> RequestStats | None:
+    return _current_request_stats.get()
+
+
+@contextmanager
+def collect_request_stats():
+    stats = RequestStats()
+    token = _current_request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_request_stats.reset(token)
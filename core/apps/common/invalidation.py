@@ -0,0 +1,135 @@
+import json
+import logging
+import threading
+from dataclasses import (
+    dataclass,
+    field,
+)
+from functools import cache
+from typing import Callable
+
+from django.conf import settings
+from django.db import connections
+
+import psycopg
+
+from core.apps.common.metrics import record_cache_invalidation
+
+
+logger = logging.getLogger("core.invalidation")
+
+# Канал, в который пишут триггеры таблиц (см. миграции employee и customers)
+INVALIDATION_CHANNEL = "catalog_invalidation"
+
+# Получает id изменённых строк или None - "изменилось неизвестно что"
+InvalidationHandler = Callable[[list[int] | None], None]
+
+
+@dataclass(eq=False)
+class InvalidationBus:
+    """Delivers ``NOTIFY`` from table triggers to in-process caches.
+
+    A background thread keeps its own connection (outside the pool) with
+    ``LISTEN`` on ``channel`` and calls the handlers subscribed to the
+    table of each notification. While the connection is down caches
+    expire by TTL only; after every (re)connect each handler gets
+    ``None``, since notifications sent in between are lost.
+    """
+
+    using: str = "default"
+    channel: str = INVALIDATION_CHANNEL
+    reconnect_interval: float = 5.0
+    poll_interval: float = 1.0
+    connected: bool = False
+    _handlers: dict[str, list[InvalidationHandler]] = field(default_factory=dict)
+    _thread: threading.Thread | None = None
+    _stopping: threading.Event = field(default_factory=threading.Event)
+
+    def subscribe(self, table: str, handler: InvalidationHandler) -> None:
+        self._handlers.setdefault(table, []).append(handler)
+
+    def dispatch(self, payload: str) -> None:
+        try:
+            message = json.loads(payload)
+            table, ids = message["table"], message["ids"]
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Malformed invalidation payload: %r", payload)
+            return
+
+        record_cache_invalidation(table, "notify")
+        self._call(table, ids)
+
+    def flush(self) -> None:
+        for table in self._handlers:
+            record_cache_invalidation(table, "reconnect")
+            self._call(table, None)
+
+    def _call(self, table: str, ids: list[int] | None) -> None:
+        for handler in self._handlers.get(table, []):
+            try:
+                handler(ids)
+            except Exception:
+                logger.exception("Invalidation handler for %s failed", table)
+
+    def connect(self) -> psycopg.Connection:
+        params = connections[self.using].get_connection_params()
+        connection = psycopg.connect(**params, autocommit=True)
+        connection.execute(f"LISTEN {self.channel}")
+        return connection
+
+    def start(self) -> None:
+        # После fork поток родителя в дочернем процессе не жив: запускаем свой
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="invalidation-bus",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                with self.connect() as connection:
+                    self.connected = True
+                    self.flush()
+                    self._listen(connection)
+            except Exception as error:
+                # База недоступна - не засоряем лог трейсбеком на каждую попытку
+                logger.warning(
+                    "Invalidation listener disconnected, caches fall back to TTL: %s",
+                    error,
+                )
+            finally:
+                self.connected = False
+
+            self._stopping.wait(self.reconnect_interval)
+
+    def _listen(self, connection: psycopg.Connection) -> None:
+        while not self._stopping.is_set():
+            # Таймаут - чтобы периодически проверять остановку
+            for notify in connection.notifies(timeout=self.poll_interval):
+                self.dispatch(notify.payload)
+
+
+@cache
+def get_invalidation_bus() -> InvalidationBus:
+    return InvalidationBus(
+        using=settings.INVALIDATION_BUS_DATABASE,
+        reconnect_interval=settings.INVALIDATION_BUS_RECONNECT_INTERVAL,
+    )
+
+
+def start_invalidation_bus() -> None:
+    """Post-start hook: listens for invalidations in the background."""
+    if settings.INVALIDATION_BUS_ENABLED:
+        get_invalidation_bus().start()
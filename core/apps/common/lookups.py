@@ -0,0 +1,42 @@
+from django.core.exceptions import EmptyResultSet
+from django.db.models import Lookup
+
+
+class AnyLookup(Lookup):
+    """``field = ANY(%s)`` with the whole list bound as a single array
+    parameter.
+
+    Unlike ``__in`` the SQL text does not depend on the number of
+    values, so Postgres can reuse one prepared statement for every list.
+    Other backends fall back to ``IN``.
+    """
+
+    lookup_name = "any"
+    prepare_rhs = False
+
+    def get_db_prep_lookup(self, value, connection):
+        field = self.lhs.output_field
+        return "%s", [
+            [
+                field.get_db_prep_value(item, connection, prepared=False)
+                for item in value
+            ]
+        ]
+
+    def as_postgresql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        # Явный тип массива: иначе драйвер выбирает int2/int4/int8 по значениям
+        array_type = self.lhs.output_field.cast_db_type(connection)
+        return f"{lhs} = ANY({rhs}::{array_type}[])", (*lhs_params, *rhs_params)
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        _, rhs_params = self.process_rhs(compiler, connection)
+        values = rhs_params[0]
+
+        if not values:
+            raise EmptyResultSet
+
+        placeholders = ", ".join(["%s"] * len(values))
+        return f"{lhs} IN ({placeholders})", (*lhs_params, *values)
@@ -0,0 +1,304 @@
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from dataclasses import (
+    dataclass,
+    field,
+)
+from http.client import (
+    HTTPConnection,
+    HTTPException,
+    HTTPSConnection,
+)
+from urllib.parse import (
+    urlencode,
+    urlsplit,
+)
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+)
+
+from core.apps.customers.models import AuthCodeModel
+
+
+@dataclass
+class Sample:
+    label: str
+    status: int
+    latency: float
+
+
+@dataclass
+class Catalog:
+    """Values seen on the first page, used to build realistic filters."""
+
+    last_names: list[str] = field(default_factory=list)
+    positions: list[str] = field(default_factory=list)
+    manager_ids: list[int] = field(default_factory=list)
+    total: int = 0
+
+
+def percentile(sorted_values: list[float], rank: float) -> float:
+    if not sorted_values:
+        return 0.0
+
+    index = max(
+        0, min(len(sorted_values) - 1, round(rank / 100 * len(sorted_values)) - 1)
+    )
+    return sorted_values[index]
+
+
+class Client:
+    def __init__(self, base_url: str, timeout: float, token: str | None = None):
+        url = urlsplit(base_url)
+        self.connection_class = (
+            HTTPSConnection if url.scheme == "https" else HTTPConnection
+        )
+        self.netloc = url.netloc
+        self.prefix = url.path.rstrip("/")
+        self.timeout = timeout
+        self.token = token
+        self.connection = None
+
+    def request(
+        self, method: str, path: str, body: dict | None = None
+    ) -> tuple[int, bytes]:
+        if self.connection is None:
+            self.connection = self.connection_class(self.netloc, timeout=self.timeout)
+
+        payload = json.dumps(body).encode() if body is not None else None
+        headers = {"Content-Type": "application/json"} if payload is not None else {}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+
+        try:
+            self.connection.request(
+                method, self.prefix + path, body=payload, headers=headers
+            )
+            response = self.connection.getresponse()
+            return response.status, response.read()
+        except (OSError, HTTPException):
+            self.connection.close()
+            self.connection = None
+            return 0, b""
+
+
+class Command(BaseCommand):
+    help = "Drive the API of a running server with concurrent clients and report latency percentiles"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument("--concurrency", type=int, default=10)
+        parser.add_argument(
+            "--duration", type=float, default=30.0, help="Measured seconds"
+        )
+        parser.add_argument(
+            "--warmup",
+            type=float,
+            default=3.0,
+            help="Unmeasured seconds before the run",
+        )
+        parser.add_argument(
+            "--auth-ratio",
+            type=float,
+            default=0.05,
+            help="Share of iterations running the auth -> confirm flow",
+        )
+        parser.add_argument(
+            "--phones",
+            type=int,
+            default=50,
+            help="Size of the phone pool for the auth flow",
+        )
+        parser.add_argument("--timeout", type=float, default=10.0)
+        parser.add_argument(
+            "--token",
+            default=None,
+            help="Customer token for endpoints behind EMPLOYEES_REQUIRE_AUTH",
+        )
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument(
+            "--json",
+            dest="json_path",
+            default=None,
+            help="Write the report to a JSON file",
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.random = random.Random(options["seed"])
+        self.catalog = self._discover_catalog()
+
+        samples: list[Sample] = []
+        lock = threading.Lock()
+        started_at = time.perf_counter()
+        measure_from = started_at + options["warmup"]
+        deadline = measure_from + options["duration"]
+
+        def worker(worker_id: int):
+            client = Client(options["base_url"], options["timeout"], options["token"])
+            rnd = random.Random(self.random.random() + worker_id)
+            local: list[Sample] = []
+
+            while time.perf_counter() < deadline:
+                for sample in self._iteration(client, rnd):
+                    if time.perf_counter() >= measure_from:
+                        local.append(sample)
+
+            with lock:
+                samples.extend(local)
+
+        threads = [
+            threading.Thread(target=worker, args=(i,), daemon=True)
+            for i in range(options["concurrency"])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        report = self._build_report(samples, options["duration"])
+        self._print_report(report)
+
+        if options["json_path"]:
+            with open(options["json_path"], "w") as file:
+                json.dump(report, file, indent=2)
+
+    def _discover_catalog(self) -> Catalog:
+        client = Client(
+            self.options["base_url"], self.options["timeout"], self.options["token"]
+        )
+        status, body = client.request("GET", "/api/v1/employees/?limit=100")
+
+        if status != 200:
+            raise CommandError(
+                f"Server at {self.options['base_url']} answered {status} on the employee list"
+            )
+
+        data = json.loads(body)["data"]
+        items = data["items"]
+
+        return Catalog(
+            last_names=sorted({item["last_name"] for item in items}),
+            positions=sorted({item["position"] for item in items}),
+            manager_ids=sorted(
+                {item["manager_id"] for item in items if item["manager_id"]}
+            ),
+            total=data["pagination"]["total"],
+        )
+
+    def _iteration(self, client: Client, rnd: random.Random) -> list[Sample]:
+        if rnd.random() < self.options["auth_ratio"]:
+            return self._auth_flow(client, rnd)
+
+        label, query = self._employee_query(rnd)
+        return [
+            self._timed(client, label, "GET", f"/api/v1/employees/?{urlencode(query)}")
+        ]
+
+    def _employee_query(self, rnd: random.Random) -> tuple[str, dict]:
+        limit = rnd.choice((10, 20, 20, 50))
+        max_offset = max(0, min(self.catalog.total, 10_000) - limit)
+        roll = rnd.random()
+
+        if roll < 0.35:
+            return "employees:page", {
+                "offset": rnd.randint(0, max_offset),
+                "limit": limit,
+            }
+
+        if roll < 0.55 and self.catalog.last_names:
+            name = rnd.choice(self.catalog.last_names)
+            return "employees:search", {
+                "search": name[: rnd.randint(2, len(name))],
+                "limit": limit,
+            }
+
+        if roll < 0.70 and self.catalog.positions:
+            return "employees:position", {
+                "position": rnd.choice(self.catalog.positions),
+                "limit": limit,
+            }
+
+        if roll < 0.85 and self.catalog.manager_ids:
+            return "employees:manager", {
+                "manager_id": rnd.choice(self.catalog.manager_ids),
+                "limit": limit,
+            }
+
+        year = rnd.randint(2000, 2024)
+        return "employees:ranges", {
+            "date_hired_from": f"{year}-01-01",
+            "date_hired_to": f"{year + rnd.randint(0, 3)}-12-31",
+            "salary_min": rnd.choice((0, 50_000, 100_000)),
+            "limit": limit,
+        }
+
+    def _auth_flow(self, client: Client, rnd: random.Random) -> list[Sample]:
+        phone = f"+7999{rnd.randrange(self.options['phones']):07d}"
+        auth = self._timed(
+            client, "customers:auth", "POST", "/api/v1/customers/auth", {"phone": phone}
+        )
+
+        # Код читается из общей таблицы auth_code, поэтому нужна та же база, что и у сервера.
+        code = (
+            AuthCodeModel.objects.filter(phone=phone)
+            .values_list("code", flat=True)
+            .first()
+            or "0000"
+        )
+        confirm = self._timed(
+            client,
+            "customers:confirm",
+            "POST",
+            "/api/v1/customers/confirm",
+            {"phone": phone, "code": code},
+        )
+        return [auth, confirm]
+
+    def _timed(
+        self,
+        client: Client,
+        label: str,
+        method: str,
+        path: str,
+        body: dict | None = None,
+    ) -> Sample:
+        start = time.perf_counter()
+        status, _ = client.request(method, path, body)
+        return Sample(label=label, status=status, latency=time.perf_counter() - start)
+
+    def _build_report(self, samples: list[Sample], duration: float) -> dict:
+        grouped: dict[str, list[Sample]] = defaultdict(list)
+        for sample in samples:
+            grouped[sample.label].append(sample)
+        grouped["total"] = samples
+
+        report = {}
+        for label, group in sorted(grouped.items()):
+            latencies = sorted(sample.latency * 1000 for sample in group)
+            report[label] = {
+                "requests": len(group),
+                "errors": sum(1 for sample in group if not 200 <= sample.status < 300),
+                "rps": round(len(group) / duration, 2),
+                "p50_ms": round(percentile(latencies, 50), 2),
+                "p95_ms": round(percentile(latencies, 95), 2),
+                "p99_ms": round(percentile(latencies, 99), 2),
+                "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+            }
+        return report
+
+    def _print_report(self, report: dict):
+        header = f"{'label':<22}{'requests':>10}{'errors':>8}{'rps':>10}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+
+        for label, row in report.items():
+            self.stdout.write(
+                f"{label:<22}{row['requests']:>10}{row['errors']:>8}{row['rps']:>10}"
+                f"{row['p50_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}{row['max_ms']:>9}",
+            )
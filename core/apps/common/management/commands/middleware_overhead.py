@@ -0,0 +1,67 @@
+import time
+from statistics import (
+    mean,
+    median,
+)
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from core.project.handlers import ApiWSGIHandler
+
+
+PATHS = {
+    "ping": "/api/ping",
+    "employees": "/api/v1/employees/",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare in-process per-request time of API paths through the full "
+        "MIDDLEWARE and the lean API_MIDDLEWARE"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument(
+            "--warmup", type=int, default=200, help="Unmeasured requests per stack"
+        )
+
+    def handle(self, *args, **options):
+        handlers = {"full": WSGIHandler(), "api": ApiWSGIHandler()}
+        factory = RequestFactory()
+
+        header = f"{'path':<12}{'stack':<8}{'p50_us':>10}{'mean_us':>10}{'status':>8}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+
+        for label, path in PATHS.items():
+            latencies = {name: [] for name in handlers}
+            statuses = {}
+
+            for i in range(options["warmup"] + options["requests"]):
+                # Стеки чередуются, чтобы дрейф (GC, кеши) влиял на оба одинаково
+                for name, handler in handlers.items():
+                    # Разные адреса: бенчмарк не должен упереться в rate limit
+                    environ = factory.get(
+                        path, REMOTE_ADDR=f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"
+                    ).environ
+                    start = time.perf_counter()
+                    response = handler(environ, lambda status, headers: None)
+                    response.close()
+                    elapsed = time.perf_counter() - start
+
+                    statuses[name] = response.status_code
+                    if i >= options["warmup"]:
+                        latencies[name].append(elapsed * 1_000_000)
+
+            for name, values in latencies.items():
+                self.stdout.write(
+                    f"{label:<12}{name:<8}{median(values):>10.1f}"
+                    f"{mean(values):>10.1f}{statuses[name]:>8}",
+                )
+
+            saved = median(latencies["full"]) - median(latencies["api"])
+            self.stdout.write(f"{label:<12}{'saved':<8}{saved:>10.1f}")
@@ -0,0 +1,79 @@
+import pstats
+import shutil
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+)
+
+from core.apps.common.profiling import (
+    list_profiles,
+    make_profile_token,
+    PROFILE_HEADER,
+)
+
+
+class Command(BaseCommand):
+    help = "List, aggregate or clear stored API request profiles"
+
+    def add_arguments(self, parser):
+        parser.add_argument("action", choices=("list", "show", "token", "clear"))
+        parser.add_argument(
+            "route", nargs="?", help="Route (handler) name for show/clear"
+        )
+        parser.add_argument("--sort", default="cumulative", help="pstats sort key")
+        parser.add_argument(
+            "--limit", type=int, default=30, help="Number of functions to print"
+        )
+        parser.add_argument(
+            "--last",
+            type=int,
+            default=None,
+            help="Aggregate only the N latest profiles",
+        )
+
+    def handle(self, *args, **options):
+        directory = Path(settings.PROFILING_DIR)
+        profiles = list_profiles(directory)
+
+        if options["action"] == "token":
+            self.stdout.write(f"{PROFILE_HEADER}: {make_profile_token()}")
+        elif options["action"] == "list":
+            self._list(profiles)
+        elif options["action"] == "show":
+            self._show(profiles, options)
+        else:
+            self._clear(directory, options["route"])
+
+    def _list(self, profiles: dict[str, list[Path]]):
+        if not profiles:
+            self.stdout.write("No profiles stored")
+            return
+
+        for route, paths in profiles.items():
+            latest = paths[-1].name if paths else "-"
+            self.stdout.write(f"{route:<40}{len(paths):>6} profiles, latest {latest}")
+
+    def _show(self, profiles: dict[str, list[Path]], options):
+        route = options["route"]
+        if route not in profiles or not profiles[route]:
+            raise CommandError(f"No profiles for route {route!r}")
+
+        paths = (
+            profiles[route][-options["last"] :] if options["last"] else profiles[route]
+        )
+        output = StringIO()
+        stats = pstats.Stats(*map(str, paths), stream=output)
+        stats.strip_dirs().sort_stats(options["sort"]).print_stats(options["limit"])
+
+        self.stdout.write(f"{route}: aggregated {len(paths)} profiles")
+        self.stdout.write(output.getvalue())
+
+    def _clear(self, directory: Path, route: str | None):
+        target = directory / route if route else directory
+        if target.exists():
+            shutil.rmtree(target)
+        self.stdout.write(f"Removed {target}")
@@ -0,0 +1,123 @@
+import time
+import tracemalloc
+from typing import Callable
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.apps.customers.services.auth import (
+    AuthService,
+    BaseAuthService,
+)
+from core.apps.customers.services.codes import get_code_service
+from core.apps.customers.services.customers import (
+    BaseCustomerService,
+    CachedCustomerService,
+    get_customer_token_cache,
+    ORMCustomerService,
+)
+from core.apps.customers.services.delivery import (
+    get_code_delivery_queue,
+    get_in_process_worker_pool,
+)
+from core.apps.customers.services.sender import QueuedSendService
+from core.apps.employee.services import (
+    BaseEmployeeService,
+    ORMEmployeeService,
+)
+from core.apps.employee.services.loader import EmployeeLoader
+from core.project.containers import get_container
+
+
+def _build_auth_service() -> BaseAuthService:
+    # Так хендлеры собирали граф сервисов до контейнера: на каждый запрос
+    return AuthService(
+        customer_service=CachedCustomerService(
+            customer_service=ORMCustomerService(),
+            cache=get_customer_token_cache(),
+        ),
+        codes_service=get_code_service(),
+        send_service=QueuedSendService(
+            queue=get_code_delivery_queue(),
+            worker_pool=get_in_process_worker_pool(),
+        ),
+    )
+
+
+def _build_customer_service() -> BaseCustomerService:
+    return CachedCustomerService(
+        customer_service=ORMCustomerService(),
+        cache=get_customer_token_cache(),
+    )
+
+
+def _build_employee_service() -> BaseEmployeeService:
+    return ORMEmployeeService(
+        loader=EmployeeLoader(chunk_size=settings.EMPLOYEE_BATCH_CHUNK_SIZE),
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare per-request construction of service graphs in handlers "
+        "with resolving them from the container"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20000)
+
+    def handle(self, *args, **options):
+        container = get_container()
+        cases: dict[str, dict[str, Callable]] = {
+            "auth": {
+                "construct": _build_auth_service,
+                "container": lambda: container.resolve(BaseAuthService),
+            },
+            "token_auth": {
+                "construct": _build_customer_service,
+                "container": lambda: container.resolve(BaseCustomerService),
+            },
+            "employees": {
+                "construct": _build_employee_service,
+                "container": lambda: container.resolve(BaseEmployeeService),
+            },
+        }
+
+        header = f"{'service':<12}{'path':<11}{'us/op':>9}{'bytes/op':>10}{'blocks/op':>11}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+
+        for label, variants in cases.items():
+            for name, build in variants.items():
+                us, size, blocks = self._measure(build, options["iterations"])
+                self.stdout.write(
+                    f"{label:<12}{name:<11}{us:>9.2f}{size:>10.0f}{blocks:>11.1f}"
+                )
+
+    def _measure(self, build: Callable, iterations: int) -> tuple[float, float, float]:
+        # Прогрев: синглтоны и пул воркеров создаются при первом обращении
+        build()
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            build()
+        elapsed = time.perf_counter() - start
+
+        # Отдельный прогон: tracemalloc сам замедляет выполнение
+        instances = []
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        for _ in range(iterations):
+            instances.append(build())
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        stats = after.compare_to(before, "filename")
+        size = sum(stat.size_diff for stat in stats)
+        blocks = sum(stat.count_diff for stat in stats)
+
+        return (
+            elapsed / iterations * 1_000_000,
+            size / iterations,
+            blocks / iterations,
+        )
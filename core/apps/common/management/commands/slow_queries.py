@@ -0,0 +1,91 @@
+import json
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.apps.common.slow_queries import (
+    normalize_sql,
+    read_entries,
+)
+
+
+ORDERINGS = {
+    "total": lambda group: group["total_ms"],
+    "max": lambda group: group["max_ms"],
+    "count": lambda group: group["count"],
+}
+
+
+def _plan_summary(plan) -> str:
+    if not plan:
+        return "-"
+
+    root = plan[0]["Plan"]
+    nodes = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        relation = f" on {node['Relation Name']}" if "Relation Name" in node else ""
+        nodes.append(f"{node['Node Type']}{relation}")
+        stack.extend(reversed(node.get("Plans", [])))
+
+    return f"cost={root['Total Cost']} rows={root['Plan Rows']}: " + " -> ".join(nodes)
+
+
+class Command(BaseCommand):
+    help = "Summarize the slow query log by statement shape and origin"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default=settings.SLOW_QUERY_LOG_PATH)
+        parser.add_argument("--top", type=int, default=10)
+        parser.add_argument("--order", choices=sorted(ORDERINGS), default="total")
+        parser.add_argument(
+            "--plan",
+            action="store_true",
+            help="Print full JSON plan of the slowest sample",
+        )
+
+    def handle(self, *args, **options):
+        groups: dict[tuple, dict] = defaultdict(
+            lambda: {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "worst": None},
+        )
+
+        for entry in read_entries(options["path"]):
+            group = groups[(entry.get("origin"), normalize_sql(entry["sql"]))]
+            group["count"] += 1
+            group["total_ms"] += entry["duration_ms"]
+            if entry["duration_ms"] >= group["max_ms"]:
+                group["max_ms"] = entry["duration_ms"]
+                group["worst"] = entry
+
+        if not groups:
+            self.stdout.write(f"No slow queries recorded in {options['path']}")
+            return
+
+        ranked = sorted(
+            groups.items(),
+            key=lambda item: ORDERINGS[options["order"]](item[1]),
+            reverse=True,
+        )
+
+        for position, ((origin, sql), group) in enumerate(
+            ranked[: options["top"]], start=1
+        ):
+            worst = group["worst"]
+            self.stdout.write(
+                self.style.WARNING(
+                    f"#{position} {origin or 'unknown origin'}: {group['count']} times, "
+                    f"total {group['total_ms']:.0f} ms, avg {group['total_ms'] / group['count']:.0f} ms, "
+                    f"max {group['max_ms']:.0f} ms",
+                ),
+            )
+            self.stdout.write(f"  sql:    {sql}")
+            self.stdout.write(
+                f"  params: {json.dumps(worst['params'], ensure_ascii=False)}"
+            )
+            self.stdout.write(f"  plan:   {_plan_summary(worst['plan'])}")
+            if options["plan"] and worst["plan"]:
+                self.stdout.write(
+                    json.dumps(worst["plan"], indent=2, ensure_ascii=False)
+                )
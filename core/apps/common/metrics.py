@@ -0,0 +1,334 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import (
+    dataclass,
+    field,
+)
+from pathlib import Path
+
+
+logger = logging.getLogger("core.metrics")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+@dataclass(frozen=True)
+class MetricDefinition:
+    name: str
+    kind: str
+    help: str
+    buckets: tuple[float, ...] = ()
+
+
+METRICS = {
+    definition.name: definition
+    for definition in (
+        MetricDefinition(
+            "api_requests_total", "counter", "API requests by route, method and status"
+        ),
+        MetricDefinition(
+            "api_request_duration_seconds",
+            "histogram",
+            "API request latency by route",
+            LATENCY_BUCKETS,
+        ),
+        MetricDefinition(
+            "api_request_db_queries",
+            "histogram",
+            "SQL queries executed per API request by route",
+            QUERY_COUNT_BUCKETS,
+        ),
+        MetricDefinition(
+            "api_request_db_seconds_total", "counter", "Time spent in SQL by route"
+        ),
+        MetricDefinition(
+            "cache_requests_total", "counter", "Cache lookups by cache name and result"
+        ),
+        MetricDefinition(
+            "api_query_budget_exceeded_total",
+            "counter",
+            "Requests over their SQL time budget by route and outcome",
+        ),
+        MetricDefinition(
+            "cache_invalidations_total",
+            "counter",
+            "Invalidation notifications received by table and source",
+        ),
+        MetricDefinition(
+            "single_flight_calls_total",
+            "counter",
+            "Coalesced calls by name and role (leader runs, follower waits)",
+        ),
+        MetricDefinition(
+            "employee_stream_events_total",
+            "counter",
+            "Employee change events queued to stream connections by event",
+        ),
+    )
+}
+
+
+@dataclass
+class HistogramValue:
+    buckets: list[int]
+    sum: float = 0.0
+    count: int = 0
+
+
+@dataclass(eq=False)
+class MetricsRegistry:
+    """Process-local metrics storage.
+
+    With ``directory`` set every process periodically dumps its snapshot
+    there and ``render`` aggregates the snapshots of all workers. A failed
+    dump is logged and never reaches the request that triggered it.
+    """
+
+    directory: Path | None = None
+    flush_interval: float = 5.0
+    counters: dict[tuple[str, Labels], float] = field(default_factory=dict)
+    histograms: dict[tuple[str, Labels], HistogramValue] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+    _flush_lock: threading.Lock = field(default_factory=threading.Lock)
+    _flushed_at: float = 0.0
+
+    def inc(self, name: str, labels: dict[str, str], value: float = 1.0) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0.0) + value
+        self._maybe_flush()
+
+    def observe(self, name: str, labels: dict[str, str], value: float) -> None:
+        buckets = METRICS[name].buckets
+        key = (name, tuple(sorted(labels.items())))
+
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = HistogramValue(
+                    buckets=[0] * len(buckets)
+                )
+
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    histogram.buckets[index] += 1
+            histogram.sum += value
+            histogram.count += 1
+        self._maybe_flush()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "counters": [
+                    [name, list(labels), value]
+                    for (name, labels), value in self.counters.items()
+                ],
+                "histograms": [
+                    [name, list(labels), list(value.buckets), value.sum, value.count]
+                    for (name, labels), value in self.histograms.items()
+                ],
+            }
+
+    def flush(self) -> None:
+        if self.directory is None:
+            return
+
+        with self._flush_lock:
+            self._write_snapshot()
+
+    def _write_snapshot(self) -> None:
+        # Вызывается под _flush_lock
+        tmp_path = None
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Уникальный временный файл: частично записанный снимок не виден collect
+            with tempfile.NamedTemporaryFile(
+                "w",
+                dir=self.directory,
+                prefix=f"{os.getpid()}.",
+                suffix=".tmp",
+                delete=False,
+            ) as tmp_file:
+                tmp_path = Path(tmp_file.name)
+                json.dump(self.snapshot(), tmp_file)
+            tmp_path.replace(self.directory / f"{os.getpid()}.json")
+        except OSError:
+            logger.exception("Failed to write metrics snapshot to %s", self.directory)
+            if tmp_path is not None:
+                tmp_path.unlink(missing_ok=True)
+        finally:
+            # И после ошибки: не повторять запись на каждом запросе
+            self._flushed_at = time.monotonic()
+
+    def _due(self) -> bool:
+        return time.monotonic() - self._flushed_at >= self.flush_interval
+
+    def _maybe_flush(self) -> None:
+        if self.directory is None or not self._due():
+            return
+
+        # Снимок пишет один поток; остальные не ждут его
+        if not self._flush_lock.acquire(blocking=False):
+            return
+        try:
+            if self._due():
+                self._write_snapshot()
+        finally:
+            self._flush_lock.release()
+
+    def collect(self) -> list[dict]:
+        if self.directory is None:
+            return [self.snapshot()]
+
+        self.flush()
+        snapshots = []
+        for path in self.directory.glob("*.json"):
+            try:
+                snapshots.append(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    def render(self) -> str:
+        return render_prometheus(self.collect())
+
+
+def _merge(snapshots: list[dict]) -> tuple[dict, dict]:
+    counters: dict[tuple[str, Labels], float] = {}
+    histograms: dict[tuple[str, Labels], HistogramValue] = {}
+
+    for snapshot in snapshots:
+        for name, labels, value in snapshot["counters"]:
+            key = (name, tuple(tuple(pair) for pair in labels))
+            counters[key] = counters.get(key, 0.0) + value
+
+        for name, labels, buckets, total, count in snapshot["histograms"]:
+            key = (name, tuple(tuple(pair) for pair in labels))
+            merged = histograms.setdefault(
+                key, HistogramValue(buckets=[0] * len(buckets))
+            )
+            merged.buckets = [
+                left + right for left, right in zip(merged.buckets, buckets)
+            ]
+            merged.sum += total
+            merged.count += count
+
+    return counters, histograms
+
+
+def _format_labels(labels: Labels, **extra: str) -> str:
+    pairs = [*labels, *extra.items()]
+    if not pairs:
+        return ""
+
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def render_prometheus(snapshots: list[dict]) -> str:
+    counters, histograms = _merge(snapshots)
+    lines: list[str] = []
+
+    for definition in METRICS.values():
+        lines.append(f"# HELP {definition.name} {definition.help}")
+        lines.append(f"# TYPE {definition.name} {definition.kind}")
+
+        if definition.kind == "counter":
+            for (name, labels), value in sorted(counters.items()):
+                if name == definition.name:
+                    lines.append(
+                        f"{name}{_format_labels(labels)} {_format_number(value)}"
+                    )
+            continue
+
+        for (name, labels), value in sorted(
+            histograms.items(), key=lambda item: item[0]
+        ):
+            if name != definition.name:
+                continue
+            for bound, count in zip(definition.buckets, value.buckets):
+                lines.append(
+                    f"{name}_bucket{_format_labels(labels, le=_format_number(bound))} {count}"
+                )
+            lines.append(
+                f"{name}_bucket{_format_labels(labels, le='+Inf')} {value.count}"
+            )
+            lines.append(
+                f"{name}_sum{_format_labels(labels)} {_format_number(value.sum)}"
+            )
+            lines.append(f"{name}_count{_format_labels(labels)} {value.count}")
+
+    lines.extend(_render_cache_hit_ratio(counters))
+    return "\n".join(lines) + "\n"
+
+
+def _render_cache_hit_ratio(counters: dict[tuple[str, Labels], float]) -> list[str]:
+    totals: dict[str, list[float]] = {}
+    for (name, labels), value in counters.items():
+        if name != "cache_requests_total":
+            continue
+        label_map = dict(labels)
+        hits_and_total = totals.setdefault(label_map["cache"], [0.0, 0.0])
+        hits_and_total[1] += value
+        if label_map["result"] == "hit":
+            hits_and_total[0] += value
+
+    lines = [
+        "# HELP cache_hit_ratio Share of cache lookups served from the cache",
+        "# TYPE cache_hit_ratio gauge",
+    ]
+    for cache_name, (hits, total) in sorted(totals.items()):
+        lines.append(
+            f'cache_hit_ratio{{cache="{cache_name}"}} {_format_number(hits / total if total else 0.0)}'
+        )
+    return lines
+
+
+registry = MetricsRegistry()
+
+
+def configure_registry(directory: str | None, flush_interval: float) -> None:
+    registry.directory = Path(directory) if directory else None
+    registry.flush_interval = flush_interval
+
+
+def record_cache_access(cache_name: str, hit: bool) -> None:
+    registry.inc(
+        "cache_requests_total",
+        {"cache": cache_name, "result": "hit" if hit else "miss"},
+    )
+
+
+def record_query_budget_exceeded(route: str, outcome: str) -> None:
+    registry.inc(
+        "api_query_budget_exceeded_total", {"route": route, "outcome": outcome}
+    )
+
+
+def record_cache_invalidation(table: str, source: str) -> None:
+    registry.inc("cache_invalidations_total", {"table": table, "source": source})
+
+
+def record_single_flight(name: str, leader: bool) -> None:
+    registry.inc(
+        "single_flight_calls_total",
+        {"name": name, "role": "leader" if leader else "follower"},
+    )
+
+
+def record_employee_stream_events(event: str, count: int = 1) -> None:
+    registry.inc("employee_stream_events_total", {"event": event}, count)
@@ -0,0 +1,68 @@
+import cProfile
+import os
+import random
+from datetime import datetime
+from pathlib import Path
+from uuid import uuid4
+
+from django.core import signing
+
+
+PROFILE_HEADER = "X-Profile-Token"
+_SALT = "core.apps.common.profiling"
+_TOKEN_VALUE = "profile"
+
+
+def make_profile_token() -> str:
+    return signing.TimestampSigner(salt=_SALT).sign(_TOKEN_VALUE)
+
+
+def is_valid_profile_token(token: str, max_age: int) -> bool:
+    try:
+        return (
+            signing.TimestampSigner(salt=_SALT).unsign(token, max_age=max_age)
+            == _TOKEN_VALUE
+        )
+    except signing.BadSignature:
+        return False
+
+
+def should_profile(token: str | None, sample_rate: int, max_age: int) -> bool:
+    """Profiles requests with a valid signed token or one in
+    ``sample_rate`` requests."""
+    if token:
+        return is_valid_profile_token(token, max_age)
+
+    return sample_rate > 0 and random.randrange(sample_rate) == 0
+
+
+def store_profile(
+    profiler: cProfile.Profile, directory: str | Path, route: str, keep: int
+) -> Path:
+    route_dir = Path(directory) / route
+    route_dir.mkdir(parents=True, exist_ok=True)
+
+    # Имя начинается с времени до микросекунд: сортировка по имени - по времени
+    path = (
+        route_dir
+        / f"{datetime.now():%Y%m%d-%H%M%S-%f}-{os.getpid()}-{uuid4().hex[:8]}.prof"
+    )
+    profiler.dump_stats(path)
+
+    # Храним только последние `keep` профилей маршрута
+    for old_path in sorted(route_dir.glob("*.prof"))[:-keep]:
+        old_path.unlink(missing_ok=True)
+
+    return path
+
+
+def list_profiles(directory: str | Path) -> dict[str, list[Path]]:
+    directory = Path(directory)
+    if not directory.exists():
+        return {}
+
+    return {
+        route_dir.name: sorted(route_dir.glob("*.prof"))
+        for route_dir in sorted(directory.iterdir())
+        if route_dir.is_dir()
+    }
@@ -0,0 +1,65 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import (
+    connections,
+    DEFAULT_DB_ALIAS,
+)
+
+
+_pinned_to_primary: ContextVar[bool] = ContextVar("pinned_to_primary", default=False)
+
+
+def is_pinned_to_primary() -> bool:
+    return _pinned_to_primary.get()
+
+
+def pin_to_primary() -> None:
+    """Sends every following read of the current context to the primary."""
+    _pinned_to_primary.set(True)
+
+
+@contextmanager
+def use_primary(pinned: bool = True):
+    """Reads inside the block go to the primary (read-your-writes)."""
+    token = _pinned_to_primary.set(pinned)
+    try:
+        yield
+    finally:
+        _pinned_to_primary.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """Routes catalog reads to the replica and everything else to the
+    primary.
+
+    A write pins the current context to the primary, so the rest of the
+    request sees its own changes despite replication lag.
+    """
+
+    def _replica_alias(self) -> str | None:
+        alias = settings.DATABASE_REPLICA_ALIAS
+        return alias if alias in connections.settings else None
+
+    def db_for_read(self, model, **hints) -> str | None:
+        replica = self._replica_alias()
+        if (
+            replica is None
+            or is_pinned_to_primary()
+            or model._meta.app_label not in settings.DATABASE_REPLICA_APP_LABELS
+        ):
+            return DEFAULT_DB_ALIAS
+
+        return replica
+
+    def db_for_write(self, model, **hints) -> str:
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool:
+        # Реплика содержит те же данные, что и основная база
+        return True
+
+    def allow_migrate(self, db: str, app_label: str, **hints) -> bool:
+        return db != self._replica_alias()
@@ -0,0 +1,63 @@
+import threading
+from dataclasses import (
+    dataclass,
+    field,
+)
+from typing import (
+    Any,
+    Callable,
+    Hashable,
+)
+
+from core.apps.common.metrics import record_single_flight
+
+
+@dataclass(eq=False)
+class _Call:
+    done: threading.Event = field(default_factory=threading.Event)
+    result: Any = None
+    error: BaseException | None = None
+
+
+@dataclass(eq=False)
+class SingleFlight:
+    """Coalesces concurrent identical calls within the process.
+
+    The first caller of ``do`` for a key runs the function; callers
+    arriving while it runs wait and get the same result or exception.
+    Nothing is kept after the call: the next caller runs it again.
+    """
+
+    name: str
+    _calls: dict[Hashable, _Call] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def do(self, key: Hashable, function: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        record_single_flight(self.name, leader=leader)
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+    def __len__(self) -> int:
+        return len(self._calls)
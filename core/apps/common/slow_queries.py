@@ -0,0 +1,185 @@
+import json
+import logging
+import re
+import sys
+import threading
+from dataclasses import (
+    dataclass,
+    field,
+)
+from datetime import (
+    datetime,
+    timezone,
+)
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from time import perf_counter
+from typing import (
+    Any,
+    Callable,
+)
+
+from django.db import (
+    DatabaseError,
+    transaction,
+)
+from django.db.backends.signals import connection_created
+
+
+logger = logging.getLogger("core.slow_queries")
+
+_CORE_DIR = str(Path(__file__).resolve().parents[2])
+_COMMON_DIR = str(Path(__file__).resolve().parent)
+
+_PLACEHOLDERS_RE = re.compile(r"%s(?:\s*,\s*%s)+")
+_EXPLAINABLE_RE = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse ``IN (%s, %s, ...)`` lists so that statements of the same
+    shape are grouped together."""
+    return _PLACEHOLDERS_RE.sub("%s, ...", sql)
+
+
+def find_origin() -> str | None:
+    """Returns qualified name of the innermost service method on the
+    stack."""
+    frame = sys._getframe(1)
+    fallback = None
+
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_CORE_DIR) and not filename.startswith(_COMMON_DIR):
+            qualname = f"{frame.f_globals.get('__name__')}.{frame.f_code.co_qualname}"
+            if "/services/" in filename:
+                return qualname
+            fallback = fallback or qualname
+        frame = frame.f_back
+
+    return fallback
+
+
+@dataclass(eq=False)
+class SlowQueryRecorder:
+    """DB execute wrapper that logs statements slower than the threshold
+    together with their EXPLAIN output."""
+
+    threshold_ms: float
+    explain: bool = True
+    _local: threading.local = field(default_factory=threading.local)
+
+    def __call__(
+        self,
+        execute: Callable,
+        sql: str,
+        params: Any,
+        many: bool,
+        context: dict,
+    ) -> Any:
+        if getattr(self._local, "active", False):
+            return execute(sql, params, many, context)
+
+        start = perf_counter()
+        result = execute(sql, params, many, context)
+        duration_ms = (perf_counter() - start) * 1000
+
+        if duration_ms >= self.threshold_ms:
+            self._local.active = True
+            try:
+                self._record(context["connection"], sql, params, many, duration_ms)
+            finally:
+                self._local.active = False
+
+        return result
+
+    def _record(
+        self, connection, sql: str, params: Any, many: bool, duration_ms: float
+    ) -> None:
+        entry = {
+            "time": datetime.now(timezone.utc).isoformat(),
+            "alias": connection.alias,
+            "duration_ms": round(duration_ms, 2),
+            "sql": sql,
+            "params": None if many else params,
+            "origin": find_origin(),
+            "plan": None,
+        }
+
+        if self.explain and not many:
+            entry["plan"] = self._explain(connection, sql, params)
+
+        logger.warning(json.dumps(entry, default=str, ensure_ascii=False))
+
+    def _explain(self, connection, sql: str, params: Any) -> Any:
+        if connection.vendor != "postgresql" or not _EXPLAINABLE_RE.match(sql):
+            return None
+
+        try:
+            # Savepoint/отдельная транзакция: упавший EXPLAIN не должен ломать транзакцию запроса
+            with (
+                transaction.atomic(using=connection.alias),
+                connection.cursor() as cursor,
+            ):
+                cursor.execute(f"EXPLAIN (ANALYZE off, FORMAT JSON) {sql}", params)
+                plan = cursor.fetchone()[0]
+        except DatabaseError:
+            return None
+
+        return json.loads(plan) if isinstance(plan, str) else plan
+
+
+def configure_slow_query_log(
+    path: str | Path, max_bytes: int, backup_count: int
+) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    handler = RotatingFileHandler(
+        path, maxBytes=max_bytes, backupCount=backup_count, delay=True
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+
+    logger.handlers = [handler]
+    logger.setLevel(logging.WARNING)
+    logger.propagate = False
+
+
+def install_recorder(recorder: SlowQueryRecorder, connection) -> None:
+    # Вставляем в начало: execute_wrapper() снимает обёртки с конца списка
+    if recorder not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, recorder)
+
+
+def enable_slow_query_log(
+    threshold_ms: float,
+    explain: bool,
+    path: str | Path,
+    max_bytes: int,
+    backup_count: int,
+) -> SlowQueryRecorder:
+    configure_slow_query_log(path, max_bytes, backup_count)
+    recorder = SlowQueryRecorder(threshold_ms=threshold_ms, explain=explain)
+
+    def on_connection_created(sender, connection, **kwargs):
+        install_recorder(recorder, connection)
+
+    connection_created.connect(
+        on_connection_created, weak=False, dispatch_uid="core.slow_queries"
+    )
+    return recorder
+
+
+def read_entries(path: str | Path) -> list[dict]:
+    """Reads the log and its rotated backups."""
+    path = Path(path)
+    entries = []
+
+    for log_path in sorted(path.parent.glob(f"{path.name}*")):
+        with log_path.open(encoding="utf-8") as file:
+            for line in file:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+
+    return entries
@@ -1,11 +1,25 @@
 from django.contrib import admin
 
-from core.apps.customers.models import CustomerModel
+from core.apps.customers.models import (
+    CodeDeliveryModel,
+    CustomerModel,
+)
 
 
 @admin.register(CustomerModel)
 class CustomerAdmin(admin.ModelAdmin):
-    list_display = ("username", "phone", "token")
-    list_filter = ("username", "phone", "token")
-    search_fields = ("username", "phone", "token")
+    list_display = ("username", "phone")
+    list_filter = ("username", "phone")
+    search_fields = ("username", "phone")
     list_per_page = 10
+
+
+@admin.register(CodeDeliveryModel)
+class CodeDeliveryAdmin(admin.ModelAdmin):
+    list_display = ("phone", "status", "attempts", "next_attempt_at", "created_at")
+    list_filter = ("status",)
+    search_fields = ("phone",)
+    # Код из очереди действует для входа, в админке его не показываем
+    exclude = ("code",)
+    readonly_fields = ("attempts", "last_error")
+    list_per_page = 50
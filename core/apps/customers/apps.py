@@ -5,3 +5,13 @@ class CustomersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core.apps.customers"
     verbose_name = "Пользователи"
+
+    def ready(self):
+        from core.apps.common.invalidation import get_invalidation_bus
+        from core.apps.customers.models import CustomerModel
+        from core.apps.customers.services.customers import invalidate_customer_tokens
+
+        get_invalidation_bus().subscribe(
+            CustomerModel._meta.db_table,
+            invalidate_customer_tokens,
+        )
@@ -12,6 +12,8 @@ class CodeException(ServiceException):
 
 @dataclass(eq=False)
 class CodeNotFoundException(CodeException):
+    code: str
+
     @property
     def message(self) -> str:
         return "Code not found"
@@ -26,3 +28,22 @@ class CodesNotEqualException(CodeException):
     @property
     def message(self) -> str:
         return "Codes are not equal"
+
+
+@dataclass(eq=False)
+class CodeAttemptsExceededException(CodeException):
+    phone: str
+    attempts: int
+
+    @property
+    def message(self) -> str:
+        return "Too many attempts, request a new code later"
+
+
+@dataclass(eq=False)
+class CodeRequestsExceededException(CodeException):
+    phone: str
+
+    @property
+    def message(self) -> str:
+        return "Too many codes requested, try again later"
@@ -17,3 +17,12 @@ class CustomerTokenInvalidException(CustomerException):
     @property
     def message(self) -> str:
         return "Customer token is invalid"
+
+
+@dataclass(eq=False)
+class CustomerNotFoundException(CustomerException):
+    phone: str
+
+    @property
+    def message(self) -> str:
+        return "Customer not found"
@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+
+from core.apps.common.exceptions import ServiceException
+
+
+@dataclass(eq=False)
+class CodeDeliveryQueueFullException(ServiceException):
+    max_pending: int
+
+    @property
+    def message(self) -> str:
+        return "Code delivery queue is full, try again later"
@@ -0,0 +1,12 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.apps.customers.services.codes import DatabaseCodeService
+
+
+class Command(BaseCommand):
+    help = "Delete expired auth codes whose attempt window is over"
+
+    def handle(self, *args, **options):
+        deleted = DatabaseCodeService(window=settings.AUTH_CODE_WINDOW).purge_expired()
+        self.stdout.write(f"Deleted {deleted} expired codes")
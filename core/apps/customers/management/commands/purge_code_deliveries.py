@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.apps.customers.services.delivery import get_code_delivery_queue
+
+
+class Command(BaseCommand):
+    help = "Delete sent and failed code deliveries older than the retention"
+
+    def handle(self, *args, **options):
+        deleted = get_code_delivery_queue().purge_finished()
+        self.stdout.write(f"Deleted {deleted} finished deliveries")
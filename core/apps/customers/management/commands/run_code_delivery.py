@@ -0,0 +1,41 @@
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.apps.customers.services.delivery import build_worker_pool
+
+
+class Command(BaseCommand):
+    help = "Deliver queued auth codes to the SMS gateway"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain due messages and exit",
+        )
+
+    def handle(self, *args, **options):
+        pool = build_worker_pool(options["workers"])
+
+        if options["once"]:
+            total = 0
+            while processed := pool.run_once():
+                total += processed
+            self.stdout.write(f"Processed {total} messages")
+            return
+
+        stopped = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stopped.set())
+
+        pool.start()
+        self.stdout.write(
+            f"Delivering codes with {options['workers']} workers via "
+            f"{settings.CODE_DELIVERY_GATEWAY}",
+        )
+        stopped.wait()
+        pool.stop(timeout=settings.CODE_DELIVERY_LEASE_SECONDS)
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-19 07:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_alter_customermodel_token'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CodeDeliveryModel',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('phone', models.CharField(max_length=20, verbose_name='Телефон')),
+                ('code', models.CharField(max_length=16, verbose_name='Код')),
+                ('status', models.CharField(choices=[('pending', 'Ожидает отправки'), ('sent', 'Отправлен'), ('failed', 'Не доставлен')], default='pending', max_length=16, verbose_name='Статус')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попытки')),
+                ('next_attempt_at', models.DateTimeField(verbose_name='Следующая попытка')),
+                ('last_error', models.TextField(blank=True, default='', verbose_name='Ошибка')),
+            ],
+            options={
+                'verbose_name': 'Отправка кода',
+                'verbose_name_plural': 'Отправка кодов',
+                'db_table': 'code_delivery',
+                'indexes': [models.Index(condition=models.Q(('status', 'pending')), fields=['next_attempt_at'], name='code_delivery_pending_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-19 07:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0003_code_delivery'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthCodeModel',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('phone', models.CharField(max_length=20, unique=True, verbose_name='Телефон')),
+                ('code', models.CharField(max_length=16, verbose_name='Код')),
+                ('expires_at', models.DateTimeField(db_index=True, verbose_name='Действует до')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Неудачные попытки')),
+            ],
+            options={
+                'verbose_name': 'Код авторизации',
+                'verbose_name_plural': 'Коды авторизации',
+                'db_table': 'auth_code',
+            },
+        ),
+    ]
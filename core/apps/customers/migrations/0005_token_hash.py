@@ -0,0 +1,46 @@
+# Generated by Django 5.2.8 on 2026-10-19 07:57
+
+import core.apps.customers.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0004_auth_code'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customermodel',
+            name='token_hash',
+            field=models.BinaryField(max_length=32, null=True, verbose_name='Хеш токена'),
+        ),
+        # Выданные токены продолжают работать: хешируем их на месте
+        migrations.RunSQL(
+            sql="UPDATE customer SET token_hash = sha256(convert_to(token, 'UTF8'))",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AlterField(
+            model_name='customermodel',
+            name='token_hash',
+            field=models.BinaryField(default=core.apps.customers.models.unusable_token_hash, max_length=32, unique=True, verbose_name='Хеш токена'),
+        ),
+        # Обратный путь: RemoveField вернул бы token с одним вычисленным
+        # default для всех строк и упал бы на уникальности. Поэтому колонка
+        # возвращается пустой, заполняется новым uuid на строку и только потом
+        # становится уникальной. Старые токены не восстановить: хранится только хеш
+        migrations.AlterField(
+            model_name='customermodel',
+            name='token',
+            field=models.CharField(max_length=255, null=True, verbose_name='Токен'),
+        ),
+        migrations.RunSQL(
+            sql=migrations.RunSQL.noop,
+            reverse_sql="UPDATE customer SET token = gen_random_uuid()::text",
+        ),
+        migrations.RemoveField(
+            model_name='customermodel',
+            name='token',
+        ),
+    ]
@@ -0,0 +1,54 @@
+from django.db import migrations
+
+
+# NOTIFY после каждого изменяющего запроса: id затронутых строк для InvalidationBus.
+# Триггеры уровня запроса: UPDATE на тысячу строк - одно уведомление, а не тысяча.
+# Больше 300 id (bigint) может не поместиться в payload (8000 байт): тогда ids = null - "сбросить всё"
+CREATE_SQL = """
+CREATE FUNCTION customer_notify_invalidation() RETURNS trigger AS $$
+DECLARE
+    changed_count bigint;
+    changed_ids json;
+BEGIN
+    SELECT count(*), CASE WHEN count(*) <= 300 THEN json_agg(id) END
+    INTO changed_count, changed_ids
+    FROM changed_rows;
+
+    IF changed_count > 0 THEN
+        PERFORM pg_notify(
+            'catalog_invalidation',
+            json_build_object('table', TG_TABLE_NAME, 'ids', changed_ids)::text
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER customer_invalidation_insert
+    AFTER INSERT ON customer REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION customer_notify_invalidation();
+CREATE TRIGGER customer_invalidation_update
+    AFTER UPDATE ON customer REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION customer_notify_invalidation();
+CREATE TRIGGER customer_invalidation_delete
+    AFTER DELETE ON customer REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION customer_notify_invalidation();
+"""
+
+DROP_SQL = """
+DROP TRIGGER customer_invalidation_insert ON customer;
+DROP TRIGGER customer_invalidation_update ON customer;
+DROP TRIGGER customer_invalidation_delete ON customer;
+DROP FUNCTION customer_notify_invalidation();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0005_token_hash'),
+    ]
+
+    operations = [
+        migrations.RunSQL(sql=CREATE_SQL, reverse_sql=DROP_SQL),
+    ]
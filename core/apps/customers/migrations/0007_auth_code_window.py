@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0006_invalidation_trigger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='authcodemodel',
+            name='requests',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='Выпущено кодов'),
+        ),
+        migrations.AddField(
+            model_name='authcodemodel',
+            name='window_started_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Начало окна'),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0007_auth_code_window'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='codedeliverymodel',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['phone'], name='code_delivery_phone_idx'),
+        ),
+    ]
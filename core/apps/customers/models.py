@@ -1,4 +1,5 @@
-from uuid import uuid4
+import hashlib
+import secrets
 
 from django.db import models
 
@@ -6,14 +7,28 @@ from core.apps.common.models import TimedBaseModel
 from core.apps.customers.entities import CustomerEntity
 
 
+def hash_token(token: str) -> bytes:
+    """SHA-256 of the token, the only form in which tokens are stored.
+
+    Tokens are random, so an unsalted digest is enough and keeps the
+    lookup a plain equality on a 32-byte key.
+    """
+    return hashlib.sha256(token.encode()).digest()
+
+
+def unusable_token_hash() -> bytes:
+    # Токен выдаётся только после подтверждения кода, до этого хеш не совпадёт ни с одним токеном
+    return secrets.token_bytes(32)
+
+
 class CustomerModel(TimedBaseModel):
     id = models.BigAutoField(primary_key=True)
     username = models.CharField(max_length=255, verbose_name="Имя пользователя")
     phone = models.CharField(max_length=20, verbose_name="Телефон", unique=True)
-    token = models.CharField(
-        max_length=255,
-        verbose_name="Токен",
-        default=uuid4,
+    token_hash = models.BinaryField(
+        max_length=32,
+        verbose_name="Хеш токена",
+        default=unusable_token_hash,
         unique=True,
     )
 
@@ -33,3 +48,80 @@ class CustomerModel(TimedBaseModel):
             created_at=self.created_at,
             updated_at=self.updated_at,
         )
+
+
+class CodeDeliveryModel(TimedBaseModel):
+    """Outgoing auth code waiting for the SMS gateway.
+
+    ``next_attempt_at`` doubles as a lease: a worker that claims a row
+    moves it forward, so rows of a crashed worker become available again
+    once the lease is over. Every claim counts in ``attempts``.
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = (
+        (STATUS_PENDING, "Ожидает отправки"),
+        (STATUS_SENT, "Отправлен"),
+        (STATUS_FAILED, "Не доставлен"),
+    )
+
+    id = models.BigAutoField(primary_key=True)
+    phone = models.CharField(max_length=20, verbose_name="Телефон")
+    code = models.CharField(max_length=16, verbose_name="Код")
+    status = models.CharField(
+        max_length=16,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        verbose_name="Статус",
+    )
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="Попытки")
+    next_attempt_at = models.DateTimeField(verbose_name="Следующая попытка")
+    last_error = models.TextField(blank=True, default="", verbose_name="Ошибка")
+
+    def __str__(self):
+        return f"{self.phone} ({self.status})"
+
+    class Meta:
+        db_table = "code_delivery"
+        verbose_name = "Отправка кода"
+        verbose_name_plural = "Отправка кодов"
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"],
+                name="code_delivery_pending_idx",
+                condition=models.Q(status="pending"),
+            ),
+            # Поиск ожидающих кодов телефона при постановке нового
+            models.Index(
+                fields=["phone"],
+                name="code_delivery_phone_idx",
+                condition=models.Q(status="pending"),
+            ),
+        ]
+
+
+class AuthCodeModel(TimedBaseModel):
+    """Auth code shared by all workers, one per phone."""
+
+    id = models.BigAutoField(primary_key=True)
+    phone = models.CharField(max_length=20, verbose_name="Телефон", unique=True)
+    code = models.CharField(max_length=16, verbose_name="Код")
+    expires_at = models.DateTimeField(verbose_name="Действует до", db_index=True)
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name="Неудачные попытки"
+    )
+    # Попытки и выпущенные коды считаются в окне, которое переживает новый код
+    window_started_at = models.DateTimeField(verbose_name="Начало окна")
+    requests = models.PositiveSmallIntegerField(
+        default=0, verbose_name="Выпущено кодов"
+    )
+
+    def __str__(self):
+        return self.phone
+
+    class Meta:
+        db_table = "auth_code"
+        verbose_name = "Код авторизации"
+        verbose_name_plural = "Коды авторизации"
@@ -29,7 +29,7 @@ class AuthService(BaseAuthService):
         self.send_service.send_code(code, customer)
 
     def confirm(self, code: str, phone: str):
-        customer = self.customer_service.get_by_phone(phone)
-        self.codes_service.validate_code(code, customer)
+        # Код проверяется до обращения к БД; смена токена - один UPDATE ... RETURNING
+        self.codes_service.validate_code(code, phone)
 
-        return self.customer_service.generate_token(customer)
+        return self.customer_service.generate_token(phone)
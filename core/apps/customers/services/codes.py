@@ -1,16 +1,29 @@
 import random
+import secrets
 from abc import (
     ABC,
     abstractmethod,
 )
+from dataclasses import dataclass
+from datetime import timedelta
 
+from django.conf import settings
 from django.core.cache import cache
+from django.db import (
+    connections,
+    router,
+)
+from django.utils import timezone
+from django.utils.module_loading import import_string
 
 from core.apps.customers.entities import CustomerEntity
 from core.apps.customers.exceptions.codes import (
+    CodeAttemptsExceededException,
     CodeNotFoundException,
+    CodeRequestsExceededException,
     CodesNotEqualException,
 )
+from core.apps.customers.models import AuthCodeModel
 
 
 class BaseCodeService(ABC):
@@ -18,7 +31,7 @@ class BaseCodeService(ABC):
     def generate_code(self, customer: CustomerEntity) -> str: ...
 
     @abstractmethod
-    def validate_code(self, code: str, customer: CustomerEntity) -> None: ...
+    def validate_code(self, code: str, phone: str) -> None: ...
 
 
 class DjangoCacheCodeService(BaseCodeService):
@@ -27,8 +40,8 @@ class DjangoCacheCodeService(BaseCodeService):
         cache.set(customer.phone, code)
         return code
 
-    def validate_code(self, code: str, customer: CustomerEntity) -> None:
-        cached_code = cache.get(customer.phone)
+    def validate_code(self, code: str, phone: str) -> None:
+        cached_code = cache.get(phone)
 
         if cached_code is None:
             raise CodeNotFoundException(code=code)
@@ -37,7 +50,144 @@ class DjangoCacheCodeService(BaseCodeService):
             raise CodesNotEqualException(
                 code=code,
                 cached_code=cached_code,
-                customer_phone=customer.phone,
+                customer_phone=phone,
             )
 
-        cache.delete(customer.phone)
+        cache.delete(phone)
+
+
+_TABLE = AuthCodeModel._meta.db_table
+
+# Новый код не сбрасывает неудачные попытки: счётчики обнуляются только с
+# концом окна. Пока окно идёт, выпускается не больше max_requests кодов -
+# иначе строка не обновляется и RETURNING ничего не возвращает
+UPSERT_CODE_SQL = f"""
+    INSERT INTO {_TABLE} (
+        phone, code, expires_at, attempts, window_started_at, requests,
+        created_at, updated_at
+    )
+    VALUES (%(phone)s, %(code)s, %(expires_at)s, 0, %(now)s, 1, %(now)s, %(now)s)
+    ON CONFLICT (phone) DO UPDATE SET
+        code = EXCLUDED.code,
+        expires_at = EXCLUDED.expires_at,
+        attempts = CASE
+            WHEN {_TABLE}.window_started_at > %(window_start)s THEN {_TABLE}.attempts
+            ELSE 0
+        END,
+        requests = CASE
+            WHEN {_TABLE}.window_started_at > %(window_start)s THEN {_TABLE}.requests + 1
+            ELSE 1
+        END,
+        window_started_at = CASE
+            WHEN {_TABLE}.window_started_at > %(window_start)s
+            THEN {_TABLE}.window_started_at
+            ELSE EXCLUDED.window_started_at
+        END,
+        updated_at = EXCLUDED.updated_at
+    WHERE {_TABLE}.window_started_at <= %(window_start)s
+        OR {_TABLE}.requests < %(max_requests)s
+    RETURNING id
+"""
+
+# Сравнение и удаление одним запросом: код нельзя использовать дважды даже параллельно
+CONSUME_CODE_SQL = f"""
+    DELETE FROM {_TABLE}
+    WHERE phone = %s AND code = %s AND expires_at > %s AND attempts < %s
+    RETURNING id
+"""
+
+REGISTER_FAILURE_SQL = f"""
+    UPDATE {_TABLE}
+    SET attempts = attempts + 1, updated_at = %s
+    WHERE phone = %s AND expires_at > %s
+    RETURNING attempts, code
+"""
+
+# Строка с истёкшим кодом хранит счётчики до конца окна
+PURGE_EXPIRED_SQL = f"""
+    DELETE FROM {_TABLE} WHERE expires_at <= %s AND window_started_at <= %s
+"""
+
+
+@dataclass(eq=False)
+class DatabaseCodeService(BaseCodeService):
+    """Codes in the shared ``auth_code`` table.
+
+    Every worker sees the same codes, codes expire after ``ttl`` seconds.
+    Within a ``window`` starting at its first code a phone gets at most
+    ``max_requests`` codes and ``max_attempts`` wrong guesses in total,
+    so requesting a new code does not reset the guesses.
+    """
+
+    ttl: float = 300.0
+    max_attempts: int = 5
+    window: float = 3600.0
+    max_requests: int = 5
+
+    def _execute(self, sql: str, params: list | dict) -> tuple | None:
+        using = router.db_for_write(AuthCodeModel)
+        with connections[using].cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchone() if cursor.description else None
+
+    def generate_code(self, customer: CustomerEntity) -> str:
+        code = str(1000 + secrets.randbelow(9000))
+        now = timezone.now()
+        upserted = self._execute(
+            UPSERT_CODE_SQL,
+            {
+                "phone": customer.phone,
+                "code": code,
+                "expires_at": now + timedelta(seconds=self.ttl),
+                "now": now,
+                "window_start": now - timedelta(seconds=self.window),
+                "max_requests": self.max_requests,
+            },
+        )
+        if upserted is None:
+            raise CodeRequestsExceededException(phone=customer.phone)
+
+        return code
+
+    def validate_code(self, code: str, phone: str) -> None:
+        now = timezone.now()
+
+        if self._execute(CONSUME_CODE_SQL, [phone, code, now, self.max_attempts]):
+            return
+
+        failure = self._execute(REGISTER_FAILURE_SQL, [now, phone, now])
+        if failure is None:
+            raise CodeNotFoundException(code=code)
+
+        attempts, stored_code = failure
+        if attempts > self.max_attempts:
+            raise CodeAttemptsExceededException(phone=phone, attempts=attempts)
+
+        raise CodesNotEqualException(
+            code=code,
+            cached_code=stored_code,
+            customer_phone=phone,
+        )
+
+    def purge_expired(self) -> int:
+        using = router.db_for_write(AuthCodeModel)
+        with connections[using].cursor() as cursor:
+            now = timezone.now()
+            cursor.execute(
+                PURGE_EXPIRED_SQL,
+                [now, now - timedelta(seconds=self.window)],
+            )
+            return cursor.rowcount
+
+
+def get_code_service() -> BaseCodeService:
+    code_service_class = import_string(settings.AUTH_CODE_SERVICE)
+    if issubclass(code_service_class, DatabaseCodeService):
+        return code_service_class(
+            ttl=settings.AUTH_CODE_TTL,
+            max_attempts=settings.AUTH_CODE_MAX_ATTEMPTS,
+            window=settings.AUTH_CODE_WINDOW,
+            max_requests=settings.AUTH_CODE_MAX_REQUESTS,
+        )
+
+    return code_service_class()
@@ -2,11 +2,25 @@ from abc import (
     ABC,
     abstractmethod,
 )
+from dataclasses import dataclass
+from functools import cache
 from uuid import uuid4
 
+from django.conf import settings
+from django.db import router
+from django.utils import timezone
+
+from core.apps.common.cache import TTLCache
 from core.apps.customers.entities import CustomerEntity
-from core.apps.customers.exceptions.customer import CustomerTokenInvalidException
-from core.apps.customers.models import CustomerModel
+from core.apps.customers.exceptions.customer import (
+    CustomerNotFoundException,
+    CustomerTokenInvalidException,
+)
+from core.apps.customers.models import (
+    CustomerModel,
+    hash_token,
+    unusable_token_hash,
+)
 
 
 class BaseCustomerService(ABC):
@@ -14,7 +28,7 @@ class BaseCustomerService(ABC):
     def get_or_create(self, phone: str) -> CustomerEntity: ...
 
     @abstractmethod
-    def generate_token(self, customer: CustomerEntity) -> str: ...
+    def generate_token(self, phone: str) -> str: ...
 
     @abstractmethod
     def get_by_phone(self, phone: str) -> CustomerEntity: ...
@@ -23,9 +37,37 @@ class BaseCustomerService(ABC):
     def get_by_token(self, token: str) -> CustomerEntity: ...
 
 
+_CUSTOMER_COLUMNS = "id, username, phone, created_at, updated_at"
+
+# Один запрос вместо SELECT + INSERT в транзакции get_or_create.
+# DO UPDATE (а не DO NOTHING), чтобы RETURNING вернул и уже существующую строку
+UPSERT_CUSTOMER_SQL = f"""
+    INSERT INTO {CustomerModel._meta.db_table} (phone, username, token_hash, created_at, updated_at)
+    VALUES (%s, %s, %s, %s, %s)
+    ON CONFLICT (phone) DO UPDATE SET updated_at = EXCLUDED.updated_at
+    RETURNING {_CUSTOMER_COLUMNS}
+"""
+
+ROTATE_TOKEN_SQL = f"""
+    UPDATE {CustomerModel._meta.db_table}
+    SET token_hash = %s, updated_at = %s
+    WHERE phone = %s
+    RETURNING {_CUSTOMER_COLUMNS}
+"""
+
+
 class ORMCustomerService(BaseCustomerService):
+    def _execute_returning(self, sql: str, params: list) -> CustomerModel | None:
+        using = router.db_for_write(CustomerModel)
+        rows = list(CustomerModel.objects.raw(sql, params, using=using))
+        return rows[0] if rows else None
+
     def get_or_create(self, phone: str) -> CustomerEntity:
-        customer_dto, _ = CustomerModel.objects.get_or_create(phone=phone)
+        now = timezone.now()
+        customer_dto = self._execute_returning(
+            UPSERT_CUSTOMER_SQL,
+            [phone, "", unusable_token_hash(), now, now],
+        )
 
         return customer_dto.to_entity()
 
@@ -33,15 +75,99 @@ class ORMCustomerService(BaseCustomerService):
         customer_dto = CustomerModel.objects.get(phone=phone)
         return customer_dto.to_entity()
 
-    def generate_token(self, customer: CustomerEntity) -> str:
-        new_token = str(uuid4())
-        CustomerModel.objects.filter(phone=customer.phone).update(token=new_token)
-        return new_token
+    def generate_token(self, phone: str) -> str:
+        # В базе остаётся только хеш, сам токен отдаётся клиенту один раз
+        token = str(uuid4())
+        customer_dto = self._execute_returning(
+            ROTATE_TOKEN_SQL,
+            [hash_token(token), timezone.now(), phone],
+        )
+
+        if customer_dto is None:
+            raise CustomerNotFoundException(phone=phone)
+
+        return token
 
     def get_by_token(self, token: str) -> CustomerEntity:
         try:
-            customer_dto = CustomerModel.objects.get(token=token)
+            customer_dto = CustomerModel.objects.get(token_hash=hash_token(token))
         except CustomerModel.DoesNotExist:
             raise CustomerTokenInvalidException(token=token)
 
         return customer_dto.to_entity()
+
+
+@dataclass(eq=False)
+class CachedCustomerService(BaseCustomerService):
+    """Resolves tokens through an in-process LRU+TTL cache.
+
+    A cache hit issues no queries. Token rotation through this service
+    drops the old token right away; other processes forget it on the
+    invalidation notification or, without it, once the entry expires.
+    """
+
+    customer_service: BaseCustomerService
+    cache: TTLCache
+
+    def get_or_create(self, phone: str) -> CustomerEntity:
+        return self.customer_service.get_or_create(phone)
+
+    def get_by_phone(self, phone: str) -> CustomerEntity:
+        return self.customer_service.get_by_phone(phone)
+
+    def generate_token(self, phone: str) -> str:
+        new_token = self.customer_service.generate_token(phone)
+        self.invalidate(phone)
+        return new_token
+
+    def get_by_token(self, token: str) -> CustomerEntity:
+        customer = self.cache.get(("token", token))
+        if customer is None:
+            customer = self.customer_service.get_by_token(token)
+            # Действителен только последний токен: прежний, если он ещё
+            # в кеше, уже сменён
+            old_token = self.cache.get(("phone", customer.phone))
+            if old_token is not None and old_token != token:
+                self.cache.delete(("token", old_token))
+            self.cache.set(("token", token), customer)
+
+        self._index(token, customer)
+        return customer
+
+    def _index(self, token: str, customer: CustomerEntity) -> None:
+        # Обратные индексы для инвалидации при смене токена и по NOTIFY.
+        # Обновляются на каждом попадании после записи токена, поэтому LRU
+        # вытесняет их не раньше самого токена
+        self.cache.set(("phone", customer.phone), token)
+        self.cache.set(("id", customer.id), token)
+
+    def invalidate(self, phone: str) -> None:
+        old_token = self.cache.pop(("phone", phone))
+        if old_token is not None:
+            self.cache.delete(("token", old_token))
+
+
+@cache
+def get_customer_token_cache() -> TTLCache:
+    return TTLCache(
+        name="customer_tokens",
+        maxsize=settings.CUSTOMER_TOKEN_CACHE_SIZE,
+        ttl=settings.CUSTOMER_TOKEN_CACHE_TTL,
+    )
+
+
+def invalidate_customer_tokens(ids: list[int] | None) -> None:
+    """Evicts cached tokens of the customers, all of them for ``None``."""
+    cache = get_customer_token_cache()
+    if ids is None:
+        cache.clear()
+        return
+
+    for customer_id in ids:
+        token = cache.pop(("id", customer_id))
+        if token is None:
+            continue
+
+        customer = cache.pop(("token", token))
+        if customer is not None:
+            cache.delete(("phone", customer.phone))
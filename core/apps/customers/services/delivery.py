@@ -0,0 +1,287 @@
+import logging
+import threading
+from dataclasses import (
+    dataclass,
+    field,
+)
+from datetime import timedelta
+from functools import cache
+
+from django.conf import settings
+from django.db import (
+    connections,
+    router,
+    transaction,
+)
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from core.apps.customers.exceptions.delivery import CodeDeliveryQueueFullException
+from core.apps.customers.models import CodeDeliveryModel
+from core.apps.customers.services.gateways import (
+    BaseSmsGateway,
+    CodeMessage,
+)
+
+
+logger = logging.getLogger("core.code_delivery")
+
+_TABLE = CodeDeliveryModel._meta.db_table
+
+# Вставка и проверка длины очереди одним запросом: при переполнении строка не вставляется
+ENQUEUE_SQL = f"""
+    INSERT INTO {_TABLE}
+        (phone, code, status, attempts, next_attempt_at, last_error, created_at, updated_at)
+    SELECT %s, %s, %s, 0, %s, '', %s, %s
+    WHERE (
+        SELECT count(*) FROM (
+            SELECT 1 FROM {_TABLE} WHERE status = %s LIMIT %s
+        ) AS pending
+    ) < %s
+    RETURNING id
+"""
+
+
+@dataclass(eq=False)
+class CodeDeliveryQueue:
+    """Durable queue of outgoing codes on top of the ``code_delivery``
+    table."""
+
+    max_pending: int = 10000
+    max_attempts: int = 5
+    retry_backoff: float = 2.0
+    lease_seconds: float = 30.0
+    # Сколько хранить отправленные и недоставленные строки
+    retention: timedelta = timedelta(hours=24)
+
+    def enqueue(self, phone: str, code: str) -> int:
+        """Queues the code, superseding codes still waiting for the phone."""
+        now = timezone.now()
+        using = router.db_for_write(CodeDeliveryModel)
+
+        with transaction.atomic(using=using), connections[using].cursor() as cursor:
+            # Старый код уже недействителен: отправлять его после нового незачем
+            CodeDeliveryModel.objects.using(using).filter(
+                phone=phone,
+                status=CodeDeliveryModel.STATUS_PENDING,
+            ).update(
+                status=CodeDeliveryModel.STATUS_FAILED,
+                code="",
+                last_error="Superseded by a newer code",
+                updated_at=now,
+            )
+            cursor.execute(
+                ENQUEUE_SQL,
+                [
+                    phone,
+                    code,
+                    CodeDeliveryModel.STATUS_PENDING,
+                    now,
+                    now,
+                    now,
+                    CodeDeliveryModel.STATUS_PENDING,
+                    self.max_pending,
+                    self.max_pending,
+                ],
+            )
+            row = cursor.fetchone()
+
+        if row is None:
+            raise CodeDeliveryQueueFullException(max_pending=self.max_pending)
+
+        return row[0]
+
+    def claim(self, batch_size: int) -> list[CodeMessage]:
+        """Leases up to ``batch_size`` due messages to the caller.
+
+        Each claim counts as an attempt, so a message whose worker crashed
+        or hung past the lease still runs out of ``max_attempts``.
+        """
+        now = timezone.now()
+
+        with transaction.atomic(using=router.db_for_write(CodeDeliveryModel)):
+            rows = list(
+                CodeDeliveryModel.objects.select_for_update(skip_locked=True)
+                .filter(
+                    status=CodeDeliveryModel.STATUS_PENDING,
+                    next_attempt_at__lte=now,
+                )
+                .order_by("next_attempt_at")
+                .values("id", "phone", "code", "attempts")[:batch_size],
+            )
+            # Исчерпанная попытка снова в очереди только если аренда истекла
+            expired = [row for row in rows if row["attempts"] >= self.max_attempts]
+            rows = [row for row in rows if row["attempts"] < self.max_attempts]
+            if expired:
+                CodeDeliveryModel.objects.filter(
+                    id__in=[row["id"] for row in expired],
+                ).update(
+                    status=CodeDeliveryModel.STATUS_FAILED,
+                    code="",
+                    last_error="Lease expired",
+                    updated_at=now,
+                )
+            if rows:
+                CodeDeliveryModel.objects.filter(
+                    id__in=[row["id"] for row in rows],
+                ).update(
+                    attempts=F("attempts") + 1,
+                    next_attempt_at=now + timedelta(seconds=self.lease_seconds),
+                    updated_at=now,
+                )
+
+        return [CodeMessage(**{**row, "attempts": row["attempts"] + 1}) for row in rows]
+
+    def complete(self, messages: list[CodeMessage]) -> None:
+        if not messages:
+            return
+
+        CodeDeliveryModel.objects.filter(
+            id__in=[message.id for message in messages]
+        ).update(
+            status=CodeDeliveryModel.STATUS_SENT,
+            # Код больше не нужен, в таблице он не хранится
+            code="",
+            updated_at=timezone.now(),
+        )
+
+    def retry(self, messages: list[CodeMessage], error: str) -> None:
+        """Schedules failed messages with exponential backoff or gives up
+        after ``max_attempts``."""
+        now = timezone.now()
+        by_attempts: dict[int, list[int]] = {}
+        for message in messages:
+            # attempts уже учитывает эту попытку: её засчитал claim
+            by_attempts.setdefault(message.attempts, []).append(message.id)
+
+        for attempts, ids in by_attempts.items():
+            if attempts >= self.max_attempts:
+                changes = {"status": CodeDeliveryModel.STATUS_FAILED, "code": ""}
+            else:
+                delay = self.retry_backoff * 2 ** (attempts - 1)
+                changes = {"next_attempt_at": now + timedelta(seconds=delay)}
+
+            CodeDeliveryModel.objects.filter(id__in=ids).update(
+                last_error=error[:1000],
+                updated_at=now,
+                **changes,
+            )
+
+    def purge_finished(self) -> int:
+        """Deletes sent and failed rows older than ``retention``."""
+        deleted, _ = CodeDeliveryModel.objects.filter(
+            status__in=[
+                CodeDeliveryModel.STATUS_SENT,
+                CodeDeliveryModel.STATUS_FAILED,
+            ],
+            updated_at__lt=timezone.now() - self.retention,
+        ).delete()
+        return deleted
+
+
+@dataclass(eq=False)
+class CodeDeliveryWorkerPool:
+    """Background threads that drain the queue into the gateway in
+    batches."""
+
+    queue: CodeDeliveryQueue
+    gateway: BaseSmsGateway
+    workers: int = 2
+    batch_size: int = 50
+    poll_interval: float = 1.0
+    _threads: list[threading.Thread] = field(default_factory=list)
+    _stopping: threading.Event = field(default_factory=threading.Event)
+    _wakeup: threading.Event = field(default_factory=threading.Event)
+
+    def start(self) -> None:
+        self._stopping.clear()
+        for number in range(self.workers):
+            thread = threading.Thread(
+                target=self._run,
+                name=f"code-delivery-{number}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads.clear()
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    def run_once(self) -> int:
+        """Claims and delivers one batch, returns its size."""
+        messages = self.queue.claim(self.batch_size)
+        if not messages:
+            return 0
+
+        try:
+            results = self.gateway.send_batch(messages)
+        except Exception as error:
+            logger.exception("Code delivery batch of %s failed", len(messages))
+            self.queue.retry(messages, repr(error))
+            return len(messages)
+
+        delivered = [message for message, ok in zip(messages, results) if ok]
+        failed = [message for message, ok in zip(messages, results) if not ok]
+        self.queue.complete(delivered)
+        if failed:
+            self.queue.retry(failed, "Rejected by gateway")
+
+        return len(messages)
+
+    def _run(self) -> None:
+        try:
+            while not self._stopping.is_set():
+                try:
+                    processed = self.run_once()
+                except Exception:
+                    logger.exception("Code delivery worker error")
+                    processed = 0
+
+                # Полный батч - очередь, скорее всего, не пуста, забираем следующий сразу
+                if processed < self.batch_size:
+                    self._wakeup.wait(self.poll_interval)
+                    self._wakeup.clear()
+        finally:
+            connections.close_all()
+
+
+def get_code_delivery_queue() -> CodeDeliveryQueue:
+    return CodeDeliveryQueue(
+        max_pending=settings.CODE_DELIVERY_MAX_PENDING,
+        max_attempts=settings.CODE_DELIVERY_MAX_ATTEMPTS,
+        retry_backoff=settings.CODE_DELIVERY_RETRY_BACKOFF,
+        lease_seconds=settings.CODE_DELIVERY_LEASE_SECONDS,
+        retention=timedelta(hours=settings.CODE_DELIVERY_RETENTION_HOURS),
+    )
+
+
+def build_worker_pool(workers: int) -> CodeDeliveryWorkerPool:
+    return CodeDeliveryWorkerPool(
+        queue=get_code_delivery_queue(),
+        gateway=import_string(settings.CODE_DELIVERY_GATEWAY)(),
+        workers=workers,
+        batch_size=settings.CODE_DELIVERY_BATCH_SIZE,
+        poll_interval=settings.CODE_DELIVERY_POLL_INTERVAL,
+    )
+
+
+@cache
+def get_in_process_worker_pool() -> CodeDeliveryWorkerPool | None:
+    """Worker pool running inside the web process, started on first use.
+
+    ``None`` when delivery is left to the ``run_code_delivery`` command.
+    """
+    if settings.CODE_DELIVERY_IN_PROCESS_WORKERS <= 0:
+        return None
+
+    pool = build_worker_pool(settings.CODE_DELIVERY_IN_PROCESS_WORKERS)
+    pool.start()
+    return pool
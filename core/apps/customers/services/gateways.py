@@ -0,0 +1,33 @@
+from abc import (
+    ABC,
+    abstractmethod,
+)
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class CodeMessage:
+    id: int
+    phone: str
+    code: str
+    attempts: int = 0
+
+
+class BaseSmsGateway(ABC):
+    @abstractmethod
+    def send_batch(self, messages: list[CodeMessage]) -> list[bool]:
+        """Delivers messages, returns per-message success in the same
+        order.
+
+        An exception fails the whole batch.
+        """
+
+
+class ConsoleSmsGateway(BaseSmsGateway):
+    """Local stand-in for the SMS provider."""
+
+    def send_batch(self, messages: list[CodeMessage]) -> list[bool]:
+        for message in messages:
+            print(f"Sending code {message.code} to customer {message.phone}")
+
+        return [True] * len(messages)
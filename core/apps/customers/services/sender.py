@@ -2,8 +2,13 @@ from abc import (
     ABC,
     abstractmethod,
 )
+from dataclasses import dataclass
 
 from core.apps.customers.entities import CustomerEntity
+from core.apps.customers.services.delivery import (
+    CodeDeliveryQueue,
+    CodeDeliveryWorkerPool,
+)
 
 
 class BaseSenderService(ABC):
@@ -14,3 +19,21 @@ class BaseSenderService(ABC):
 class DummySendService(BaseSenderService):
     def send_code(self, code: str, customer: CustomerEntity) -> None:
         print(f"Sending code {code} to customer {customer.phone}")
+
+
+@dataclass(eq=False)
+class QueuedSendService(BaseSenderService):
+    """Puts the code into the delivery queue and returns immediately.
+
+    Raises ``CodeDeliveryQueueFullException`` when the queue is over its
+    limit.
+    """
+
+    queue: CodeDeliveryQueue
+    worker_pool: CodeDeliveryWorkerPool | None = None
+
+    def send_code(self, code: str, customer: CustomerEntity) -> None:
+        self.queue.enqueue(customer.phone, code)
+
+        if self.worker_pool is not None:
+            self.worker_pool.wake()
@@ -1,9 +1,45 @@
 # Register your models here.
 from django.contrib import admin
 
+from core.apps.common.admin import (
+    EstimatedCountPaginator,
+    InputFilter,
+)
 from core.apps.employee.models import EmployeeModel
 
 
+class ManagerFilter(InputFilter):
+    """Manager by id or by the beginning of the last name."""
+
+    title = "Начальник"
+    parameter_name = "manager"
+
+    def queryset(self, request, queryset):
+        value = (self.value() or "").strip()
+        if not value:
+            return queryset
+
+        if value.isdigit():
+            return queryset.filter(manager_id=int(value))
+
+        return queryset.filter(manager__last_name__istartswith=value)
+
+
+class PositionFilter(InputFilter):
+    """Position by its beginning instead of a DISTINCT list of all
+    positions."""
+
+    title = "Должность"
+    parameter_name = "position"
+
+    def queryset(self, request, queryset):
+        value = (self.value() or "").strip()
+        if not value:
+            return queryset
+
+        return queryset.filter(position__istartswith=value)
+
+
 @admin.register(EmployeeModel)
 class EmployeeAdmin(admin.ModelAdmin):
     list_display = (
@@ -13,10 +49,21 @@ class EmployeeAdmin(admin.ModelAdmin):
         "salary",
         "manager",
     )
-    list_filter = ("position", "date_hired", "manager")
-    search_fields = ("first_name", "last_name", "middle_name")
+    # Фильтры не загружают варианты из таблицы: ввод значения и date_hierarchy
+    list_filter = (ManagerFilter, PositionFilter)
+    date_hierarchy = "date_hired"
+    # Поиск по началу строки использует индексы UPPER(...) text_pattern_ops
+    search_fields = ("^last_name", "^first_name", "^middle_name")
     list_per_page = 10
+    # Порядок по первичному ключу не требует сортировки таблицы
+    ordering = ("-id",)
     list_select_related = ("manager",)
+    paginator = EstimatedCountPaginator
+    # Без второго COUNT(*) по всей таблице при активном фильтре и без подсчёта фасетов
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+    # Выбор начальника через поиск вместо <select> со всеми сотрудниками
+    autocomplete_fields = ("manager",)
 
     fieldsets = (
         (
@@ -5,3 +5,16 @@ class EmployeeConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core.apps.employee"
     verbose_name = "Сотрудники"
+
+    def ready(self):
+        from core.apps.common.invalidation import get_invalidation_bus
+        from core.apps.employee.models import (
+            EmployeeListingModel,
+            EmployeeModel,
+        )
+        from core.apps.employee.signals import invalidate_employee_cache_by_ids
+
+        bus = get_invalidation_bus()
+        # Страницы из employee_listing устаревают после его обновления
+        for model in (EmployeeModel, EmployeeListingModel):
+            bus.subscribe(model._meta.db_table, invalidate_employee_cache_by_ids)
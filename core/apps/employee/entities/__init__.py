@@ -1 +1,2 @@
+from .changes import *  # noqa
 from .employee import *  # noqa
@@ -0,0 +1,34 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from core.apps.employee.entities.employee import EmployeeEntity
+
+
+@dataclass
+class EmployeeChangeEntity:
+    id: int
+    changed_at: datetime
+    deleted: bool = False
+    # Текущее состояние сотрудника; None для удалённого
+    employee: EmployeeEntity | None = None
+
+
+@dataclass
+class EmployeeChangesEntity:
+    items: list[EmployeeChangeEntity]
+    # Курсор, с которого продолжать; без изменений - тот же, что в запросе
+    cursor: str | None
+    has_more: bool
+
+
+@dataclass
+class EmployeeChangeEventEntity:
+    # insert / update / delete; reset - события потеряны, перечитать список
+    event: str
+    id: int | None = None
+    # Новые значения изменённых полей (для insert - все поля)
+    fields: dict[str, Any] | None = None
+    manager_id: int | None = None
+    # Входит ли сотрудник в подписку после изменения; false - убрать из списка
+    matches: bool = True
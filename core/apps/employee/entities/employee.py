@@ -15,6 +15,9 @@ class EmployeeEntity:
     position: str
     date_hired: datetime
     salary: float
+    manager_id: int | None = field(default=None, kw_only=True)
     manager: Optional["EmployeeEntity"] = field(default=None, kw_only=True)
+    # Заполняется только при запросе с include=subordinates
+    subordinates: list["EmployeeEntity"] | None = field(default=None, kw_only=True)
     created_at: datetime
     updated_at: datetime
@@ -0,0 +1,29 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from core.apps.common.exceptions import ServiceException
+
+
+@dataclass(eq=False)
+class ChangeCursorException(ServiceException):
+    cursor: str
+
+    @property
+    def message(self) -> str:
+        return "Change feed cursor exception occurred"
+
+
+@dataclass(eq=False)
+class ChangeCursorInvalidException(ChangeCursorException):
+    @property
+    def message(self) -> str:
+        return "Malformed change feed cursor"
+
+
+@dataclass(eq=False)
+class ChangeCursorExpiredException(ChangeCursorException):
+    horizon: datetime
+
+    @property
+    def message(self) -> str:
+        return "Cursor is older than retained deletions, resync from scratch"
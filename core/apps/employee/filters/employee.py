@@ -2,11 +2,24 @@ from datetime import (
     date,
     datetime,
 )
+from typing import (
+    Any,
+    Literal,
+)
 
-from pydantic import BaseModel
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    field_validator,
+    PrivateAttr,
+)
 
 
 class EmployeeFilters(BaseModel):
+    # Неизменяемы: ключ и предикат считаются один раз на экземпляр
+    # (см. filters.compiler) и переиспользуются списком, счётчиком и кешем
+    model_config = ConfigDict(frozen=True)
+
     # ID фильтры
     id: int | None = None
     ids: list[int] | None = None
@@ -30,9 +43,55 @@ class EmployeeFilters(BaseModel):
 
     # Фильтр по менеджеру
     manager_id: int | None = None
+    # false - только корни оргструктуры (без начальника)
+    has_manager: bool | None = None
 
     # Фильтры по датам создания и обновления (диапазон)
     created_at_from: datetime | None = None
     created_at_to: datetime | None = None
     updated_at_from: datetime | None = None
     updated_at_to: datetime | None = None
+
+    _key: tuple | None = PrivateAttr(default=None)
+    _predicate: Any = PrivateAttr(default=None)
+
+    @property
+    def has_text_search(self) -> bool:
+        # Поиск по подстроке не использует индексы и стоит дороже остальных фильтров
+        return any(
+            (
+                self.first_name,
+                self.last_name,
+                self.middle_name,
+                self.position,
+                self.search,
+            ),
+        )
+
+
+EmployeeRelation = Literal["manager", "subordinates"]
+
+
+class EmployeeIncludes(BaseModel):
+    # Связанные данные в ответе: include=manager,subordinates
+    include: list[EmployeeRelation] = []
+
+    @field_validator("include", mode="before")
+    @classmethod
+    def split_include(cls, value):
+        if isinstance(value, str):
+            value = [value]
+        return [
+            relation.strip()
+            for item in value
+            for relation in item.split(",")
+            if relation.strip()
+        ]
+
+    @property
+    def manager(self) -> bool:
+        return "manager" in self.include
+
+    @property
+    def subordinates(self) -> bool:
+        return "subordinates" in self.include
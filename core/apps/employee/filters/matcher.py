@@ -0,0 +1,67 @@
+from datetime import datetime
+from typing import (
+    Any,
+    Callable,
+)
+
+from django.utils import timezone
+
+from core.apps.employee.entities import EmployeeEntity
+from core.apps.employee.filters.compiler import filters_key
+from core.apps.employee.filters.employee import EmployeeFilters
+
+
+def _contains(field: str, value: str) -> bool:
+    # Как icontains в Postgres: UPPER(col) LIKE UPPER('%value%')
+    return value.upper() in field.upper()
+
+
+def _search(employee: EmployeeEntity, value: str) -> bool:
+    return any(
+        _contains(field, value)
+        for field in (
+            employee.first_name,
+            employee.last_name,
+            employee.middle_name,
+            employee.position,
+        )
+    )
+
+
+def _aware(value: datetime) -> datetime:
+    # Дата без зоны в запросе трактуется в зоне проекта, как при сравнении в базе
+    return timezone.make_aware(value) if timezone.is_naive(value) else value
+
+
+def _date(value: datetime) -> Any:
+    return value.date() if isinstance(value, datetime) else value
+
+
+# Те же фильтры, что в FILTER_LOOKUPS, но по уже загруженному сотруднику:
+# поток изменений проверяет подписки без запросов к базе
+FILTER_PREDICATES: dict[str, Callable[[EmployeeEntity, Any], bool]] = {
+    "id": lambda employee, value: employee.id == value,
+    "ids": lambda employee, value: employee.id in value,
+    "first_name": lambda employee, value: _contains(employee.first_name, value),
+    "last_name": lambda employee, value: _contains(employee.last_name, value),
+    "middle_name": lambda employee, value: _contains(employee.middle_name, value),
+    "position": lambda employee, value: _contains(employee.position, value),
+    "search": _search,
+    "date_hired_from": lambda employee, value: _date(employee.date_hired) >= value,
+    "date_hired_to": lambda employee, value: _date(employee.date_hired) <= value,
+    "salary_min": lambda employee, value: employee.salary >= value,
+    "salary_max": lambda employee, value: employee.salary <= value,
+    "manager_id": lambda employee, value: employee.manager_id == value,
+    "has_manager": lambda employee, value: (employee.manager_id is not None) == value,
+    "created_at_from": lambda employee, value: employee.created_at >= _aware(value),
+    "created_at_to": lambda employee, value: employee.created_at <= _aware(value),
+    "updated_at_from": lambda employee, value: employee.updated_at >= _aware(value),
+    "updated_at_to": lambda employee, value: employee.updated_at <= _aware(value),
+}
+
+
+def match_employee_filters(filters: EmployeeFilters, employee: EmployeeEntity) -> bool:
+    """Whether the employee is in the result of the filters."""
+    return all(
+        FILTER_PREDICATES[name](employee, value) for name, value in filters_key(filters)
+    )
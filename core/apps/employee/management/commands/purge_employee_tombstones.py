@@ -0,0 +1,17 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.apps.employee.services import ORMEmployeeChangesService
+
+
+class Command(BaseCommand):
+    help = "Delete employee tombstones older than the change feed retention"
+
+    def handle(self, *args, **options):
+        service = ORMEmployeeChangesService(
+            tombstone_retention=timedelta(days=settings.EMPLOYEE_TOMBSTONE_RETENTION_DAYS),
+        )
+        deleted = service.purge_expired()
+        self.stdout.write(f"Deleted {deleted} expired tombstones")
@@ -0,0 +1,58 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from core.apps.common.invalidation import get_invalidation_bus
+from core.apps.employee.models import EmployeeModel
+from core.apps.employee.services.listing import build_listing_refresher
+from core.apps.employee.services.warmup import get_employee_cache_warmer
+
+
+class Command(BaseCommand):
+    help = (
+        "Refresh the employee_listing materialized view after employee "
+        "changes (REFRESH MATERIALIZED VIEW CONCURRENTLY)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Refresh once and exit",
+        )
+
+    def handle(self, *args, **options):
+        refresher = build_listing_refresher()
+        warmer = get_employee_cache_warmer()
+        # Общий кеш страниц сбрасывает тот, кто обновил представление,
+        # воркеры по NOTIFY сбрасывают только свой locmem
+        if warmer is not None and not warmer.service.local:
+            refresher.on_refresh = warmer.invalidate
+
+        if options["once"]:
+            refreshed = refresher.refresh()
+            self.stdout.write("Refreshed" if refreshed else "Refresh already running")
+            return
+
+        stopped = threading.Event()
+
+        def stop(*_):
+            stopped.set()
+            refresher.mark_dirty()
+
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, stop)
+
+        # Изменения employee приходят через NOTIFY; при подключении шина
+        # вызывает обработчики с None, так что первое обновление - сразу
+        bus = get_invalidation_bus()
+        bus.subscribe(EmployeeModel._meta.db_table, refresher.mark_dirty)
+        bus.start()
+
+        self.stdout.write(
+            f"Refreshing employee_listing at most every {refresher.min_interval}s, "
+            f"at least every {refresher.max_interval}s",
+        )
+        refresher.run(stopped)
+        bus.stop(timeout=bus.poll_interval * 2)
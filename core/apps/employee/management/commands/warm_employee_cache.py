@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.apps.employee.services.warmup import get_employee_cache_warmer
+
+
+class Command(BaseCommand):
+    help = (
+        "Precompute the hottest employee list pages and counts. Reaches web "
+        "workers only through a shared EMPLOYEE_CACHE (not locmem)"
+    )
+
+    def handle(self, *args, **options):
+        warmer = get_employee_cache_warmer()
+        if warmer is None:
+            self.stdout.write("Employee cache is disabled (EMPLOYEE_CACHE_ENABLED)")
+            return
+
+        start = time.perf_counter()
+        count = warmer.warm()
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(f"Warmed {count} queries in {elapsed * 1000:.0f} ms")
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.8 on 2026-10-19 07:54
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY не блокирует запись в большую таблицу
+    atomic = False
+
+    dependencies = [
+        ('employee', '0001_initial'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='employeemodel',
+            index=models.Index(fields=['date_hired'], name='employee_date_hired_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='employeemodel',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('last_name'), name='text_pattern_ops'), name='employee_last_name_upper_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='employeemodel',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('first_name'), name='text_pattern_ops'), name='employee_first_name_upper_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='employeemodel',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('middle_name'), name='text_pattern_ops'), name='employee_middle_name_upper_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='employeemodel',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('position'), name='text_pattern_ops'), name='employee_position_upper_idx'),
+        ),
+    ]
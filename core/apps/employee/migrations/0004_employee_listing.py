@@ -0,0 +1,89 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:11
+
+from django.db import migrations, models
+
+
+# Строка списка целиком: сотрудник, его начальник, ФИО и уровень в оргструктуре.
+# Уникальный индекс по id обязателен для REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE_SQL = """
+CREATE MATERIALIZED VIEW employee_listing AS
+WITH RECURSIVE tree AS (
+    SELECT id, 0 AS depth FROM employee WHERE manager_id IS NULL
+    UNION ALL
+    SELECT employee.id, tree.depth + 1
+    FROM employee JOIN tree ON employee.manager_id = tree.id
+)
+SELECT
+    employee.id,
+    employee.last_name,
+    employee.first_name,
+    employee.middle_name,
+    employee.position,
+    employee.date_hired,
+    employee.salary,
+    employee.manager_id,
+    employee.created_at,
+    employee.updated_at,
+    trim(concat_ws(' ', employee.last_name, employee.first_name, employee.middle_name))
+        AS full_name,
+    tree.depth,
+    manager.last_name AS manager_last_name,
+    manager.first_name AS manager_first_name,
+    manager.middle_name AS manager_middle_name,
+    manager.position AS manager_position,
+    manager.date_hired AS manager_date_hired,
+    manager.salary AS manager_salary,
+    manager.manager_id AS manager_manager_id,
+    manager.created_at AS manager_created_at,
+    manager.updated_at AS manager_updated_at
+FROM employee
+LEFT JOIN tree ON tree.id = employee.id
+LEFT JOIN employee AS manager ON manager.id = employee.manager_id;
+
+CREATE UNIQUE INDEX employee_listing_id_uniq ON employee_listing (id);
+CREATE INDEX employee_listing_manager_idx ON employee_listing (manager_id, last_name, id);
+CREATE INDEX employee_listing_date_hired_idx ON employee_listing (date_hired);
+CREATE INDEX employee_listing_updated_at_idx ON employee_listing (updated_at);
+"""
+
+DROP_SQL = "DROP MATERIALIZED VIEW employee_listing;"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0003_invalidation_trigger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeListingModel',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('last_name', models.CharField(max_length=255)),
+                ('first_name', models.CharField(max_length=255)),
+                ('middle_name', models.CharField(max_length=255)),
+                ('position', models.CharField(max_length=128)),
+                ('date_hired', models.DateField()),
+                ('salary', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('full_name', models.CharField(max_length=767)),
+                ('depth', models.IntegerField(null=True)),
+                ('manager_last_name', models.CharField(max_length=255, null=True)),
+                ('manager_first_name', models.CharField(max_length=255, null=True)),
+                ('manager_middle_name', models.CharField(max_length=255, null=True)),
+                ('manager_position', models.CharField(max_length=128, null=True)),
+                ('manager_date_hired', models.DateField(null=True)),
+                ('manager_salary', models.DecimalField(decimal_places=2, max_digits=12, null=True)),
+                ('manager_manager_id', models.BigIntegerField(null=True)),
+                ('manager_created_at', models.DateTimeField(null=True)),
+                ('manager_updated_at', models.DateTimeField(null=True)),
+            ],
+            options={
+                'db_table': 'employee_listing',
+                'managed': False,
+            },
+        ),
+        migrations.RunSQL(sql=CREATE_SQL, reverse_sql=DROP_SQL),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.8 on 2026-10-19 08:14
+
+from django.db import migrations, models
+
+
+# updated_at меняется при любом UPDATE, даже в обход ORM: SET_NULL у подчинённых
+# удалённого начальника, QuerySet.update(). Значение, выставленное приложением, сохраняется.
+# Удаление оставляет строку в employee_tombstone для ленты изменений
+CREATE_SQL = """
+CREATE FUNCTION employee_touch_updated_at() RETURNS trigger AS $$
+BEGIN
+    IF NEW.updated_at IS NOT DISTINCT FROM OLD.updated_at AND NEW IS DISTINCT FROM OLD THEN
+        NEW.updated_at := now();
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER employee_touch_updated_at
+    BEFORE UPDATE ON employee
+    FOR EACH ROW EXECUTE FUNCTION employee_touch_updated_at();
+
+CREATE FUNCTION employee_record_tombstone() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO employee_tombstone (employee_id, deleted_at)
+    SELECT id, now() FROM deleted_rows;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER employee_record_tombstone
+    AFTER DELETE ON employee REFERENCING OLD TABLE AS deleted_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION employee_record_tombstone();
+"""
+
+DROP_SQL = """
+DROP TRIGGER employee_record_tombstone ON employee;
+DROP FUNCTION employee_record_tombstone();
+DROP TRIGGER employee_touch_updated_at ON employee;
+DROP FUNCTION employee_touch_updated_at();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0004_employee_listing'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeTombstoneModel',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('employee_id', models.BigIntegerField(verbose_name='ID сотрудника')),
+                ('deleted_at', models.DateTimeField(verbose_name='Дата удаления')),
+            ],
+            options={
+                'verbose_name': 'Удалённый сотрудник',
+                'verbose_name_plural': 'Удалённые сотрудники',
+                'db_table': 'employee_tombstone',
+                'indexes': [models.Index(fields=['deleted_at', 'employee_id'], name='employee_tombstone_cursor_idx')],
+            },
+        ),
+        migrations.RunSQL(sql=CREATE_SQL, reverse_sql=DROP_SQL),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-19 08:14
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY не блокирует запись в большую таблицу
+    atomic = False
+
+    dependencies = [
+        ('employee', '0005_change_feed'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='employeemodel',
+            index=models.Index(fields=['updated_at', 'id'], name='employee_updated_at_id_idx'),
+        ),
+    ]
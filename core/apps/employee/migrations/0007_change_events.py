@@ -0,0 +1,126 @@
+from django.db import migrations
+
+
+# События для потока изменений (GET /api/v1/employees/stream): на каждую строку -
+# новое состояние, старые значения изменённых полей и цепочка начальников
+# (для подписок на поддерево). Записи пачками укладываются в payload NOTIFY
+# (8000 байт), больше 1000 строк за запрос - changes = null, "перечитать всё"
+CREATE_SQL = """
+CREATE FUNCTION employee_ancestors(start_id bigint) RETURNS bigint[] AS $$
+    WITH RECURSIVE chain(id, depth) AS (
+        SELECT start_id, 1 WHERE start_id IS NOT NULL
+        UNION ALL
+        SELECT employee.manager_id, chain.depth + 1
+        FROM chain JOIN employee ON employee.id = chain.id
+        -- Ограничение глубины на случай цикла в данных
+        WHERE employee.manager_id IS NOT NULL AND chain.depth < 64
+    )
+    SELECT coalesce(array_agg(id ORDER BY depth), '{}') FROM chain;
+$$ LANGUAGE sql STABLE;
+
+CREATE FUNCTION employee_notify_changes() RETURNS trigger AS $$
+DECLARE
+    changed_count bigint;
+    changes jsonb[];
+    change jsonb;
+    batch jsonb := '[]';
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        SELECT count(*) INTO changed_count FROM old_rows;
+    ELSE
+        SELECT count(*) INTO changed_count FROM new_rows;
+    END IF;
+
+    IF changed_count > 1000 THEN
+        PERFORM pg_notify('employee_changes', '{"changes": null}');
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(jsonb_build_object(
+            'op', 'insert',
+            'row', to_jsonb(new_rows),
+            'ancestors', employee_ancestors(new_rows.manager_id)
+        ))
+        INTO changes
+        FROM new_rows;
+    ELSIF TG_OP = 'UPDATE' THEN
+        SELECT array_agg(jsonb_build_object(
+            'op', 'update',
+            'row', to_jsonb(new_rows),
+            'old', diff.old,
+            'ancestors', employee_ancestors(new_rows.manager_id),
+            'old_ancestors', CASE
+                WHEN old_rows.manager_id IS DISTINCT FROM new_rows.manager_id
+                THEN employee_ancestors(old_rows.manager_id)
+            END
+        ))
+        INTO changes
+        FROM new_rows
+        JOIN old_rows ON old_rows.id = new_rows.id
+        CROSS JOIN LATERAL (
+            SELECT jsonb_object_agg(item.key, item.value) AS old
+            FROM jsonb_each(to_jsonb(old_rows)) AS item
+            WHERE item.key <> 'updated_at'
+                AND item.value IS DISTINCT FROM to_jsonb(new_rows) -> item.key
+        ) AS diff
+        -- UPDATE без изменений не порождает событий
+        WHERE diff.old IS NOT NULL;
+    ELSE
+        SELECT array_agg(jsonb_build_object(
+            'op', 'delete',
+            'row', to_jsonb(old_rows),
+            'ancestors', employee_ancestors(old_rows.manager_id)
+        ))
+        INTO changes
+        FROM old_rows;
+    END IF;
+
+    IF changes IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    FOREACH change IN ARRAY changes LOOP
+        IF jsonb_array_length(batch) > 0
+            AND octet_length(batch::text) + octet_length(change::text) > 7900
+        THEN
+            PERFORM pg_notify('employee_changes', jsonb_build_object('changes', batch)::text);
+            batch := '[]';
+        END IF;
+        batch := batch || jsonb_build_array(change);
+    END LOOP;
+
+    PERFORM pg_notify('employee_changes', jsonb_build_object('changes', batch)::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER employee_changes_insert
+    AFTER INSERT ON employee REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION employee_notify_changes();
+CREATE TRIGGER employee_changes_update
+    AFTER UPDATE ON employee REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION employee_notify_changes();
+CREATE TRIGGER employee_changes_delete
+    AFTER DELETE ON employee REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION employee_notify_changes();
+"""
+
+DROP_SQL = """
+DROP TRIGGER employee_changes_insert ON employee;
+DROP TRIGGER employee_changes_update ON employee;
+DROP TRIGGER employee_changes_delete ON employee;
+DROP FUNCTION employee_notify_changes();
+DROP FUNCTION employee_ancestors(bigint);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0006_change_feed_index'),
+    ]
+
+    operations = [
+        migrations.RunSQL(sql=CREATE_SQL, reverse_sql=DROP_SQL),
+    ]
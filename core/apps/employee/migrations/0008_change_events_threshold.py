@@ -0,0 +1,100 @@
+from django.db import migrations
+
+
+# Триггер потока изменений выполняется в транзакции пишущего запроса, даже
+# когда поток никто не слушает: на каждую строку - рекурсивный поиск начальников
+# и pg_notify на каждые ~7.9 КБ под общей блокировкой NOTIFY при коммите.
+# Массовые изменения поэтому больше 50 строк
+# сводятся к одному {"changes": null}: клиенты перечитывают список
+NOTIFY_SQL = """
+CREATE OR REPLACE FUNCTION employee_notify_changes() RETURNS trigger AS $$
+DECLARE
+    changed_count bigint;
+    changes jsonb[];
+    change jsonb;
+    batch jsonb := '[]';
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        SELECT count(*) INTO changed_count FROM old_rows;
+    ELSE
+        SELECT count(*) INTO changed_count FROM new_rows;
+    END IF;
+
+    IF changed_count > MAX_ROWS THEN
+        PERFORM pg_notify('employee_changes', '{"changes": null}');
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(jsonb_build_object(
+            'op', 'insert',
+            'row', to_jsonb(new_rows),
+            'ancestors', employee_ancestors(new_rows.manager_id)
+        ))
+        INTO changes
+        FROM new_rows;
+    ELSIF TG_OP = 'UPDATE' THEN
+        SELECT array_agg(jsonb_build_object(
+            'op', 'update',
+            'row', to_jsonb(new_rows),
+            'old', diff.old,
+            'ancestors', employee_ancestors(new_rows.manager_id),
+            'old_ancestors', CASE
+                WHEN old_rows.manager_id IS DISTINCT FROM new_rows.manager_id
+                THEN employee_ancestors(old_rows.manager_id)
+            END
+        ))
+        INTO changes
+        FROM new_rows
+        JOIN old_rows ON old_rows.id = new_rows.id
+        CROSS JOIN LATERAL (
+            SELECT jsonb_object_agg(item.key, item.value) AS old
+            FROM jsonb_each(to_jsonb(old_rows)) AS item
+            WHERE item.key <> 'updated_at'
+                AND item.value IS DISTINCT FROM to_jsonb(new_rows) -> item.key
+        ) AS diff
+        -- UPDATE без изменений не порождает событий
+        WHERE diff.old IS NOT NULL;
+    ELSE
+        SELECT array_agg(jsonb_build_object(
+            'op', 'delete',
+            'row', to_jsonb(old_rows),
+            'ancestors', employee_ancestors(old_rows.manager_id)
+        ))
+        INTO changes
+        FROM old_rows;
+    END IF;
+
+    IF changes IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    FOREACH change IN ARRAY changes LOOP
+        IF jsonb_array_length(batch) > 0
+            AND octet_length(batch::text) + octet_length(change::text) > 7900
+        THEN
+            PERFORM pg_notify('employee_changes', jsonb_build_object('changes', batch)::text);
+            batch := '[]';
+        END IF;
+        batch := batch || jsonb_build_array(change);
+    END LOOP;
+
+    PERFORM pg_notify('employee_changes', jsonb_build_object('changes', batch)::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0007_change_events'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=NOTIFY_SQL.replace("MAX_ROWS", "50"),
+            reverse_sql=NOTIFY_SQL.replace("MAX_ROWS", "1000"),
+        ),
+    ]
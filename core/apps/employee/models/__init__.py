@@ -1 +1,3 @@
 from .employee import *  # noqa
+from .listing import *  # noqa
+from .tombstone import *  # noqa
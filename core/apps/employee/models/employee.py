@@ -1,6 +1,8 @@
 from datetime import datetime
 
+from django.contrib.postgres.indexes import OpClass
 from django.db import models
+from django.db.models.functions import Upper
 
 from core.apps.common.models import TimedBaseModel
 from core.apps.employee.entities import EmployeeEntity
@@ -40,9 +42,46 @@ class EmployeeModel(TimedBaseModel):
         db_table = "employee"
         verbose_name = "Сотрудник"
         verbose_name_plural = "Сотрудники"
+        indexes = [
+            # Диапазоны по дате приёма и date_hierarchy админки
+            models.Index(fields=["date_hired"], name="employee_date_hired_idx"),
+            # Лента изменений: курсор (updated_at, id)
+            models.Index(fields=["updated_at", "id"], name="employee_updated_at_id_idx"),
+            # istartswith в Postgres - UPPER(col::text) LIKE 'X%': поиск и фильтры админки
+            models.Index(
+                OpClass(Upper("last_name"), name="text_pattern_ops"),
+                name="employee_last_name_upper_idx",
+            ),
+            models.Index(
+                OpClass(Upper("first_name"), name="text_pattern_ops"),
+                name="employee_first_name_upper_idx",
+            ),
+            models.Index(
+                OpClass(Upper("middle_name"), name="text_pattern_ops"),
+                name="employee_middle_name_upper_idx",
+            ),
+            models.Index(
+                OpClass(Upper("position"), name="text_pattern_ops"),
+                name="employee_position_upper_idx",
+            ),
+        ]
 
-    def to_entity(self) -> EmployeeEntity:
-        return EmployeeEntity(
+    def to_entity(self, manager: EmployeeEntity | None = None) -> EmployeeEntity:
+        """Maps the model to an entity without lazy loading.
+
+        The manager is taken from ``manager`` or from an already loaded
+        relation (``select_related``); otherwise only ``manager_id`` is
+        set. Subordinates are mapped only when prefetched into
+        ``prefetched_subordinates``.
+        """
+        if (
+            manager is None
+            and self.manager_id
+            and EmployeeModel.manager.is_cached(self)
+        ):
+            manager = self.manager.to_entity()
+
+        entity = EmployeeEntity(
             id=self.id,
             first_name=self.first_name,
             last_name=self.last_name,
@@ -50,7 +89,16 @@ class EmployeeModel(TimedBaseModel):
             position=self.position,
             date_hired=datetime.combine(self.date_hired, datetime.min.time()),
             salary=float(self.salary),
-            manager=self.manager.to_entity() if self.manager else None,
+            manager_id=self.manager_id,
+            manager=manager,
             created_at=self.created_at,
             updated_at=self.updated_at,
         )
+
+        if hasattr(self, "prefetched_subordinates"):
+            entity.subordinates = [
+                subordinate.to_entity(manager=entity)
+                for subordinate in self.prefetched_subordinates
+            ]
+
+        return entity
@@ -0,0 +1,99 @@
+from datetime import datetime
+
+from django.db import models
+
+from core.apps.employee.entities import EmployeeEntity
+
+
+class EmployeeListingModel(models.Model):
+    """Row of the ``employee_listing`` materialized view.
+
+    The employee with its manager flattened into the same row, full name
+    and depth in the org tree. Maintained by ``REFRESH MATERIALIZED VIEW
+    CONCURRENTLY`` (see ``EmployeeListingRefresher``), not by Django.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    last_name = models.CharField(max_length=255)
+    first_name = models.CharField(max_length=255)
+    middle_name = models.CharField(max_length=255)
+    position = models.CharField(max_length=128)
+    date_hired = models.DateField()
+    salary = models.DecimalField(max_digits=12, decimal_places=2)
+    # Связь только для фильтров и prefetch подчинённых внутри представления
+    manager = models.ForeignKey(
+        "self",
+        null=True,
+        related_name="subordinates",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+    )
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    full_name = models.CharField(max_length=767)
+    # Уровень в оргструктуре, 0 - корень; NULL для сотрудников в цикле начальников
+    depth = models.IntegerField(null=True)
+
+    manager_last_name = models.CharField(max_length=255, null=True)
+    manager_first_name = models.CharField(max_length=255, null=True)
+    manager_middle_name = models.CharField(max_length=255, null=True)
+    manager_position = models.CharField(max_length=128, null=True)
+    manager_date_hired = models.DateField(null=True)
+    manager_salary = models.DecimalField(max_digits=12, decimal_places=2, null=True)
+    manager_manager_id = models.BigIntegerField(null=True)
+    manager_created_at = models.DateTimeField(null=True)
+    manager_updated_at = models.DateTimeField(null=True)
+
+    class Meta:
+        managed = False
+        db_table = "employee_listing"
+
+    def _manager_entity(self) -> EmployeeEntity | None:
+        if self.manager_id is None or self.manager_last_name is None:
+            return None
+
+        return EmployeeEntity(
+            id=self.manager_id,
+            first_name=self.manager_first_name,
+            last_name=self.manager_last_name,
+            middle_name=self.manager_middle_name,
+            position=self.manager_position,
+            date_hired=datetime.combine(self.manager_date_hired, datetime.min.time()),
+            salary=float(self.manager_salary),
+            manager_id=self.manager_manager_id,
+            created_at=self.manager_created_at,
+            updated_at=self.manager_updated_at,
+        )
+
+    def to_entity(
+        self,
+        include_manager: bool = False,
+        manager: EmployeeEntity | None = None,
+    ) -> EmployeeEntity:
+        """Maps the row to an entity without queries: the manager comes
+        from the flattened columns, subordinates only when prefetched into
+        ``prefetched_subordinates``."""
+        if manager is None and include_manager:
+            manager = self._manager_entity()
+
+        entity = EmployeeEntity(
+            id=self.id,
+            first_name=self.first_name,
+            last_name=self.last_name,
+            middle_name=self.middle_name,
+            position=self.position,
+            date_hired=datetime.combine(self.date_hired, datetime.min.time()),
+            salary=float(self.salary),
+            manager_id=self.manager_id,
+            manager=manager,
+            created_at=self.created_at,
+            updated_at=self.updated_at,
+        )
+
+        if hasattr(self, "prefetched_subordinates"):
+            entity.subordinates = [
+                subordinate.to_entity(manager=entity)
+                for subordinate in self.prefetched_subordinates
+            ]
+
+        return entity
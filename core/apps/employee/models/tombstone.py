@@ -0,0 +1,25 @@
+from django.db import models
+
+
+class EmployeeTombstoneModel(models.Model):
+    """Deleted employee for the change feed.
+
+    Rows are inserted by the ``employee_record_tombstone`` trigger, so
+    deletions in bypass of the ORM are recorded too.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    employee_id = models.BigIntegerField(verbose_name="ID сотрудника")
+    deleted_at = models.DateTimeField(verbose_name="Дата удаления")
+
+    class Meta:
+        db_table = "employee_tombstone"
+        verbose_name = "Удалённый сотрудник"
+        verbose_name_plural = "Удалённые сотрудники"
+        indexes = [
+            # Лента изменений читает по курсору (deleted_at, employee_id)
+            models.Index(
+                fields=["deleted_at", "employee_id"],
+                name="employee_tombstone_cursor_idx",
+            ),
+        ]
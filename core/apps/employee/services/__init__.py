@@ -1 +1,3 @@
+from .changes import *  # noqa
 from .employee import *  # noqa
+from .listing import *  # noqa
@@ -0,0 +1,190 @@
+import base64
+import binascii
+from abc import (
+    ABC,
+    abstractmethod,
+)
+from dataclasses import dataclass
+from datetime import (
+    datetime,
+    timedelta,
+    timezone as dt_timezone,
+)
+
+from django.db import (
+    connections,
+    DEFAULT_DB_ALIAS,
+)
+from django.db.models import Q
+from django.utils import timezone
+
+from core.apps.common.routers import use_primary
+
+from core.apps.employee.entities import (
+    EmployeeChangeEntity,
+    EmployeeChangesEntity,
+)
+from core.apps.employee.exceptions.changes import (
+    ChangeCursorExpiredException,
+    ChangeCursorInvalidException,
+)
+from core.apps.employee.models import (
+    EmployeeModel,
+    EmployeeTombstoneModel,
+)
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+# Начало самой старой открытой транзакции в базе, кроме нашей: её строки
+# получат updated_at (now() в триггере) не раньше этого момента
+OLDEST_TRANSACTION_SQL = """
+SELECT min(xact_start) FROM pg_stat_activity
+WHERE datname = current_database()
+    AND xact_start IS NOT NULL
+    AND pid <> pg_backend_pid()
+"""
+
+
+@dataclass(frozen=True)
+class ChangeCursor:
+    """Position in the feed: the last delivered ``(changed_at, id)``."""
+
+    changed_at: datetime
+    id: int
+
+    def encode(self) -> str:
+        # Целые микросекунды, как в timestamptz: без потерь точности float
+        micros = (self.changed_at - _EPOCH) // timedelta(microseconds=1)
+        raw = f"{micros}:{self.id}".encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, cursor: str) -> "ChangeCursor":
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            micros, employee_id = raw.decode().split(":")
+            changed_at = _EPOCH + timedelta(microseconds=int(micros))
+            return cls(changed_at=changed_at, id=int(employee_id))
+        except (binascii.Error, UnicodeDecodeError, ValueError, OverflowError):
+            raise ChangeCursorInvalidException(cursor=cursor)
+
+
+def _after(queryset, field: str, id_field: str, cursor: ChangeCursor | None):
+    if cursor is None:
+        return queryset
+
+    # Первое условие - граница диапазона для индекса (field, id), второе - строгое
+    return queryset.filter(**{f"{field}__gte": cursor.changed_at}).filter(
+        Q(**{f"{field}__gt": cursor.changed_at}) | Q(**{f"{id_field}__gt": cursor.id}),
+    )
+
+
+class BaseEmployeeChangesService(ABC):
+    @abstractmethod
+    def get_changes(self, cursor: str | None, limit: int) -> EmployeeChangesEntity: ...
+
+
+@dataclass(eq=False)
+class ORMEmployeeChangesService(BaseEmployeeChangesService):
+    """Change feed ordered by ``(changed_at, id)``.
+
+    Updates come from ``employee.updated_at`` (kept current by a trigger
+    for writes in bypass of the ORM), deletions from tombstones. Each
+    page costs two index range scans of at most ``limit`` rows, whatever
+    the size of the catalog.
+
+    Changes are delivered only up to the start of the oldest transaction
+    still open on the primary: such a transaction may commit rows with an
+    older ``updated_at`` than those already delivered, however long it
+    runs. ``settle_seconds`` is subtracted on top to absorb clock skew
+    between the application and the database. The feed reads the primary,
+    whose ``pg_stat_activity`` the horizon comes from.
+    """
+
+    settle_seconds: float = 5.0
+    tombstone_retention: timedelta = timedelta(days=30)
+
+    def get_changes(self, cursor: str | None, limit: int) -> EmployeeChangesEntity:
+        position = ChangeCursor.decode(cursor) if cursor else None
+        now = timezone.now()
+
+        horizon = now - self.tombstone_retention
+        if position is not None and position.changed_at < horizon:
+            # Удаления старше горизонта уже вычищены: клиент пропустил бы их
+            raise ChangeCursorExpiredException(cursor=cursor, horizon=horizon)
+
+        with use_primary():
+            return self._get_changes(position, cursor, now, limit)
+
+    def _settled(self, now: datetime) -> datetime:
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            # pg_stat_activity кешируется до конца транзакции: внутри atomic
+            # повторное чтение вернуло бы устаревший список
+            cursor.execute("SELECT pg_stat_clear_snapshot()")
+            cursor.execute(OLDEST_TRANSACTION_SQL)
+            (oldest,) = cursor.fetchone()
+
+        if oldest is not None:
+            now = min(now, oldest)
+        return now - timedelta(seconds=self.settle_seconds)
+
+    def _get_changes(
+        self,
+        position: ChangeCursor | None,
+        cursor: str | None,
+        now: datetime,
+        limit: int,
+    ) -> EmployeeChangesEntity:
+        settled = self._settled(now)
+
+        employees = _after(
+            EmployeeModel.objects.filter(updated_at__lt=settled),
+            "updated_at",
+            "id",
+            position,
+        ).order_by("updated_at", "id")[: limit + 1]
+        tombstones = _after(
+            EmployeeTombstoneModel.objects.filter(deleted_at__lt=settled),
+            "deleted_at",
+            "employee_id",
+            position,
+        ).order_by("deleted_at", "employee_id")[: limit + 1]
+
+        changes = [
+            EmployeeChangeEntity(
+                id=employee.id,
+                changed_at=employee.updated_at,
+                employee=employee.to_entity(),
+            )
+            for employee in employees
+        ]
+        changes += [
+            EmployeeChangeEntity(
+                id=tombstone.employee_id,
+                changed_at=tombstone.deleted_at,
+                deleted=True,
+            )
+            for tombstone in tombstones
+        ]
+        changes.sort(key=lambda change: (change.changed_at, change.id))
+
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+
+        if changes:
+            last = changes[-1]
+            cursor = ChangeCursor(changed_at=last.changed_at, id=last.id).encode()
+        elif position is None or position.changed_at < settled:
+            # Всё до settled уже отдано: курсор простаивающего клиента движется
+            # вперёд и не устаревает вместе с удалениями за горизонтом
+            cursor = ChangeCursor(changed_at=settled, id=0).encode()
+
+        return EmployeeChangesEntity(items=changes, cursor=cursor, has_more=has_more)
+
+    def purge_expired(self) -> int:
+        horizon = timezone.now() - self.tombstone_retention
+        deleted, _ = EmployeeTombstoneModel.objects.filter(
+            deleted_at__lt=horizon,
+        ).delete()
+        return deleted
@@ -1,15 +1,45 @@
+import hashlib
+import time
 from abc import (
     ABC,
     abstractmethod,
 )
-from typing import Iterable
+from dataclasses import (
+    dataclass,
+    field,
+)
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+)
 
-from django.db.models import Q
+from django.conf import settings
+from django.core.cache.backends.base import BaseCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models import (
+    Prefetch,
+    Q,
+)
 
 from core.api.filters import PaginationIn
+from core.apps.common.metrics import record_cache_access
+from core.apps.common.routers import (
+    is_pinned_to_primary,
+    use_primary,
+)
+from core.apps.common.singleflight import SingleFlight
 from core.apps.employee.entities import EmployeeEntity
-from core.apps.employee.filters import EmployeeFilters
+from core.apps.employee.filters import (
+    EmployeeFilters,
+    EmployeeIncludes,
+)
+from core.apps.employee.filters.compiler import (
+    compile_employee_filters,
+    filters_key,
+)
 from core.apps.employee.models import EmployeeModel
+from core.apps.employee.services.loader import EmployeeLoader
 
 
 class BaseEmployeeService(ABC):
@@ -21,91 +51,273 @@ class BaseEmployeeService(ABC):
         self,
         filters: EmployeeFilters,
         pagination: PaginationIn,
+        includes: EmployeeIncludes | None = None,
     ) -> Iterable[EmployeeEntity]: ...
 
+    @abstractmethod
+    def get_employees_by_ids(self, ids: list[int]) -> list[EmployeeEntity | None]: ...
+
+
+def _default_loader() -> EmployeeLoader:
+    return EmployeeLoader(chunk_size=settings.EMPLOYEE_BATCH_CHUNK_SIZE)
 
+
+@dataclass(eq=False)
 class ORMEmployeeService(BaseEmployeeService):
+    """Without an explicit ``loader`` the service keeps no state between
+    calls, so one instance can serve all requests; each batch lookup
+    then gets its own loader. A loader passed in is shared by all calls
+    and primed with the rows of ``get_employee_list``."""
+
+    loader: EmployeeLoader | None = None
+
+    def _get_loader(self) -> EmployeeLoader:
+        return self.loader if self.loader is not None else _default_loader()
+
     def _build_get_employee_list_query(self, filters: EmployeeFilters) -> Q:
-        query = Q()
+        return compile_employee_filters(filters)
 
-        # Фильтр по ID
-        if filters.id is not None:
-            query &= Q(id=filters.id)
+    def _apply_includes(self, queryset, includes: EmployeeIncludes | None):
+        if includes is None:
+            return queryset
 
-        # Фильтр по списку ID
-        if filters.ids is not None:
-            query &= Q(id__in=filters.ids)
+        if includes.manager:
+            queryset = queryset.select_related("manager")
 
-        # Фильтры по текстовым полям
-        if filters.first_name is not None:
-            query &= Q(first_name__icontains=filters.first_name)
+        if includes.subordinates:
+            # Срез внутри Prefetch: Django ограничивает число подчинённых
+            # на каждого руководителя оконной функцией, одним запросом на страницу
+            limit = settings.EMPLOYEE_SUBORDINATES_LIMIT
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "subordinates",
+                    queryset=EmployeeModel.objects.order_by("last_name", "id")[:limit],
+                    to_attr="prefetched_subordinates",
+                ),
+            )
+
+        return queryset
+
+    def get_employee_list(
+        self,
+        filters: EmployeeFilters,
+        pagination: PaginationIn,
+        includes: EmployeeIncludes | None = None,
+    ) -> Iterable[EmployeeEntity]:
+        query = self._build_get_employee_list_query(filters)
 
-        if filters.last_name is not None:
-            query &= Q(last_name__icontains=filters.last_name)
+        queryset = self._apply_includes(EmployeeModel.objects.filter(query), includes)[
+            pagination.offset : pagination.offset + pagination.limit
+        ]
 
-        if filters.middle_name is not None:
-            query &= Q(middle_name__icontains=filters.middle_name)
+        employees = list(queryset)
+        if self.loader is not None:
+            self.loader.prime(employees)
 
-        if filters.position is not None:
-            query &= Q(position__icontains=filters.position)
+        return [employee.to_entity() for employee in employees]
 
-        # Общий поиск по всем текстовым полям
-        if filters.search is not None:
-            search_query = (
-                Q(first_name__icontains=filters.search)
-                | Q(last_name__icontains=filters.search)
-                | Q(middle_name__icontains=filters.search)
-                | Q(position__icontains=filters.search)
-            )
-            query &= search_query
+    def get_employee_count(self, filters: EmployeeFilters) -> int:
+        query = self._build_get_employee_list_query(filters)
+        return EmployeeModel.objects.filter(query).count()
 
-        # Фильтр по дате приёма на работу
-        if filters.date_hired_from is not None:
-            query &= Q(date_hired__gte=filters.date_hired_from)
+    def get_employees_by_ids(self, ids: list[int]) -> list[EmployeeEntity | None]:
+        return self._get_loader().load_many(ids)
 
-        if filters.date_hired_to is not None:
-            query &= Q(date_hired__lte=filters.date_hired_to)
 
-        # Фильтр по зарплате
-        if filters.salary_min is not None:
-            query &= Q(salary__gte=filters.salary_min)
+def list_query_key(
+    filters: EmployeeFilters,
+    pagination: PaginationIn,
+    includes: EmployeeIncludes | None,
+) -> tuple:
+    """Normalized identity of a list call: equal for identical requests."""
+    include = tuple(sorted(includes.include)) if includes is not None else ()
+    return ("list", filters_key(filters), pagination.offset, pagination.limit, include)
 
-        if filters.salary_max is not None:
-            query &= Q(salary__lte=filters.salary_max)
 
-        # Фильтр по менеджеру
-        if filters.manager_id is not None:
-            query &= Q(manager_id=filters.manager_id)
+def count_query_key(filters: EmployeeFilters) -> tuple:
+    return ("count", filters_key(filters))
 
-        # Фильтры по дате создания
-        if filters.created_at_from is not None:
-            query &= Q(created_at__gte=filters.created_at_from)
 
-        if filters.created_at_to is not None:
-            query &= Q(created_at__lte=filters.created_at_to)
+@dataclass(eq=False)
+class SingleFlightEmployeeService(BaseEmployeeService):
+    """Concurrent identical list and count calls share one query.
 
-        # Фильтры по дате обновления
-        if filters.updated_at_from is not None:
-            query &= Q(updated_at__gte=filters.updated_at_from)
+    A caller arriving while the same call runs in another thread waits
+    for it and gets its result, or its exception.
+    """
 
-        if filters.updated_at_to is not None:
-            query &= Q(updated_at__lte=filters.updated_at_to)
+    employee_service: BaseEmployeeService
+    single_flight: SingleFlight = field(
+        default_factory=lambda: SingleFlight(name="employees"),
+    )
 
-        return query
+    def _key(self, query_key: tuple) -> tuple:
+        # Запрос, закреплённый за основной базой после записи (read-your-writes),
+        # не должен получить результат, прочитанный с реплики
+        return (is_pinned_to_primary(), query_key)
 
     def get_employee_list(
         self,
         filters: EmployeeFilters,
         pagination: PaginationIn,
+        includes: EmployeeIncludes | None = None,
     ) -> Iterable[EmployeeEntity]:
-        query = self._build_get_employee_list_query(filters)
+        # list(): ленивый результат нельзя раздать нескольким потокам
+        return self.single_flight.do(
+            self._key(list_query_key(filters, pagination, includes)),
+            lambda: list(
+                self.employee_service.get_employee_list(filters, pagination, includes),
+            ),
+        )
+
+    def get_employee_count(self, filters: EmployeeFilters) -> int:
+        return self.single_flight.do(
+            self._key(count_query_key(filters)),
+            lambda: self.employee_service.get_employee_count(filters),
+        )
+
+    def get_employees_by_ids(self, ids: list[int]) -> list[EmployeeEntity | None]:
+        return self.employee_service.get_employees_by_ids(ids)
+
+
+EMPLOYEE_CACHE_GENERATION_KEY = "employees:generation"
 
-        queryset = EmployeeModel.objects.filter(query)[
-            pagination.offset : pagination.offset + pagination.limit
-        ]
 
-        return [employee.to_entity() for employee in queryset]
+@dataclass(eq=False)
+class CachedEmployeeService(BaseEmployeeService):
+    """Serves list pages and counts from a Django cache.
+
+    Keys include a generation number kept in the same cache.
+    ``invalidate`` bumps it, so all processes sharing the cache stop
+    reading older entries at once; the entries themselves expire after
+    ``ttl``. Batch lookups by id are not cached.
+
+    With ``lock_timeout`` set, a miss takes a lock in the cache and only
+    its holder queries the database; other processes poll the cache for
+    the result.
+
+    Requests pinned to the primary after a write bypass the cache: its
+    pages may have been read from a lagging replica.
+    """
+
+    employee_service: BaseEmployeeService
+    cache: BaseCache
+    ttl: float = 30.0
+    # 0 - без межпроцессной блокировки на промах
+    lock_timeout: float = 0.0
+    lock_poll_interval: float = 0.05
+
+    @property
+    def local(self) -> bool:
+        """Whether the cache belongs to this process alone (locmem)."""
+        return isinstance(self.cache, LocMemCache)
+
+    def _generation(self) -> int:
+        # Как в invalidate: после вытеснения счётчика не вернуться к старому поколению
+        return self.cache.get_or_set(
+            EMPLOYEE_CACHE_GENERATION_KEY,
+            time.time_ns,
+            timeout=None,
+        )
+
+    def _key(self, query_key: tuple) -> str:
+        digest = hashlib.sha1(repr(query_key).encode()).hexdigest()
+        return f"employees:{self._generation()}:{digest}"
+
+    def _list_key(
+        self,
+        filters: EmployeeFilters,
+        pagination: PaginationIn,
+        includes: EmployeeIncludes | None,
+    ) -> str:
+        return self._key(list_query_key(filters, pagination, includes))
+
+    def _count_key(self, filters: EmployeeFilters) -> str:
+        return self._key(count_query_key(filters))
+
+    def _get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        if is_pinned_to_primary():
+            # Read-your-writes: страница в кеше могла быть прочитана с реплики
+            return compute()
+
+        value = self.cache.get(key)
+        record_cache_access("employees", hit=value is not None)
+        if value is not None:
+            return value
+
+        if not self.lock_timeout:
+            return self._compute(key, compute)
+
+        # Межпроцессный single-flight: считает взявший блокировку,
+        # остальные ждут его результат в кеше не дольше lock_timeout
+        lock_key = f"{key}:lock"
+        if self.cache.add(lock_key, 1, self.lock_timeout):
+            try:
+                return self._compute(key, compute)
+            finally:
+                self.cache.delete(lock_key)
+
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.lock_poll_interval)
+            value = self.cache.get(key)
+            if value is not None:
+                return value
+
+        # Держатель блокировки не успел или упал: считаем сами
+        return self._compute(key, compute)
+
+    def _compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        value = compute()
+        self.cache.set(key, value, self.ttl)
+        return value
+
+    def get_employee_list(
+        self,
+        filters: EmployeeFilters,
+        pagination: PaginationIn,
+        includes: EmployeeIncludes | None = None,
+    ) -> Iterable[EmployeeEntity]:
+        return self._get_or_compute(
+            self._list_key(filters, pagination, includes),
+            lambda: list(
+                self.employee_service.get_employee_list(filters, pagination, includes),
+            ),
+        )
 
     def get_employee_count(self, filters: EmployeeFilters) -> int:
-        query = self._build_get_employee_list_query(filters)
-        return EmployeeModel.objects.filter(query).count()
+        return self._get_or_compute(
+            self._count_key(filters),
+            lambda: self.employee_service.get_employee_count(filters),
+        )
+
+    def get_employees_by_ids(self, ids: list[int]) -> list[EmployeeEntity | None]:
+        return self.employee_service.get_employees_by_ids(ids)
+
+    def warm(
+        self,
+        filters: EmployeeFilters,
+        pagination: PaginationIn,
+        includes: EmployeeIncludes | None = None,
+    ) -> None:
+        """Recomputes one page and its count, whether cached or not."""
+        # Ключи до запросов: запись во время прогрева сменит поколение,
+        # и результат не попадёт под новое
+        list_key = self._list_key(filters, pagination, includes)
+        count_key = self._count_key(filters)
+
+        # Прогрев идёт сразу после записи: реплика может её ещё не видеть
+        with use_primary():
+            employees = list(
+                self.employee_service.get_employee_list(filters, pagination, includes),
+            )
+            count = self.employee_service.get_employee_count(filters)
+
+        self.cache.set_many({list_key: employees, count_key: count}, self.ttl)
+
+    def invalidate(self) -> None:
+        try:
+            self.cache.incr(EMPLOYEE_CACHE_GENERATION_KEY)
+        except ValueError:
+            # Счётчик вытеснен из кеша: начинаем с поколения, которого ещё не было
+            self.cache.set(EMPLOYEE_CACHE_GENERATION_KEY, time.time_ns(), timeout=None)
@@ -0,0 +1,154 @@
+import json
+import logging
+import threading
+from dataclasses import (
+    dataclass,
+    field,
+)
+from typing import (
+    Callable,
+    Iterable,
+)
+
+from django.conf import settings
+from django.db import (
+    connections,
+    router,
+    transaction,
+)
+from django.db.models import Prefetch
+
+from core.api.filters import PaginationIn
+from core.apps.common.invalidation import INVALIDATION_CHANNEL
+from core.apps.employee.entities import EmployeeEntity
+from core.apps.employee.filters import (
+    EmployeeFilters,
+    EmployeeIncludes,
+)
+from core.apps.employee.filters.compiler import compile_employee_filters
+from core.apps.employee.models import EmployeeListingModel
+from core.apps.employee.services.employee import (
+    BaseEmployeeService,
+    ORMEmployeeService,
+)
+
+
+logger = logging.getLogger("core.employee_listing")
+
+_VIEW = EmployeeListingModel._meta.db_table
+
+# Произвольный ключ advisory lock: одновременно обновляет представление один процесс
+REFRESH_LOCK_KEY = 4_802_048
+
+
+@dataclass(eq=False)
+class MVEmployeeService(BaseEmployeeService):
+    """Reads the listing from the ``employee_listing`` materialized view.
+
+    One row holds everything a page needs, so ``include=manager`` costs
+    no join. Rows lag behind ``employee`` until the next refresh; pages
+    are ordered by id. Batch lookups by id read live data.
+    """
+
+    employee_service: BaseEmployeeService = field(default_factory=ORMEmployeeService)
+
+    def get_employee_list(
+        self,
+        filters: EmployeeFilters,
+        pagination: PaginationIn,
+        includes: EmployeeIncludes | None = None,
+    ) -> Iterable[EmployeeEntity]:
+        queryset = EmployeeListingModel.objects.filter(
+            compile_employee_filters(filters),
+        ).order_by("id")
+
+        if includes is not None and includes.subordinates:
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "subordinates",
+                    queryset=EmployeeListingModel.objects.order_by("last_name", "id")[
+                        : settings.EMPLOYEE_SUBORDINATES_LIMIT
+                    ],
+                    to_attr="prefetched_subordinates",
+                ),
+            )
+
+        include_manager = includes is not None and includes.manager
+        return [
+            row.to_entity(include_manager=include_manager)
+            for row in queryset[pagination.offset : pagination.offset + pagination.limit]
+        ]
+
+    def get_employee_count(self, filters: EmployeeFilters) -> int:
+        return EmployeeListingModel.objects.filter(
+            compile_employee_filters(filters),
+        ).count()
+
+    def get_employees_by_ids(self, ids: list[int]) -> list[EmployeeEntity | None]:
+        return self.employee_service.get_employees_by_ids(ids)
+
+
+@dataclass(eq=False)
+class EmployeeListingRefresher:
+    """Keeps ``employee_listing`` close to ``employee``.
+
+    ``mark_dirty`` (subscribed to employee invalidations) requests a
+    refresh; bursts of changes are folded into one refresh per
+    ``min_interval``, and the view is refreshed at least every
+    ``max_interval`` in case notifications were lost.
+    """
+
+    min_interval: float = 1.0
+    max_interval: float = 300.0
+    # Вызывается после обновления, например для сброса общего кеша страниц
+    on_refresh: Callable[[], None] | None = None
+    _dirty: threading.Event = field(default_factory=threading.Event)
+
+    def mark_dirty(self, ids: list[int] | None = None) -> None:
+        self._dirty.set()
+
+    def refresh(self) -> bool:
+        """Refreshes the view unless another process is doing it."""
+        using = router.db_for_write(EmployeeListingModel)
+
+        with transaction.atomic(using=using), connections[using].cursor() as cursor:
+            cursor.execute("SELECT pg_try_advisory_xact_lock(%s)", [REFRESH_LOCK_KEY])
+            if not cursor.fetchone()[0]:
+                return False
+
+            # CONCURRENTLY: чтения представления не блокируются на время обновления
+            cursor.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {_VIEW}")
+            # Кеши страниц, прочитанных из представления, устарели вместе с ним
+            cursor.execute(
+                "SELECT pg_notify(%s, %s)",
+                [INVALIDATION_CHANNEL, json.dumps({"table": _VIEW, "ids": None})],
+            )
+
+        if self.on_refresh is not None:
+            self.on_refresh()
+        return True
+
+    def run(self, stopped: threading.Event) -> None:
+        while not stopped.is_set():
+            self._dirty.wait(self.max_interval)
+            if stopped.is_set():
+                break
+
+            self._dirty.clear()
+            try:
+                if self.refresh():
+                    logger.info("Refreshed %s", _VIEW)
+            except Exception:
+                logger.exception("Refresh of %s failed", _VIEW)
+                self._dirty.set()
+
+            stopped.wait(self.min_interval)
+
+        connections.close_all()
+
+
+def build_listing_refresher() -> EmployeeListingRefresher:
+    return EmployeeListingRefresher(
+        min_interval=settings.EMPLOYEE_LISTING_REFRESH_MIN_INTERVAL,
+        max_interval=settings.EMPLOYEE_LISTING_REFRESH_MAX_INTERVAL,
+    )
@@ -0,0 +1,84 @@
+from dataclasses import (
+    dataclass,
+    field,
+)
+from typing import Iterable
+
+from core.apps.employee.entities import EmployeeEntity
+from core.apps.employee.models import EmployeeModel
+
+
+@dataclass(eq=False)
+class EmployeeLoader:
+    """Dataloader for employees by id.
+
+    Lives as long as the service that owns it (one request). All pending
+    ids, including managers needed to map the entities, are fetched with
+    ``id = ANY(...)`` queries, one per chunk and per level of the manager
+    chain. Rows that were already loaded are never queried again.
+    """
+
+    chunk_size: int = 1000
+    _models: dict[int, EmployeeModel | None] = field(default_factory=dict)
+    _entities: dict[int, EmployeeEntity] = field(default_factory=dict)
+
+    def load_many(self, ids: Iterable[int]) -> list[EmployeeEntity | None]:
+        """Returns entities in the order of ``ids``, ``None`` for missing
+        ones."""
+        ids = list(ids)
+        self._fetch(ids)
+        self._fetch_managers(ids)
+
+        return [self._entity(employee_id) for employee_id in ids]
+
+    def load(self, employee_id: int) -> EmployeeEntity | None:
+        return self.load_many([employee_id])[0]
+
+    def prime(self, employees: Iterable[EmployeeModel]) -> None:
+        """Adds already fetched rows so that they are not queried again."""
+        for employee in employees:
+            self._models.setdefault(employee.id, employee)
+
+    def _fetch(self, ids: Iterable[int]) -> None:
+        pending = list(dict.fromkeys(i for i in ids if i not in self._models))
+
+        for start in range(0, len(pending), self.chunk_size):
+            chunk = pending[start : start + self.chunk_size]
+            found = EmployeeModel.objects.filter(id__any=chunk).in_bulk()
+            for employee_id in chunk:
+                self._models[employee_id] = found.get(employee_id)
+
+    def _fetch_managers(self, ids: Iterable[int]) -> None:
+        # Обходим цепочку начальников по уровням: один батч на уровень
+        level = set(ids)
+        while level:
+            manager_ids = {
+                employee.manager_id
+                for employee_id in level
+                if (employee := self._models.get(employee_id)) is not None
+                and employee.manager_id is not None
+            }
+            level = {
+                manager_id
+                for manager_id in manager_ids
+                if manager_id not in self._models
+            }
+            self._fetch(level)
+
+    def _entity(
+        self, employee_id: int, visiting: frozenset[int] = frozenset()
+    ) -> EmployeeEntity | None:
+        if employee_id in self._entities:
+            return self._entities[employee_id]
+
+        employee = self._models.get(employee_id)
+        if employee is None or employee_id in visiting:
+            return None
+
+        manager = (
+            self._entity(employee.manager_id, visiting | {employee_id})
+            if employee.manager_id
+            else None
+        )
+        entity = self._entities[employee_id] = employee.to_entity(manager=manager)
+        return entity
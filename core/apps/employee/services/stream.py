@@ -0,0 +1,284 @@
+import asyncio
+import json
+import logging
+import threading
+from collections import Counter
+from dataclasses import (
+    dataclass,
+    field,
+)
+from datetime import (
+    date,
+    datetime,
+)
+from functools import (
+    cache,
+    cached_property,
+)
+from typing import Any
+
+from django.conf import settings
+
+from core.apps.common.invalidation import InvalidationBus
+from core.apps.common.metrics import record_employee_stream_events
+from core.apps.employee.entities import (
+    EmployeeChangeEventEntity,
+    EmployeeEntity,
+)
+from core.apps.employee.filters import EmployeeFilters
+from core.apps.employee.filters.matcher import match_employee_filters
+
+
+logger = logging.getLogger("core.employee_stream")
+
+# Канал, в который пишет триггер employee_notify_changes (миграция 0007)
+CHANGES_CHANNEL = "employee_changes"
+
+
+def _employee_from_row(row: dict[str, Any]) -> EmployeeEntity:
+    return EmployeeEntity(
+        id=row["id"],
+        first_name=row["first_name"],
+        last_name=row["last_name"],
+        middle_name=row["middle_name"],
+        position=row["position"],
+        date_hired=date.fromisoformat(row["date_hired"]),
+        salary=float(row["salary"]),
+        manager_id=row["manager_id"],
+        created_at=datetime.fromisoformat(row["created_at"]),
+        updated_at=datetime.fromisoformat(row["updated_at"]),
+    )
+
+
+@dataclass(frozen=True)
+class EmployeeRowChange:
+    """One row changed by a statement on ``employee``, as sent by the trigger."""
+
+    op: str
+    # Новое состояние строки; для delete - последнее
+    row: dict[str, Any]
+    # Старые значения изменённых полей (только update)
+    old: dict[str, Any] = field(default_factory=dict)
+    # Начальники снизу вверх; old_ancestors - до перевода к другому начальнику
+    ancestors: tuple[int, ...] = ()
+    old_ancestors: tuple[int, ...] | None = None
+
+    @classmethod
+    def from_payload(cls, change: dict[str, Any]) -> "EmployeeRowChange":
+        old_ancestors = change.get("old_ancestors")
+        return cls(
+            op=change["op"],
+            row=change["row"],
+            old=change.get("old") or {},
+            ancestors=tuple(change["ancestors"]),
+            old_ancestors=tuple(old_ancestors) if old_ancestors is not None else None,
+        )
+
+    @property
+    def id(self) -> int:
+        return self.row["id"]
+
+    # Разбираются один раз на изменение, а не на каждую подписку
+    @cached_property
+    def employee(self) -> EmployeeEntity:
+        return _employee_from_row(self.row)
+
+    @cached_property
+    def previous(self) -> EmployeeEntity | None:
+        if self.op != "update":
+            return None
+        return _employee_from_row({**self.row, **self.old})
+
+
+RESET_EVENT = EmployeeChangeEventEntity(event="reset")
+
+
+@dataclass(eq=False)
+class EmployeeChangeSubscription:
+    """Changes of the employees in ``filters`` (and under ``subtree``) for
+    one stream connection.
+
+    Lives in the event loop that created it; the queue is bounded, and a
+    client that falls behind gets ``reset`` instead of the lost events.
+    """
+
+    filters: EmployeeFilters
+    subtree: int | None = None
+    queue_size: int = 100
+    loop: asyncio.AbstractEventLoop = field(default_factory=asyncio.get_running_loop)
+    _queue: asyncio.Queue = field(init=False)
+
+    def __post_init__(self):
+        self._queue = asyncio.Queue(self.queue_size)
+
+    def _matches(self, employee: EmployeeEntity, ancestors: tuple[int, ...]) -> bool:
+        if self.subtree is not None and not (
+            employee.id == self.subtree or self.subtree in ancestors
+        ):
+            return False
+        return match_employee_filters(self.filters, employee)
+
+    def event_for(self, change: EmployeeRowChange) -> EmployeeChangeEventEntity | None:
+        """The event to send for the change, ``None`` if it is out of view."""
+        if change.op == "delete":
+            if not self._matches(change.employee, change.ancestors):
+                return None
+            return EmployeeChangeEventEntity(
+                event="delete",
+                id=change.id,
+                manager_id=change.row["manager_id"],
+                matches=False,
+            )
+
+        matches = self._matches(change.employee, change.ancestors)
+        previous = change.previous
+        matched = previous is not None and self._matches(
+            previous,
+            change.old_ancestors if change.old_ancestors is not None else change.ancestors,
+        )
+        if not (matches or matched):
+            return None
+
+        fields = change.row
+        if matched:
+            # Сотрудник уже есть у клиента: достаточно изменённых полей
+            fields = {name: change.row[name] for name in (*change.old, "updated_at")}
+
+        return EmployeeChangeEventEntity(
+            event=change.op,
+            id=change.id,
+            fields=fields,
+            manager_id=change.row["manager_id"],
+            matches=matches,
+        )
+
+    def offer(self, events: list[EmployeeChangeEventEntity]) -> None:
+        # Вызывается в цикле событий подписки
+        for event in events:
+            try:
+                self._queue.put_nowait(event)
+            except asyncio.QueueFull:
+                while not self._queue.empty():
+                    self._queue.get_nowait()
+                self._queue.put_nowait(RESET_EVENT)
+                record_employee_stream_events("overflow")
+                return
+
+    async def get(self) -> EmployeeChangeEventEntity:
+        return await self._queue.get()
+
+
+def _deliver(batch: list[tuple[EmployeeChangeSubscription, list]]) -> None:
+    for subscription, events in batch:
+        subscription.offer(events)
+
+
+@dataclass(eq=False)
+class EmployeeChangeBroadcaster:
+    """Fans employee changes out to the stream subscriptions of the process.
+
+    Changes are matched against every subscription once, in the listener
+    thread; each event loop then gets a single callback with the events
+    of its subscriptions. A connection costs a subscription and its queue,
+    no database access.
+    """
+
+    queue_size: int = 100
+    max_subscriptions: int = 5000
+    _subscriptions: set[EmployeeChangeSubscription] = field(default_factory=set)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    @property
+    def full(self) -> bool:
+        return len(self._subscriptions) >= self.max_subscriptions
+
+    def subscribe(
+        self,
+        filters: EmployeeFilters,
+        subtree: int | None = None,
+    ) -> EmployeeChangeSubscription:
+        subscription = EmployeeChangeSubscription(
+            filters=filters,
+            subtree=subtree,
+            queue_size=self.queue_size,
+        )
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: EmployeeChangeSubscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, changes: list[EmployeeRowChange] | None) -> None:
+        """Queues the changes to matching subscriptions; ``None`` resets all."""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+
+        deliveries: dict[asyncio.AbstractEventLoop, list] = {}
+        counts = Counter()
+        for subscription in subscriptions:
+            if changes is None:
+                events = [RESET_EVENT]
+            else:
+                events = [
+                    event
+                    for change in changes
+                    if (event := subscription.event_for(change)) is not None
+                ]
+            if events:
+                deliveries.setdefault(subscription.loop, []).append(
+                    (subscription, events),
+                )
+                counts.update(event.event for event in events)
+
+        for loop, batch in deliveries.items():
+            try:
+                loop.call_soon_threadsafe(_deliver, batch)
+            except RuntimeError:
+                # Цикл уже закрыт: воркер останавливается
+                logger.debug("Event loop closed, %d subscriptions skipped", len(batch))
+
+        for event, count in counts.items():
+            record_employee_stream_events(event, count)
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+
+@dataclass(eq=False)
+class EmployeeChangeListener(InvalidationBus):
+    """Listens for the change events of ``employee`` and hands them to the
+    broadcaster. Reconnects like the invalidation bus; since events sent
+    in between are lost, every (re)connect resets the subscribers."""
+
+    channel: str = CHANGES_CHANNEL
+    broadcaster: EmployeeChangeBroadcaster = field(
+        default_factory=EmployeeChangeBroadcaster,
+    )
+
+    def dispatch(self, payload: str) -> None:
+        try:
+            changes = json.loads(payload)["changes"]
+            if changes is not None:
+                changes = [EmployeeRowChange.from_payload(change) for change in changes]
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Malformed employee change payload: %r", payload)
+            return
+
+        self.broadcaster.publish(changes)
+
+    def flush(self) -> None:
+        self.broadcaster.publish(None)
+
+
+@cache
+def get_employee_change_listener() -> EmployeeChangeListener:
+    return EmployeeChangeListener(
+        using=settings.INVALIDATION_BUS_DATABASE,
+        reconnect_interval=settings.INVALIDATION_BUS_RECONNECT_INTERVAL,
+        broadcaster=EmployeeChangeBroadcaster(
+            queue_size=settings.EMPLOYEE_STREAM_QUEUE_SIZE,
+            max_subscriptions=settings.EMPLOYEE_STREAM_MAX_CONNECTIONS,
+        ),
+    )
@@ -0,0 +1,133 @@
+import logging
+import threading
+from dataclasses import (
+    dataclass,
+    field,
+)
+from datetime import datetime
+from functools import cache
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from core.api.filters import PaginationIn
+from core.apps.employee.filters import (
+    EmployeeFilters,
+    EmployeeIncludes,
+)
+from core.apps.employee.services.employee import (
+    BaseEmployeeService,
+    CachedEmployeeService,
+)
+from core.project.containers import get_container
+
+
+logger = logging.getLogger("core.employee_cache")
+
+
+HotQuery = tuple[EmployeeFilters, PaginationIn, EmployeeIncludes | None]
+
+
+@dataclass(eq=False)
+class EmployeeCacheWarmer:
+    """Precomputes the hottest list pages and counts.
+
+    ``schedule`` restarts a timer on every call, so a burst of writes
+    leads to a single re-warm once it settles.
+    """
+
+    service: CachedEmployeeService
+    pages: int = 3
+    page_size: int = 20
+    debounce: float = 2.0
+    retry_interval: float = 10.0
+    # Перепрогревать после записей; иначе только сбрасывать кеш
+    rewarm: bool = True
+    warmed_at: datetime | None = None
+    _timer: threading.Timer | None = None
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    @property
+    def ready(self) -> bool:
+        return not self.rewarm or self.warmed_at is not None
+
+    def hot_queries(self) -> list[HotQuery]:
+        queries: list[HotQuery] = [
+            (
+                EmployeeFilters(),
+                PaginationIn(offset=page * self.page_size, limit=self.page_size),
+                None,
+            )
+            for page in range(self.pages)
+        ]
+        # Верхние уровни оргструктуры: корни вместе с прямыми подчинёнными
+        queries.append(
+            (
+                EmployeeFilters(has_manager=False),
+                PaginationIn(limit=self.page_size),
+                EmployeeIncludes(include=["subordinates"]),
+            ),
+        )
+        return queries
+
+    def warm(self) -> int:
+        """Warms all hot queries, returns their number."""
+        queries = self.hot_queries()
+        for filters, pagination, includes in queries:
+            self.service.warm(filters, pagination, includes)
+
+        self.warmed_at = timezone.now()
+        return len(queries)
+
+    def invalidate(self) -> None:
+        self.service.invalidate()
+        if self.rewarm:
+            self.schedule()
+
+    def schedule(self, delay: float | None = None) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+
+            self._timer = threading.Timer(
+                self.debounce if delay is None else delay,
+                self._run,
+            )
+            self._timer.name = "employee-cache-warmup"
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _run(self) -> None:
+        try:
+            count = self.warm()
+            logger.info("Warmed %s employee queries", count)
+        except Exception:
+            logger.exception("Employee cache warm-up failed")
+            self.schedule(self.retry_interval)
+        finally:
+            connections.close_all()
+
+
+@cache
+def get_employee_cache_warmer() -> EmployeeCacheWarmer | None:
+    """Warmer of the process's employee service, ``None`` when the
+    service is not cached."""
+    service = get_container().resolve(BaseEmployeeService)
+    if not isinstance(service, CachedEmployeeService):
+        return None
+
+    return EmployeeCacheWarmer(
+        service=service,
+        pages=settings.EMPLOYEE_CACHE_WARM_PAGES,
+        page_size=settings.EMPLOYEE_CACHE_WARM_PAGE_SIZE,
+        debounce=settings.EMPLOYEE_CACHE_WARM_DEBOUNCE,
+        rewarm=settings.EMPLOYEE_CACHE_WARM,
+    )
+
+
+def start_employee_cache_warmup() -> None:
+    """Post-start hook: warms the cache in the background."""
+    warmer = get_employee_cache_warmer()
+    if warmer is not None and settings.EMPLOYEE_CACHE_WARM:
+        warmer.schedule(delay=0)
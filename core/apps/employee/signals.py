@@ -0,0 +1,30 @@
+from django.db import transaction
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+)
+from django.dispatch import receiver
+
+from core.apps.employee.models import EmployeeModel
+from core.apps.employee.services.warmup import get_employee_cache_warmer
+
+
+@receiver(post_save, sender=EmployeeModel, dispatch_uid="employee_cache_save")
+@receiver(post_delete, sender=EmployeeModel, dispatch_uid="employee_cache_delete")
+def invalidate_employee_cache(sender, using: str, **kwargs) -> None:
+    warmer = get_employee_cache_warmer()
+    if warmer is None:
+        return
+
+    # После коммита: иначе прогрев успеет прочитать старые данные
+    transaction.on_commit(warmer.invalidate, using=using)
+
+
+def invalidate_employee_cache_by_ids(ids: list[int] | None) -> None:
+    # Кеш сотрудников сбрасывается целиком сменой поколения, id не нужны.
+    # Общий кеш сбрасывает процесс, сделавший запись (сигналы выше и
+    # обновление employee_listing): иначе на каждую запись и каждое
+    # переподключение шины поколение меняли и перепрогревали бы все воркеры
+    warmer = get_employee_cache_warmer()
+    if warmer is not None and warmer.service.local:
+        warmer.invalidate()
@@ -1,6 +1,7 @@
 """ASGI config for project project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Requests under ``API_PATH_PREFIX`` go through the shorter ``API_MIDDLEWARE``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -9,7 +10,7 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+from core.project.handlers import get_asgi_application
 
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.project.settings.local")
@@ -0,0 +1,115 @@
+from datetime import timedelta
+from functools import cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+import punq
+
+from core.apps.customers.services.auth import (
+    AuthService,
+    BaseAuthService,
+)
+from core.apps.customers.services.codes import (
+    BaseCodeService,
+    get_code_service,
+)
+from core.apps.customers.services.customers import (
+    BaseCustomerService,
+    CachedCustomerService,
+    get_customer_token_cache,
+    ORMCustomerService,
+)
+from core.apps.customers.services.delivery import (
+    get_code_delivery_queue,
+    get_in_process_worker_pool,
+)
+from core.apps.customers.services.sender import (
+    BaseSenderService,
+    QueuedSendService,
+)
+from core.apps.employee.services import (
+    BaseEmployeeChangesService,
+    BaseEmployeeService,
+    CachedEmployeeService,
+    ORMEmployeeChangesService,
+    SingleFlightEmployeeService,
+)
+
+
+@cache
+def get_container() -> punq.Container:
+    return _initialize_container()
+
+
+def _build_customer_service() -> BaseCustomerService:
+    return CachedCustomerService(
+        customer_service=ORMCustomerService(),
+        cache=get_customer_token_cache(),
+    )
+
+
+def _build_send_service() -> BaseSenderService:
+    return QueuedSendService(
+        queue=get_code_delivery_queue(),
+        worker_pool=get_in_process_worker_pool(),
+    )
+
+
+def _build_employee_service() -> BaseEmployeeService:
+    employee_service = import_string(settings.EMPLOYEE_SERVICE)()
+    if settings.EMPLOYEE_SINGLE_FLIGHT:
+        employee_service = SingleFlightEmployeeService(employee_service=employee_service)
+    if not settings.EMPLOYEE_CACHE_ENABLED:
+        return employee_service
+
+    return CachedEmployeeService(
+        employee_service=employee_service,
+        cache=caches[settings.EMPLOYEE_CACHE],
+        ttl=settings.EMPLOYEE_CACHE_TTL,
+        lock_timeout=settings.EMPLOYEE_CACHE_LOCK_TIMEOUT,
+    )
+
+
+def _build_employee_changes_service() -> BaseEmployeeChangesService:
+    return ORMEmployeeChangesService(
+        settle_seconds=settings.EMPLOYEE_CHANGES_SETTLE_SECONDS,
+        tombstone_retention=timedelta(days=settings.EMPLOYEE_TOMBSTONE_RETENTION_DAYS),
+    )
+
+
+def _initialize_container() -> punq.Container:
+    container = punq.Container()
+
+    # Сервисы без состояния запроса создаются один раз на процесс и делятся
+    # всеми потоками. Это касается и реализации из EMPLOYEE_SERVICE: она обязана
+    # быть потокобезопасной и не хранить состояние запроса в атрибутах
+    container.register(
+        BaseEmployeeService,
+        factory=_build_employee_service,
+        scope=punq.Scope.singleton,
+    )
+    container.register(
+        BaseEmployeeChangesService,
+        factory=_build_employee_changes_service,
+        scope=punq.Scope.singleton,
+    )
+    container.register(
+        BaseCustomerService,
+        factory=_build_customer_service,
+        scope=punq.Scope.singleton,
+    )
+    container.register(
+        BaseCodeService,
+        factory=get_code_service,
+        scope=punq.Scope.singleton,
+    )
+    container.register(
+        BaseSenderService,
+        factory=_build_send_service,
+        scope=punq.Scope.singleton,
+    )
+    container.register(BaseAuthService, AuthService, scope=punq.Scope.singleton)
+
+    return container
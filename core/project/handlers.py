@@ -0,0 +1,168 @@
+import os
+import threading
+import types
+from dataclasses import (
+    dataclass,
+    field,
+)
+from typing import Callable
+
+import django
+from django.conf import settings
+from django.core.handlers import base
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.base import BaseHandler
+from django.core.handlers.wsgi import WSGIHandler
+
+
+class _MiddlewareSettings:
+    """Settings seen by the chain builder of one handler: ``MIDDLEWARE``
+    is replaced, everything else is read from the project settings."""
+
+    def __init__(self, middleware: list[str]):
+        self.MIDDLEWARE = middleware
+
+    def __getattr__(self, name: str):
+        return getattr(settings, name)
+
+
+def _load_middleware_from(middleware: list[str]) -> Callable:
+    # Сам BaseHandler.load_middleware, но с глобальным settings этого обработчика:
+    # сборка цепочки остаётся той, что в установленной версии Django
+    load_middleware = BaseHandler.load_middleware
+    return types.FunctionType(
+        load_middleware.__code__,
+        {**vars(base), "settings": _MiddlewareSettings(middleware)},
+        load_middleware.__name__,
+        load_middleware.__defaults__,
+        load_middleware.__closure__,
+    )
+
+
+class ScopedMiddlewareHandler(BaseHandler):
+    """Handler that builds its chain from ``middleware_setting`` instead
+    of ``settings.MIDDLEWARE``."""
+
+    middleware_setting = "API_MIDDLEWARE"
+
+    def load_middleware(
+        self,
+        is_async: bool = False,
+        middleware_list: list[str] | None = None,
+    ) -> None:
+        if middleware_list is None:
+            middleware_list = getattr(settings, self.middleware_setting)
+
+        _load_middleware_from(middleware_list)(self, is_async=is_async)
+
+
+class ApiWSGIHandler(ScopedMiddlewareHandler, WSGIHandler):
+    pass
+
+
+class ApiASGIHandler(ScopedMiddlewareHandler, ASGIHandler):
+    pass
+
+
+class ApiStreamASGIHandler(ScopedMiddlewareHandler, ASGIHandler):
+    # Только асинхронные middleware: соединение потока не проходит через
+    # общий синхронный поток воркера
+    middleware_setting = "API_STREAM_MIDDLEWARE"
+
+
+@dataclass(eq=False)
+class WorkerStartup:
+    """Runs ``hook`` once per process, before its first request.
+
+    Not at import: threads do not survive ``fork``, and a master that
+    loads the application before forking workers (``gunicorn --preload``)
+    would keep them to itself. A forked child has another pid and runs
+    the hook again.
+    """
+
+    hook: Callable[[], None]
+    _pid: int | None = None
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def __call__(self) -> None:
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+
+        with self._lock:
+            if self._pid != pid:
+                self.hook()
+                self._pid = pid
+
+
+@dataclass(eq=False)
+class WSGIPathDispatcher:
+    """Sends requests under a mounted prefix to its own handler and
+    everything else to ``default``."""
+
+    default: Callable
+    mounts: dict[str, Callable] = field(default_factory=dict)
+    startup: Callable[[], None] | None = None
+
+    def select(self, path: str) -> Callable:
+        for prefix, handler in self.mounts.items():
+            if path.startswith(prefix):
+                return handler
+        return self.default
+
+    def __call__(self, environ: dict, start_response: Callable):
+        if self.startup is not None:
+            self.startup()
+        handler = self.select(environ.get("PATH_INFO", ""))
+        return handler(environ, start_response)
+
+
+@dataclass(eq=False)
+class ASGIPathDispatcher(WSGIPathDispatcher):
+    async def __call__(self, scope: dict, receive: Callable, send: Callable):
+        if self.startup is not None:
+            self.startup()
+        # lifespan и прочие события без пути уходят в основной обработчик
+        handler = self.select(scope.get("path", ""))
+        return await handler(scope, receive, send)
+
+
+def _on_startup() -> None:
+    # Импорт после django.setup(): модули тянут модели
+    from core.apps.common.invalidation import start_invalidation_bus
+    from core.apps.employee.services.warmup import start_employee_cache_warmup
+
+    start_invalidation_bus()
+    start_employee_cache_warmup()
+
+
+def get_wsgi_application() -> Callable:
+    """Like ``django.core.wsgi.get_wsgi_application``, with a lean
+    middleware stack for the API prefix. Background threads start with
+    the first request of each worker."""
+    django.setup(set_prefix=False)
+
+    mounts = {}
+    if settings.API_LEAN_MIDDLEWARE:
+        mounts[settings.API_PATH_PREFIX] = ApiWSGIHandler()
+
+    return WSGIPathDispatcher(
+        default=WSGIHandler(),
+        mounts=mounts,
+        startup=WorkerStartup(hook=_on_startup),
+    )
+
+
+def get_asgi_application() -> Callable:
+    django.setup(set_prefix=False)
+
+    # Поток изменений - раньше префикса API: выбирается первое совпадение
+    mounts = {settings.API_STREAM_PATH: ApiStreamASGIHandler()}
+    if settings.API_LEAN_MIDDLEWARE:
+        mounts[settings.API_PATH_PREFIX] = ApiASGIHandler()
+
+    return ASGIPathDispatcher(
+        default=ASGIHandler(),
+        mounts=mounts,
+        startup=WorkerStartup(hook=_on_startup),
+    )
@@ -10,6 +10,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 """
 
+from copy import deepcopy
 from pathlib import Path
 
 import environ
@@ -44,19 +45,45 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     # First party
+    "core.apps.common.apps.CommonConfig",
     "core.apps.employee.apps.EmployeeConfig",
     "core.apps.customers.apps.CustomersConfig",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "core.api.middlewares.RequestStatsMiddleware",
+    "core.api.middlewares.PrimaryPinningMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "core.api.middlewares.ProfilingMiddleware",
+]
+
+# Отдельная цепочка для /api/: API авторизуется токеном и не использует
+# сессии, пользователей Django, сообщения, CSRF и X-Frame-Options.
+# CommonMiddleware остаётся ради редиректов APPEND_SLASH
+API_LEAN_MIDDLEWARE = env.bool("API_LEAN_MIDDLEWARE", default=True)
+API_PATH_PREFIX = "/api/"
+API_MIDDLEWARE = [
+    "django.middleware.security.SecurityMiddleware",
+    "core.api.middlewares.RequestStatsMiddleware",
+    "core.api.middlewares.PrimaryPinningMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "core.api.middlewares.ProfilingMiddleware",
+]
+# Поток изменений под ASGI держит соединение открытым: синхронные middleware
+# гоняли бы каждое подключение через единственный общий sync-поток воркера.
+# Здесь только middleware, умеющие работать асинхронно
+API_STREAM_PATH = "/api/v1/employees/stream"
+API_STREAM_MIDDLEWARE = [
+    "django.middleware.security.SecurityMiddleware",
+    "django.middleware.common.CommonMiddleware",
 ]
 
 ROOT_URLCONF = "core.project.urls"
@@ -82,6 +109,29 @@ WSGI_APPLICATION = "core.project.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+DATABASE_POOL_ENABLED = env.bool("POSTGRES_POOL_ENABLED", default=True)
+
+# Пул соединений psycopg 3: соединения переживают запрос и проверяются перед выдачей
+DATABASE_POOL_OPTIONS = {
+    "min_size": env.int("POSTGRES_POOL_MIN_SIZE", default=2),
+    "max_size": env.int("POSTGRES_POOL_MAX_SIZE", default=10),
+    # Соединение старше max_lifetime секунд закрывается при возврате в пул
+    "max_lifetime": env.float("POSTGRES_POOL_MAX_LIFETIME", default=1800.0),
+    "max_idle": env.float("POSTGRES_POOL_MAX_IDLE", default=600.0),
+    # Сколько ждать свободного соединения, прежде чем вернуть ошибку
+    "timeout": env.float("POSTGRES_POOL_TIMEOUT", default=10.0),
+}
+
+DATABASE_OPTIONS = {
+    # Параметры передаются отдельно от текста запроса (server-side binding),
+    # повторяющиеся запросы Postgres подготавливает после prepare_threshold выполнений
+    "server_side_binding": env.bool("POSTGRES_SERVER_SIDE_BINDING", default=True),
+    "prepare_threshold": env.int("POSTGRES_PREPARE_THRESHOLD", default=5),
+}
+
+if DATABASE_POOL_ENABLED:
+    DATABASE_OPTIONS["pool"] = DATABASE_POOL_OPTIONS
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -90,9 +140,41 @@ DATABASES = {
         "PASSWORD": env.get_value("POSTGRES_PASSWORD"),
         "HOST": env.get_value("POSTGRES_HOST"),
         "PORT": env.get_value("POSTGRES_PORT"),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": DATABASE_OPTIONS,
     },
 }
 
+# Реплика для чтения каталога. Без POSTGRES_REPLICA_HOST алиаса нет и роутер
+# читает с основной базы: второй пул к ней же был бы лишним
+if env.str("POSTGRES_REPLICA_HOST", default=""):
+    DATABASES["replica"] = {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": env.str("POSTGRES_REPLICA_DB", default=env.get_value("POSTGRES_DB")),
+        "USER": env.str(
+            "POSTGRES_REPLICA_USER", default=env.get_value("POSTGRES_USER")
+        ),
+        "PASSWORD": env.str(
+            "POSTGRES_REPLICA_PASSWORD", default=env.get_value("POSTGRES_PASSWORD")
+        ),
+        "HOST": env.get_value("POSTGRES_REPLICA_HOST"),
+        "PORT": env.str(
+            "POSTGRES_REPLICA_PORT", default=env.get_value("POSTGRES_PORT")
+        ),
+        "CONN_HEALTH_CHECKS": True,
+        # Свой экземпляр: у реплики отдельный пул со своими параметрами
+        "OPTIONS": deepcopy(DATABASE_OPTIONS),
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["core.apps.common.routers.PrimaryReplicaRouter"]
+
+# Чтения этих приложений уходят на реплику
+DATABASE_REPLICA_ALIAS = "replica"
+DATABASE_REPLICA_APP_LABELS = ("employee",)
+# После записи клиент читает с основной базы столько секунд (read-your-writes)
+DATABASE_PRIMARY_STICKY_SECONDS = env.int("POSTGRES_PRIMARY_STICKY_SECONDS", default=5)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -135,3 +217,207 @@ STATIC_ROOT = BASE_DIR / "static"
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+# API instrumentation
+# Server-Timing с количеством SQL-запросов и временем БД/хендлера/сериализации
+API_SERVER_TIMING = env.bool("API_SERVER_TIMING", default=True)
+# Дублировать эти же метрики в ApiResponse.meta (не требует DEBUG)
+API_TIMING_META = env.bool("API_TIMING_META", default=False)
+
+# Metrics
+METRICS_ENABLED = env.bool("METRICS_ENABLED", default=True)
+# Общая директория для агрегации метрик нескольких воркеров (gunicorn/uvicorn)
+METRICS_DIR = env.str("METRICS_DIR", default=None)
+METRICS_FLUSH_INTERVAL = env.float("METRICS_FLUSH_INTERVAL", default=5.0)
+# Сети, которым доступен /api/metrics. За прокси все клиенты приходят с его
+# адреса, поэтому по умолчанию только loopback
+METRICS_ALLOWED_NETWORKS = env.list(
+    "METRICS_ALLOWED_NETWORKS",
+    default=["127.0.0.0/8", "::1/128"],
+)
+# Если задан, /api/metrics требует заголовок Authorization: Bearer <токен>
+METRICS_TOKEN = env.str("METRICS_TOKEN", default="")
+
+# Slow query log
+SLOW_QUERY_LOG_ENABLED = env.bool("SLOW_QUERY_LOG_ENABLED", default=True)
+SLOW_QUERY_THRESHOLD_MS = env.float("SLOW_QUERY_THRESHOLD_MS", default=200.0)
+# EXPLAIN (ANALYZE off, FORMAT JSON) для медленных SELECT
+SLOW_QUERY_EXPLAIN = env.bool("SLOW_QUERY_EXPLAIN", default=True)
+SLOW_QUERY_LOG_PATH = env.str(
+    "SLOW_QUERY_LOG_PATH", default=str(BASE_DIR / "logs" / "slow_queries.log")
+)
+SLOW_QUERY_LOG_MAX_BYTES = env.int("SLOW_QUERY_LOG_MAX_BYTES", default=10 * 1024 * 1024)
+SLOW_QUERY_LOG_BACKUP_COUNT = env.int("SLOW_QUERY_LOG_BACKUP_COUNT", default=5)
+
+# Request profiling
+PROFILING_ENABLED = env.bool("PROFILING_ENABLED", default=False)
+# Профилировать каждый N-й запрос (0 - только запросы с подписанным X-Profile-Token)
+PROFILING_SAMPLE_RATE = env.int("PROFILING_SAMPLE_RATE", default=0)
+PROFILING_TOKEN_MAX_AGE = env.int("PROFILING_TOKEN_MAX_AGE", default=60 * 60)
+PROFILING_DIR = env.str("PROFILING_DIR", default=str(BASE_DIR / "profiles"))
+PROFILING_MAX_PER_ROUTE = env.int("PROFILING_MAX_PER_ROUTE", default=200)
+
+
+# Employee service
+# Реализация BaseEmployeeService, которую получают хендлеры из контейнера:
+# ORMEmployeeService - живые данные, MVEmployeeService - материализованное
+# представление employee_listing (обновляет команда refresh_employee_listing).
+# Экземпляр один на процесс: реализация должна быть потокобезопасной и без
+# состояния запроса
+EMPLOYEE_SERVICE = env.str(
+    "EMPLOYEE_SERVICE",
+    default="core.apps.employee.services.ORMEmployeeService",
+)
+# Обновлять employee_listing не чаще и не реже чем раз в столько секунд
+EMPLOYEE_LISTING_REFRESH_MIN_INTERVAL = env.float(
+    "EMPLOYEE_LISTING_REFRESH_MIN_INTERVAL", default=1.0
+)
+EMPLOYEE_LISTING_REFRESH_MAX_INTERVAL = env.float(
+    "EMPLOYEE_LISTING_REFRESH_MAX_INTERVAL", default=300.0
+)
+
+# Employee cache
+# Страницы списка и счётчики сотрудников в кеше CACHES (общем для воркеров, если не locmem)
+EMPLOYEE_CACHE_ENABLED = env.bool("EMPLOYEE_CACHE_ENABLED", default=True)
+EMPLOYEE_CACHE = env.str("EMPLOYEE_CACHE", default="default")
+EMPLOYEE_CACHE_TTL = env.float("EMPLOYEE_CACHE_TTL", default=30.0)
+# Прогрев при старте воркера и после записей; до первого прогрева /api/ready отвечает 503
+EMPLOYEE_CACHE_WARM = env.bool("EMPLOYEE_CACHE_WARM", default=True)
+# Сколько первых страниц списка без фильтров прогревать и их размер
+EMPLOYEE_CACHE_WARM_PAGES = env.int("EMPLOYEE_CACHE_WARM_PAGES", default=3)
+EMPLOYEE_CACHE_WARM_PAGE_SIZE = env.int("EMPLOYEE_CACHE_WARM_PAGE_SIZE", default=20)
+# Пауза после последней записи перед повторным прогревом (с)
+EMPLOYEE_CACHE_WARM_DEBOUNCE = env.float("EMPLOYEE_CACHE_WARM_DEBOUNCE", default=2.0)
+# Одновременные одинаковые запросы списка и счётчика в процессе ждут один запрос к базе
+EMPLOYEE_SINGLE_FLIGHT = env.bool("EMPLOYEE_SINGLE_FLIGHT", default=True)
+# То же между процессами: блокировка в EMPLOYEE_CACHE на промах (с); 0 - выключено.
+# Имеет смысл только с общим кешем
+EMPLOYEE_CACHE_LOCK_TIMEOUT = env.float("EMPLOYEE_CACHE_LOCK_TIMEOUT", default=0.0)
+
+# Cache invalidation bus
+# Поток в каждом воркере слушает NOTIFY от триггеров employee и customer
+# и сбрасывает кеши процесса. Без него кеши устаревают только по TTL
+INVALIDATION_BUS_ENABLED = env.bool("INVALIDATION_BUS_ENABLED", default=True)
+INVALIDATION_BUS_DATABASE = env.str("INVALIDATION_BUS_DATABASE", default="default")
+# Пауза перед переподключением после обрыва (с)
+INVALIDATION_BUS_RECONNECT_INTERVAL = env.float(
+    "INVALIDATION_BUS_RECONNECT_INTERVAL", default=5.0
+)
+
+# Employee batch lookups
+# Размер чанка для запросов id = ANY(...) в загрузчике сотрудников
+EMPLOYEE_BATCH_CHUNK_SIZE = env.int("EMPLOYEE_BATCH_CHUNK_SIZE", default=1000)
+# Максимум id в одном запросе POST /api/v1/employees/batch
+EMPLOYEE_BATCH_MAX_IDS = env.int("EMPLOYEE_BATCH_MAX_IDS", default=10000)
+# Максимум подчинённых на сотрудника при include=subordinates
+EMPLOYEE_SUBORDINATES_LIMIT = env.int("EMPLOYEE_SUBORDINATES_LIMIT", default=20)
+
+
+# Employee change feed
+# Запас (с) сверх начала самой старой открытой транзакции: расхождение часов приложения и базы
+EMPLOYEE_CHANGES_MAX_LIMIT = env.int("EMPLOYEE_CHANGES_MAX_LIMIT", default=1000)
+# Изменения моложе этого (с) не отдаются: ещё идущие транзакции могут их дополнить
+EMPLOYEE_CHANGES_SETTLE_SECONDS = env.float(
+    "EMPLOYEE_CHANGES_SETTLE_SECONDS", default=5.0
+)
+# Сколько дней хранить записи об удалениях; курсор старше - 410, полная пересинхронизация
+EMPLOYEE_TOMBSTONE_RETENTION_DAYS = env.int(
+    "EMPLOYEE_TOMBSTONE_RETENTION_DAYS", default=30
+)
+
+# Employee change stream
+# GET /api/v1/employees/stream (SSE, только под ASGI): соединений на воркер,
+# дальше 503
+EMPLOYEE_STREAM_MAX_CONNECTIONS = env.int("EMPLOYEE_STREAM_MAX_CONNECTIONS", default=5000)
+# Событий в очереди соединения; медленный клиент вместо потерянных получает reset
+EMPLOYEE_STREAM_QUEUE_SIZE = env.int("EMPLOYEE_STREAM_QUEUE_SIZE", default=100)
+# Комментарий-пинг в тихом потоке раз в столько секунд: прокси не рвут соединение
+EMPLOYEE_STREAM_HEARTBEAT = env.float("EMPLOYEE_STREAM_HEARTBEAT", default=15.0)
+
+# Customer token auth
+# Кеш token -> пользователь в памяти процесса (LRU + TTL)
+CUSTOMER_TOKEN_CACHE_SIZE = env.int("CUSTOMER_TOKEN_CACHE_SIZE", default=10000)
+CUSTOMER_TOKEN_CACHE_TTL = env.float("CUSTOMER_TOKEN_CACHE_TTL", default=60.0)
+# Закрыть эндпоинты сотрудников токеном пользователя (Authorization: Bearer <token>)
+EMPLOYEES_REQUIRE_AUTH = env.bool("EMPLOYEES_REQUIRE_AUTH", default=False)
+
+
+# Auth code delivery
+# Шлюз SMS: класс-наследник BaseSmsGateway
+CODE_DELIVERY_GATEWAY = env.str(
+    "CODE_DELIVERY_GATEWAY",
+    default="core.apps.customers.services.gateways.ConsoleSmsGateway",
+)
+# Потоки-отправители внутри веб-процесса (0 - только команда run_code_delivery)
+CODE_DELIVERY_IN_PROCESS_WORKERS = env.int(
+    "CODE_DELIVERY_IN_PROCESS_WORKERS", default=1
+)
+CODE_DELIVERY_BATCH_SIZE = env.int("CODE_DELIVERY_BATCH_SIZE", default=50)
+CODE_DELIVERY_POLL_INTERVAL = env.float("CODE_DELIVERY_POLL_INTERVAL", default=1.0)
+# Backpressure: сверх этого числа неотправленных кодов /auth отвечает 503
+CODE_DELIVERY_MAX_PENDING = env.int("CODE_DELIVERY_MAX_PENDING", default=10000)
+CODE_DELIVERY_MAX_ATTEMPTS = env.int("CODE_DELIVERY_MAX_ATTEMPTS", default=5)
+# Пауза перед повтором: backoff * 2^(попытка - 1) секунд
+CODE_DELIVERY_RETRY_BACKOFF = env.float("CODE_DELIVERY_RETRY_BACKOFF", default=2.0)
+# Через сколько секунд строку упавшего воркера заберёт другой воркер
+CODE_DELIVERY_LEASE_SECONDS = env.float("CODE_DELIVERY_LEASE_SECONDS", default=30.0)
+# Отправленные и недоставленные строки удаляет команда purge_code_deliveries
+CODE_DELIVERY_RETENTION_HOURS = env.int("CODE_DELIVERY_RETENTION_HOURS", default=24)
+
+
+# Auth codes
+# Хранилище кодов: общая для всех воркеров таблица (или DjangoCacheCodeService)
+AUTH_CODE_SERVICE = env.str(
+    "AUTH_CODE_SERVICE",
+    default="core.apps.customers.services.codes.DatabaseCodeService",
+)
+AUTH_CODE_TTL = env.float("AUTH_CODE_TTL", default=300.0)
+# Окно (с) с первого кода на номер: за окно не больше AUTH_CODE_MAX_ATTEMPTS
+# неверных попыток (новый код их не сбрасывает) и AUTH_CODE_MAX_REQUESTS кодов,
+# дальше /confirm и /auth отвечают 429 до конца окна
+AUTH_CODE_WINDOW = env.float("AUTH_CODE_WINDOW", default=3600.0)
+AUTH_CODE_MAX_ATTEMPTS = env.int("AUTH_CODE_MAX_ATTEMPTS", default=5)
+AUTH_CODE_MAX_REQUESTS = env.int("AUTH_CODE_MAX_REQUESTS", default=5)
+
+
+# API admission control
+# Общий для всех воркеров кеш (состояние rate limit и т.п.): locmemcache://, dbcache://table, rediscache://host:port/db.
+# locmemcache:// - у каждого процесса свой лимит (manage.py check предупреждает);
+# точный общий лимит - rediscache:// (атомарный INCR), у dbcache:// incr не атомарен
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
+API_THROTTLE_ENABLED = env.bool("API_THROTTLE_ENABLED", default=True)
+# Сколько доверенных прокси перед приложением добавляют X-Forwarded-For.
+# 0 - IP клиента берётся из REMOTE_ADDR, заголовок от клиента не учитывается
+NINJA_NUM_PROXIES = env.int("NINJA_NUM_PROXIES", default=0)
+API_THROTTLE_CACHE = env.str("API_THROTTLE_CACHE", default="default")
+# Token bucket: запросов в секунду и размер всплеска на IP и на токен пользователя
+API_THROTTLE_IP_RATE = env.float("API_THROTTLE_IP_RATE", default=20.0)
+API_THROTTLE_IP_BURST = env.int("API_THROTTLE_IP_BURST", default=40)
+API_THROTTLE_TOKEN_RATE = env.float("API_THROTTLE_TOKEN_RATE", default=50.0)
+API_THROTTLE_TOKEN_BURST = env.int("API_THROTTLE_TOKEN_BURST", default=100)
+# Максимальный limit в пагинации
+API_MAX_PAGE_SIZE = env.int("API_MAX_PAGE_SIZE", default=100)
+# Одновременных "дорогих" запросов (поиск по подстроке, большой offset) на процесс
+API_MAX_CONCURRENT_EXPENSIVE_QUERIES = env.int(
+    "API_MAX_CONCURRENT_EXPENSIVE_QUERIES", default=4
+)
+API_EXPENSIVE_QUERY_OFFSET = env.int("API_EXPENSIVE_QUERY_OFFSET", default=10000)
+# Сколько секунд ждать свободный слот, прежде чем ответить 429
+API_EXPENSIVE_QUERY_WAIT = env.float("API_EXPENSIVE_QUERY_WAIT", default=0.5)
+API_EXPENSIVE_QUERY_RETRY_AFTER = env.float(
+    "API_EXPENSIVE_QUERY_RETRY_AFTER", default=1.0
+)
+
+# Query budgets
+# Суммарное время SQL на запрос (мс), передаётся в Postgres как statement_timeout; 0 - без ограничения
+API_QUERY_BUDGET_MS = env.float("API_QUERY_BUDGET_MS", default=5000.0)
+# Бюджеты отдельных эндпоинтов по url name (имя функции-хендлера)
+API_QUERY_BUDGETS_MS = {
+    "get_employees_list_handler": env.float(
+        "API_QUERY_BUDGET_EMPLOYEES_LIST_MS", default=2000.0
+    ),
+    "get_employees_batch_handler": env.float(
+        "API_QUERY_BUDGET_EMPLOYEES_BATCH_MS", default=3000.0
+    ),
+}
@@ -1,6 +1,7 @@
 """WSGI config for project project.
 
 It exposes the WSGI callable as a module-level variable named ``application``.
+Requests under ``API_PATH_PREFIX`` go through the shorter ``API_MIDDLEWARE``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
@@ -9,7 +10,7 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 
 import os
 
-from django.core.wsgi import get_wsgi_application
+from core.project.handlers import get_wsgi_application
 
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.project.settings.local")
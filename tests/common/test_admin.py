@@ -0,0 +1,69 @@
+"""Test employee admin on a large table.
+
+1. Test the changelist filters by manager and position without loading choices
+2. Test the paginator counts small results exactly and estimates large ones
+
+"""
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+from tests.factories.employee import EmployeeModelFactory
+
+from core.api.middlewares import PRIMARY_COOKIE
+from core.apps.common.admin import EstimatedCountPaginator
+from core.apps.common.routers import use_primary
+from core.apps.employee.models import EmployeeModel
+
+
+@pytest.fixture
+def admin_client() -> Client:
+    user = User.objects.create_superuser("admin", "admin@example.com", "password")
+    client = Client()
+    client.force_login(user)
+    # Зеркало реплики не видит транзакцию теста, читаем с основной базы
+    client.cookies[PRIMARY_COOKIE] = "1"
+    return client
+
+
+@pytest.mark.django_db
+def test_changelist_input_filters(admin_client: Client):
+    """Test manager and position filters narrow the changelist."""
+    manager = EmployeeModelFactory(last_name="Смирнов", position="Директор")
+    subordinate = EmployeeModelFactory(manager=manager, position="Инженер")
+    EmployeeModelFactory.create_batch(size=3, position="Бухгалтер")
+
+    by_manager = admin_client.get(
+        "/admin/employee/employeemodel/", {"manager": "смир"}
+    )
+    by_position = admin_client.get(
+        "/admin/employee/employeemodel/", {"position": "инж"}
+    )
+
+    assert by_manager.status_code == 200
+    assert list(by_manager.context["cl"].result_list) == [subordinate]
+    assert list(by_position.context["cl"].result_list) == [subordinate]
+
+
+@pytest.mark.django_db
+def test_paginator_counts():
+    """Test exact count below the threshold and estimate above it."""
+    EmployeeModelFactory.create_batch(size=3)
+    queryset = EmployeeModel.objects.filter(salary__gte=0).order_by("-id")
+
+    with use_primary():
+        assert EstimatedCountPaginator(queryset, 10).count == 3
+
+        if connection.vendor != "postgresql":
+            return
+
+        paginator = EstimatedCountPaginator(queryset, 10)
+        paginator.exact_count_threshold = 0
+        with CaptureQueriesContext(connection) as captured:
+            estimate = paginator.count
+
+    assert estimate >= 1
+    assert not any("COUNT(" in query["sql"] for query in captured.captured_queries)
@@ -0,0 +1,110 @@
+"""Test API admission control.
+
+1. Test token bucket admits a burst and then asks to wait
+2. Test customers and IPs get separate buckets, a forged token counts as its IP
+3. Test expensive queries over the concurrency cap are shed with 429 and Retry-After
+4. Test page size above the maximum is rejected
+
+"""
+
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.test import (
+    Client,
+    RequestFactory,
+)
+
+import pytest
+
+from core.api.admission import (
+    get_expensive_query_limiter,
+    TokenBucketThrottle,
+)
+from core.api.middlewares import PRIMARY_COOKIE
+from core.apps.customers.services.customers import BaseCustomerService
+from core.project.containers import get_container
+
+
+def _throttle(prefix: str) -> TokenBucketThrottle:
+    return TokenBucketThrottle(
+        ip_rate=1.0,
+        ip_burst=2,
+        token_rate=1.0,
+        token_burst=3,
+        key_prefix=prefix,
+    )
+
+
+def test_token_bucket_burst():
+    """Test burst requests pass and the next one gets a wait hint."""
+    throttle = _throttle("test-burst")
+    request = RequestFactory().get("/api/v1/employees/")
+
+    assert throttle.allow_request(request)
+    assert throttle.allow_request(request)
+    assert not throttle.allow_request(request)
+    assert 0 < throttle.wait() <= 1.0
+
+
+@pytest.mark.django_db
+def test_token_bucket_per_client():
+    """Test a customer is limited apart from its IP, a forged token is not."""
+    throttle = _throttle("test-clients")
+    customer_service = get_container().resolve(BaseCustomerService)
+    customer_service.get_or_create("+79990000039")
+    token = customer_service.generate_token("+79990000039")
+    factory = RequestFactory()
+    anonymous = factory.get("/api/v1/employees/")
+    customer = factory.get(
+        "/api/v1/employees/", headers={"Authorization": f"Bearer {token}"}
+    )
+    forged = factory.get(
+        "/api/v1/employees/", headers={"Authorization": "Bearer forged-token"}
+    )
+
+    assert [throttle.allow_request(anonymous) for _ in range(2)] == [True, True]
+    # Случайный токен не даёт отдельной корзины: лимит IP уже исчерпан
+    assert not throttle.allow_request(forged)
+    assert [throttle.allow_request(customer) for _ in range(4)] == [
+        True,
+        True,
+        True,
+        False,
+    ]
+
+
+@pytest.mark.django_db
+def test_expensive_queries_shed():
+    """Test a search beyond the concurrency cap gets 429 with Retry-After."""
+    limiter = get_expensive_query_limiter()
+    client = Client()
+    # Зеркало реплики не видит транзакцию теста, читаем с основной базы
+    client.cookies[PRIMARY_COOKIE] = "1"
+
+    with ExitStack() as stack:
+        for _ in range(limiter.limit):
+            stack.enter_context(limiter.slot())
+
+        response = client.get("/api/v1/employees/", {"search": "Ivan"})
+        # Запрос без поиска не считается дорогим и проходит
+        cheap_response = client.get("/api/v1/employees/")
+
+    released_response = client.get("/api/v1/employees/", {"search": "Ivan"})
+
+    assert response.status_code == 429
+    assert response["Retry-After"] == "1"
+    assert cheap_response.status_code == 200
+    assert released_response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_max_page_size():
+    """Test limit above API_MAX_PAGE_SIZE is a validation error."""
+    client = Client()
+
+    response = client.get(
+        "/api/v1/employees/", {"limit": settings.API_MAX_PAGE_SIZE + 1}
+    )
+
+    assert response.status_code == 422
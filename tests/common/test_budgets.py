@@ -0,0 +1,70 @@
+"""Test per-request query budgets.
+
+1. Test a statement over the budget is cancelled by Postgres and translated
+2. Test no statement starts once the budget is spent
+3. Test the list endpoint degrades to total=null when the count blows the budget
+
+"""
+
+from time import sleep
+
+from django.db import (
+    connection,
+    transaction,
+)
+from django.test import Client
+
+import pytest
+from tests.factories.employee import EmployeeModelFactory
+
+from core.api.middlewares import PRIMARY_COOKIE
+from core.apps.common.budgets import query_budget
+from core.apps.common.exceptions import QueryBudgetExceededException
+from core.apps.employee.services import ORMEmployeeService
+
+
+@pytest.mark.django_db
+def test_statement_cancelled_by_budget():
+    """Test a slow statement raises QueryBudgetExceededException."""
+    if connection.vendor != "postgresql":
+        pytest.skip("statement_timeout is Postgres-only")
+
+    with pytest.raises(QueryBudgetExceededException):
+        # Savepoint: отменённый запрос не ломает транзакцию теста
+        with transaction.atomic(), query_budget(50), connection.cursor() as cursor:
+            cursor.execute("SELECT pg_sleep(1)")
+
+    with connection.cursor() as cursor:
+        cursor.execute("SHOW statement_timeout")
+        assert cursor.fetchone()[0] == "0", "timeout must be reset"
+
+
+@pytest.mark.django_db
+def test_spent_budget_rejects_statements():
+    """Test statements after the deadline are not sent to the database."""
+    with query_budget(1), connection.cursor() as cursor:
+        sleep(0.01)
+        with pytest.raises(QueryBudgetExceededException):
+            cursor.execute("SELECT 1")
+
+
+@pytest.mark.django_db
+def test_list_degrades_without_total(monkeypatch):
+    """Test the page is returned without total when the count times out."""
+    EmployeeModelFactory.create_batch(size=3)
+
+    def get_employee_count(self, filters):
+        raise QueryBudgetExceededException(budget_ms=2000)
+
+    monkeypatch.setattr(ORMEmployeeService, "get_employee_count", get_employee_count)
+    client = Client()
+    # Зеркало реплики не видит транзакцию теста, читаем с основной базы
+    client.cookies[PRIMARY_COOKIE] = "1"
+
+    response = client.get("/api/v1/employees/", {"search": "a"})
+    body = response.json()
+
+    assert response.status_code == 200
+    assert body["data"]["pagination"]["total"] is None
+    assert body["errors"][0]["code"] == "query_budget_exceeded"
+    assert body["errors"][0]["target"] == "pagination.total"
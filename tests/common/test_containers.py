@@ -0,0 +1,35 @@
+"""Test the service container.
+
+1. Test stateless services are resolved once per process
+2. Test the employee service implementation comes from settings behind single-flight and the cache
+
+"""
+
+from core.apps.customers.services.auth import BaseAuthService
+from core.apps.customers.services.customers import BaseCustomerService
+from core.apps.employee.services import (
+    BaseEmployeeService,
+    CachedEmployeeService,
+    ORMEmployeeService,
+    SingleFlightEmployeeService,
+)
+from core.project.containers import get_container
+
+
+def test_singletons():
+    """Test repeated resolves return the same instances."""
+    container = get_container()
+
+    auth_service = container.resolve(BaseAuthService)
+
+    assert container.resolve(BaseAuthService) is auth_service
+    assert container.resolve(BaseCustomerService) is auth_service.customer_service
+
+
+def test_employee_service_from_settings():
+    """Test the configured employee service is resolved behind the wrappers."""
+    service = get_container().resolve(BaseEmployeeService)
+
+    assert isinstance(service, CachedEmployeeService)
+    assert isinstance(service.employee_service, SingleFlightEmployeeService)
+    assert isinstance(service.employee_service.employee_service, ORMEmployeeService)
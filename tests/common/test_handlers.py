@@ -0,0 +1,151 @@
+"""Test the path-scoped middleware stacks.
+
+1. Test /api/ requests skip the session, CSRF and clickjacking middleware,
+   but keep APPEND_SLASH redirects
+2. Test the admin keeps the full stack
+3. Test the lean chain is built without touching settings.MIDDLEWARE, the
+   same way Django builds the full one
+4. Test background threads start on the first request of each process
+5. Test the ASGI stream route gets a chain that never adapts to sync
+
+"""
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import RequestFactory
+
+import pytest
+
+from core.project.handlers import (
+    ApiASGIHandler,
+    ApiStreamASGIHandler,
+    get_asgi_application,
+    ApiWSGIHandler,
+    get_wsgi_application,
+    WSGIPathDispatcher,
+)
+
+
+@pytest.fixture
+def application(settings) -> WSGIPathDispatcher:
+    # Прогрев кеша и шина инвалидации ходят в базу, здесь она не нужна
+    settings.EMPLOYEE_CACHE_WARM = False
+    settings.INVALIDATION_BUS_ENABLED = False
+    return get_wsgi_application()
+
+
+def _get(application, path: str):
+    response = application(RequestFactory().get(path).environ, lambda *args: None)
+    response.close()
+    return response
+
+
+def test_api_lean_stack(application: WSGIPathDispatcher):
+    """Test the API is served by the lean handler."""
+    response = _get(application, "/api/ping")
+
+    assert isinstance(application.select("/api/ping"), ApiWSGIHandler)
+    assert response.status_code == 200
+    assert "X-Frame-Options" not in response
+    assert "Server-Timing" in response
+    assert _get(application, "/api/v1/employees")["Location"] == "/api/v1/employees/"
+
+
+def test_admin_full_stack(application: WSGIPathDispatcher):
+    """Test the admin still gets the full middleware."""
+    response = _get(application, "/admin/login/")
+
+    assert not isinstance(application.select("/admin/login/"), ApiWSGIHandler)
+    assert response.status_code == 200
+    assert response["X-Frame-Options"] == "DENY"
+
+
+
+class RecordingMiddleware:
+    # Запоминает settings.MIDDLEWARE в момент сборки цепочки
+    seen: list = []
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.seen.append(list(settings.MIDDLEWARE))
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+
+def test_scoped_chain_settings(settings):
+    """Test the lean chain never swaps the global MIDDLEWARE setting."""
+    settings.API_MIDDLEWARE = [f"{__name__}.RecordingMiddleware"]
+    RecordingMiddleware.seen.clear()
+
+    ApiWSGIHandler()
+
+    assert RecordingMiddleware.seen == [list(settings.MIDDLEWARE)]
+
+
+def _hooks(handler) -> list[list[str]]:
+    # Под ASGI синхронные методы обёрнуты в SyncToAsync, сам метод в .func
+    return [
+        [getattr(method, "func", method).__qualname__ for method in methods]
+        for methods in (
+            handler._view_middleware,
+            handler._template_response_middleware,
+            handler._exception_middleware,
+        )
+    ]
+
+
+@pytest.mark.parametrize(
+    ("scoped_class", "stock_class"),
+    [(ApiWSGIHandler, WSGIHandler), (ApiASGIHandler, ASGIHandler)],
+)
+def test_scoped_chain_matches_django(settings, scoped_class, stock_class):
+    """Test the lean handler gets the hooks a stock handler gets for the
+    same list."""
+    scoped = scoped_class()
+    settings.MIDDLEWARE = settings.API_MIDDLEWARE
+    stock = stock_class()
+
+    assert _hooks(scoped) == _hooks(stock)
+    assert _hooks(scoped)[0] == ["ProfilingMiddleware.process_view"]
+    assert type(scoped._middleware_chain) is type(stock._middleware_chain)
+
+
+def test_startup_per_process(monkeypatch, settings):
+    """Test startup runs once per pid, not when the application loads."""
+    settings.API_LEAN_MIDDLEWARE = False
+    started = []
+    monkeypatch.setattr("core.project.handlers._on_startup", lambda: started.append(1))
+    application = get_wsgi_application()
+
+    assert started == []
+
+    _get(application, "/api/ping")
+    _get(application, "/api/ping")
+    assert started == [1]
+
+    # Воркер, форкнутый после загрузки приложения (gunicorn --preload)
+    monkeypatch.setattr("core.project.handlers.os.getpid", lambda: -1)
+    _get(application, "/api/ping")
+    assert started == [1, 1]
+
+
+def test_stream_chain_async(caplog, settings):
+    """Test only the stream route skips the sync middleware adapters."""
+    settings.DEBUG = True
+    application = get_asgi_application()
+
+    with caplog.at_level("DEBUG", logger="django.request"):
+        ApiStreamASGIHandler()
+    assert not [record for record in caplog.records if "adapted" in record.message]
+
+    with caplog.at_level("DEBUG", logger="django.request"):
+        ApiASGIHandler()
+    assert [record for record in caplog.records if "adapted" in record.message]
+
+    assert isinstance(
+        application.select("/api/v1/employees/stream"),
+        ApiStreamASGIHandler,
+    )
+    assert isinstance(application.select("/api/v1/employees/"), ApiASGIHandler)
@@ -0,0 +1,124 @@
+"""Test the cache invalidation bus.
+
+1. Test notifications reach the handlers of their table, malformed ones
+   are dropped
+2. Test table triggers notify with the ids of changed rows
+3. Test customer notifications evict cached tokens, hot ones under LRU
+   pressure too
+4. Test a bus whose thread is gone (as after fork) starts a new one
+
+"""
+
+import json
+import threading
+
+from django.db import connection
+
+import pytest
+from tests.factories.employee import EmployeeModelFactory
+
+from core.apps.common.invalidation import InvalidationBus
+from core.apps.customers.services.customers import (
+    CachedCustomerService,
+    get_customer_token_cache,
+    invalidate_customer_tokens,
+    ORMCustomerService,
+)
+from core.apps.employee.models import EmployeeModel
+
+
+def test_dispatch():
+    """Test payloads are routed by table and a reconnect flushes all."""
+    received = []
+    bus = InvalidationBus()
+    bus.subscribe("employee", received.append)
+
+    bus.dispatch(json.dumps({"table": "employee", "ids": [1, 2]}))
+    bus.dispatch(json.dumps({"table": "customer", "ids": [3]}))
+    bus.dispatch("not json")
+    bus.flush()
+
+    assert received == [[1, 2], None]
+
+
+def _notifications(listener, count: int) -> list[dict]:
+    return [
+        json.loads(notify.payload)
+        for notify in listener.notifies(timeout=2, stop_after=count)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_trigger_notifies():
+    """Test inserts, bulk updates and deletes are announced after commit."""
+    bus = InvalidationBus(using=connection.alias)
+
+    with bus.connect() as listener:
+        employees = EmployeeModelFactory.create_batch(size=2)
+        ids = sorted(employee.id for employee in employees)
+        EmployeeModel.objects.filter(id__in=ids).update(position="Инженер")
+        EmployeeModel.objects.filter(id=ids[0]).delete()
+
+        messages = _notifications(listener, 4)
+
+    assert [message["table"] for message in messages] == ["employee"] * 4
+    assert sorted(messages[0]["ids"] + messages[1]["ids"]) == ids
+    assert sorted(messages[2]["ids"]) == ids
+    assert messages[3]["ids"] == [ids[0]]
+
+
+@pytest.mark.django_db
+def test_customer_tokens_evicted():
+    """Test a notification for a customer drops its cached token."""
+    cache = get_customer_token_cache()
+    service = CachedCustomerService(customer_service=ORMCustomerService(), cache=cache)
+    customer = service.get_or_create("+79990000010")
+    token = service.generate_token(customer.phone)
+    service.get_by_token(token)
+
+    invalidate_customer_tokens([customer.id])
+
+    assert cache.get(("token", token)) is None
+    assert cache.get(("phone", customer.phone)) is None
+
+    service.get_by_token(token)
+    invalidate_customer_tokens(None)
+    assert len(cache) == 0
+
+
+@pytest.mark.django_db
+def test_customer_tokens_evicted_busy_cache(monkeypatch):
+    """Test a token in constant use keeps its id index through LRU eviction."""
+    cache = get_customer_token_cache()
+    cache.clear()
+    monkeypatch.setattr(cache, "maxsize", 5)
+    service = CachedCustomerService(customer_service=ORMCustomerService(), cache=cache)
+    customers = [
+        service.get_or_create(phone)
+        for phone in ("+79990000021", "+79990000022", "+79990000023")
+    ]
+    tokens = [service.generate_token(customer.phone) for customer in customers]
+
+    service.get_by_token(tokens[0])
+    for token in tokens[1:] * 2:
+        service.get_by_token(tokens[0])
+        service.get_by_token(token)
+
+    invalidate_customer_tokens([customers[0].id])
+
+    assert cache.get(("token", tokens[0])) is None
+
+
+def test_restart_after_fork():
+    """Test start() replaces a dead listener thread."""
+    bus = InvalidationBus()
+    # Поток родителя в дочернем процессе после fork не жив
+    bus._thread = threading.Thread(target=lambda: None)
+    bus._thread.start()
+    bus._thread.join()
+    bus._run = lambda: None
+
+    bus.start()
+
+    assert bus._thread.name == "invalidation-bus"
+    bus.stop()
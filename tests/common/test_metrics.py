@@ -0,0 +1,103 @@
+"""Test metrics registry.
+
+1. Test histogram buckets and counters are rendered in Prometheus format
+2. Test snapshots of several workers are aggregated via shared directory
+3. Test concurrent flushes and an unwritable directory never fail a caller
+4. Test the endpoint is limited to loopback and, when set, to the token
+
+"""
+
+import json
+import threading
+
+from django.test import Client
+
+from core.apps.common.metrics import MetricsRegistry
+
+
+def test_render_counters_and_histograms():
+    """Test counters and histograms rendering."""
+    registry = MetricsRegistry()
+    registry.inc(
+        "api_requests_total", {"route": "ping", "method": "GET", "status": "200"}
+    )
+    registry.observe("api_request_duration_seconds", {"route": "ping"}, 0.02)
+    registry.observe("api_request_duration_seconds", {"route": "ping"}, 0.3)
+
+    rendered = registry.render()
+
+    assert 'api_requests_total{method="GET",route="ping",status="200"} 1' in rendered
+    assert 'api_request_duration_seconds_bucket{route="ping",le="0.025"} 1' in rendered
+    assert 'api_request_duration_seconds_bucket{route="ping",le="0.5"} 2' in rendered
+    assert 'api_request_duration_seconds_count{route="ping"} 2' in rendered
+
+
+def test_aggregate_workers_through_directory(tmp_path):
+    """Test metrics of different processes are summed."""
+    first_worker = MetricsRegistry(directory=tmp_path)
+    second_worker = MetricsRegistry(directory=tmp_path)
+
+    first_worker.inc("cache_requests_total", {"cache": "tokens", "result": "hit"}, 3)
+    first_worker.flush()
+    # Оба реестра живут в одном процессе, поэтому переименовываем файл первого "воркера"
+    next(tmp_path.glob("*.json")).rename(tmp_path / "other-worker.json")
+    second_worker.inc("cache_requests_total", {"cache": "tokens", "result": "miss"})
+
+    rendered = second_worker.render()
+
+    assert 'cache_requests_total{cache="tokens",result="hit"} 3' in rendered
+    assert 'cache_requests_total{cache="tokens",result="miss"} 1' in rendered
+    assert 'cache_hit_ratio{cache="tokens"} 0.75' in rendered
+
+
+def test_flush_concurrent_and_failing(tmp_path):
+    """Test racing threads publish whole snapshots and write errors are
+    swallowed."""
+    registry = MetricsRegistry(directory=tmp_path, flush_interval=0)
+    errors = []
+
+    def record():
+        try:
+            for _ in range(200):
+                registry.inc("cache_requests_total", {"cache": "tokens", "result": "hit"})
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=record) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    registry.flush()
+
+    assert errors == []
+    assert [path.suffix for path in tmp_path.iterdir()] == [".json"]
+    snapshot = json.loads(next(tmp_path.glob("*.json")).read_text())
+    assert snapshot["counters"][0][2] == 1600
+
+    # Каталог метрик занят файлом: запись падает, но запрос не должен
+    blocked = tmp_path / "blocked"
+    blocked.write_text("")
+    failing = MetricsRegistry(directory=blocked, flush_interval=0)
+    failing.inc("cache_requests_total", {"cache": "tokens", "result": "miss"})
+    failing.flush()
+
+
+def test_metrics_endpoint_access(settings):
+    """Test private proxy addresses and missing tokens get 404."""
+    client = Client()
+
+    assert client.get("/api/metrics").status_code == 200
+    # Адрес прокси в частной сети больше не открывает метрики
+    assert client.get("/api/metrics", REMOTE_ADDR="10.0.0.5").status_code == 404
+
+    settings.METRICS_TOKEN = "secret"
+    assert client.get("/api/metrics").status_code == 404
+    assert (
+        client.get("/api/metrics", headers={"Authorization": "Bearer wrong"}).status_code
+        == 404
+    )
+    assert (
+        client.get("/api/metrics", headers={"Authorization": "Bearer secret"}).status_code
+        == 200
+    )
@@ -0,0 +1,107 @@
+"""Test request profiling.
+
+1. Test signed profile tokens are accepted until they expire, forged ones never
+2. Test sampling profiles one in N requests without a token
+3. Test profiles are stored per route and capped at PROFILING_MAX_PER_ROUTE
+4. Test the profiles command lists routes and aggregates the latest profiles
+
+"""
+
+import cProfile
+import random
+import re
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import Client
+
+import pytest
+
+from core.api.middlewares import PRIMARY_COOKIE
+from core.apps.common.profiling import (
+    is_valid_profile_token,
+    list_profiles,
+    make_profile_token,
+    PROFILE_HEADER,
+    should_profile,
+    store_profile,
+)
+
+
+def test_profile_token():
+    """Test valid, expired and forged tokens."""
+    token = make_profile_token()
+    value, timestamp, signature = token.split(":")
+
+    assert is_valid_profile_token(token, max_age=60)
+    # Отрицательный срок: любой токен уже просрочен
+    assert not is_valid_profile_token(token, max_age=-1)
+    assert not is_valid_profile_token(f"{value}:{timestamp}:{signature[::-1]}", 60)
+    assert not is_valid_profile_token("profile", max_age=60)
+    # Неверный токен не профилирует даже при выборке каждого запроса
+    assert not should_profile("forged", sample_rate=1, max_age=60)
+    assert should_profile(token, sample_rate=0, max_age=60)
+
+
+def test_profile_sampling():
+    """Test requests without a token are sampled at the configured rate."""
+    random.seed(30)
+    sampled = sum(should_profile(None, sample_rate=4, max_age=60) for _ in range(4000))
+
+    assert not should_profile(None, sample_rate=0, max_age=60)
+    assert should_profile(None, sample_rate=1, max_age=60)
+    assert 900 < sampled < 1100
+
+
+@pytest.mark.django_db
+def test_profiles_stored_per_route(settings, tmp_path):
+    """Test each profiled call lands under its route, old ones are dropped."""
+    settings.PROFILING_ENABLED = True
+    settings.PROFILING_DIR = str(tmp_path)
+    settings.PROFILING_MAX_PER_ROUTE = 2
+    client = Client()
+    # Зеркало реплики не видит транзакцию теста, читаем с основной базы
+    client.cookies[PRIMARY_COOKIE] = "1"
+    token = make_profile_token()
+
+    responses = [
+        client.get("/api/v1/employees/", headers={PROFILE_HEADER: token})
+        for _ in range(3)
+    ]
+    profiles = list_profiles(tmp_path)
+    route = "get_employees_list_handler"
+
+    assert [response.status_code for response in responses] == [200] * 3
+    assert list(profiles) == [route]
+    assert len(profiles[route]) == 2
+    # Последний профиль остаётся, его id приходит в ответе
+    assert responses[-1]["X-Profile-Id"] == f"{route}/{profiles[route][-1].name}"
+    assert "X-Profile-Id" not in client.get("/api/v1/employees/")
+
+
+def _profile(count: int) -> cProfile.Profile:
+    profiler = cProfile.Profile()
+    profiler.runcall(sorted, range(count))
+    return profiler
+
+
+def test_profiles_command(settings, tmp_path):
+    """Test list and show aggregate the stored profiles of a route."""
+    settings.PROFILING_DIR = str(tmp_path)
+    for count in (10, 20, 30):
+        store_profile(_profile(count), tmp_path, "get_employees_list_handler", keep=10)
+
+    listed = StringIO()
+    call_command("profiles", "list", stdout=listed)
+    shown = StringIO()
+    call_command("profiles", "show", "get_employees_list_handler", "--last", "2", stdout=shown)
+
+    assert "get_employees_list_handler" in listed.getvalue()
+    assert "3 profiles" in listed.getvalue()
+    assert "aggregated 2 profiles" in shown.getvalue()
+    # Вызовы sorted из двух последних профилей сложены в одну строку
+    assert re.search(r"^\s+2\s.*builtins\.sorted", shown.getvalue(), re.MULTILINE)
+
+    with pytest.raises(CommandError):
+        call_command("profiles", "show", "missing_route", stdout=StringIO())
@@ -0,0 +1,111 @@
+"""Test primary/replica routing.
+
+1. Test catalog reads go to the replica and still see the data
+2. Test reads stay on the primary without a configured replica
+3. Test writes and pinned contexts read from the primary
+4. Test writes set the read-your-writes cookie
+
+"""
+
+from django.conf import settings as django_settings
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+import pytest
+from tests.factories.employee import EmployeeModelFactory
+
+from core.api.middlewares import (
+    PRIMARY_COOKIE,
+    PrimaryPinningMiddleware,
+)
+from core.apps.common.routers import (
+    is_pinned_to_primary,
+    pin_to_primary,
+    PrimaryReplicaRouter,
+    use_primary,
+)
+from core.apps.employee.filters import EmployeeFilters
+from core.apps.employee.models import EmployeeModel
+from core.apps.employee.services import ORMEmployeeService
+
+
+@pytest.fixture
+def replica():
+    yield connections["replica"]
+    # Пул зеркала не закрывается тестовым раннером и мешает удалить тестовую базу
+    connections["replica"].close()
+    if connections["replica"].vendor == "postgresql":
+        connections["replica"].close_pool()
+
+
+# Зеркало работает через своё соединение и не видит незакоммиченных данных теста
+@pytest.mark.skipif(
+    "replica" not in django_settings.DATABASES,
+    reason="POSTGRES_REPLICA_HOST is not set",
+)
+@pytest.mark.django_db(transaction=True, databases=["default", "replica"])
+def test_reads_go_to_replica(replica):
+    """Test catalog reads are routed to the replica alias."""
+    router = PrimaryReplicaRouter()
+    EmployeeModelFactory.create_batch(size=2)
+
+    with use_primary(pinned=False):
+        assert router.db_for_read(EmployeeModel) == "replica"
+        assert ORMEmployeeService().get_employee_count(EmployeeFilters()) == 2
+
+    # У реплики свой пул: общий словарь параметров открыл бы его к основной базе
+    assert (
+        django_settings.DATABASES["replica"]["OPTIONS"]
+        is not django_settings.DATABASES["default"]["OPTIONS"]
+    )
+
+
+def test_reads_without_replica(settings):
+    """Test an unconfigured replica alias leaves every read on the primary."""
+    settings.DATABASE_REPLICA_ALIAS = "no-replica"
+    router = PrimaryReplicaRouter()
+
+    with use_primary(pinned=False):
+        assert router.db_for_read(EmployeeModel) == "default"
+        assert router.allow_migrate("default", "employee")
+
+
+def test_writes_pin_to_primary():
+    """Test writes go to the primary and pin following reads to it."""
+    router = PrimaryReplicaRouter()
+
+    with use_primary(pinned=False):
+        assert router.db_for_write(EmployeeModel) == "default"
+        assert is_pinned_to_primary()
+        assert router.db_for_read(EmployeeModel) == "default"
+
+    with use_primary():
+        assert router.db_for_read(EmployeeModel) == "default"
+
+
+def test_write_sets_primary_cookie(settings):
+    """Test requests that write get the sticky cookie and sticky clients
+    read from the primary."""
+    settings.DATABASE_PRIMARY_STICKY_SECONDS = 5
+    seen = []
+
+    def view(request):
+        seen.append(is_pinned_to_primary())
+        if request.path.endswith("/auth"):
+            pin_to_primary()
+        return HttpResponse()
+
+    middleware = PrimaryPinningMiddleware(view)
+    factory = RequestFactory()
+
+    with use_primary(pinned=False):
+        read_response = middleware(factory.post("/api/v1/employees/batch"))
+        write_response = middleware(factory.post("/api/v1/customers/auth"))
+        sticky_request = factory.get("/api/v1/employees/")
+        sticky_request.COOKIES[PRIMARY_COOKIE] = "1"
+        middleware(sticky_request)
+
+    assert seen == [False, False, True]
+    assert PRIMARY_COOKIE not in read_response.cookies
+    assert write_response.cookies[PRIMARY_COOKIE]["max-age"] == 5
@@ -0,0 +1,62 @@
+"""Test single-flight call coalescing.
+
+1. Test concurrent calls with one key run the function once
+2. Test followers get the leader's exception and later calls run again
+
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core.apps.common.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_result():
+    """Test callers arriving during a call wait for it."""
+    single_flight = SingleFlight(name="test")
+    calls = []
+    started = threading.Event()
+
+    def query():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return [1, 2, 3]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        leader = executor.submit(single_flight.do, "page", query)
+        started.wait()
+        followers = [executor.submit(single_flight.do, "page", query) for _ in range(7)]
+        other = executor.submit(single_flight.do, "other", lambda: [])
+
+        results = [future.result() for future in [leader, *followers]]
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert other.result() == []
+    assert len(single_flight) == 0
+
+
+def test_error_shared_and_not_kept():
+    """Test an exception reaches all waiting callers only once."""
+    single_flight = SingleFlight(name="test")
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError("timeout")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(single_flight.do, "count", failing)
+        started.wait()
+        follower = executor.submit(single_flight.do, "count", failing)
+
+        for future in (leader, follower):
+            with pytest.raises(RuntimeError):
+                future.result()
+
+    assert single_flight.do("count", lambda: 5) == 5
@@ -0,0 +1,55 @@
+"""Test slow query recorder.
+
+1. Test slow statements are logged with origin, params and plan
+2. Test statement shapes are normalized for grouping
+
+"""
+
+from django.db import connection
+
+import pytest
+from tests.factories.employee import EmployeeModelFactory
+
+from core.apps.common.slow_queries import (
+    configure_slow_query_log,
+    logger,
+    normalize_sql,
+    read_entries,
+    SlowQueryRecorder,
+)
+from core.apps.employee.filters import EmployeeFilters
+from core.apps.employee.services import ORMEmployeeService
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    handlers = logger.handlers
+    path = tmp_path / "slow_queries.log"
+    configure_slow_query_log(path, max_bytes=1024 * 1024, backup_count=1)
+    yield path
+    logger.handlers = handlers
+
+
+@pytest.mark.django_db
+def test_slow_query_logged_with_origin(log_path):
+    """Test statements over the threshold are logged."""
+    EmployeeModelFactory.create_batch(size=3)
+    recorder = SlowQueryRecorder(threshold_ms=0)
+
+    with connection.execute_wrapper(recorder):
+        ORMEmployeeService().get_employee_count(EmployeeFilters(search="Иван"))
+
+    entries = read_entries(log_path)
+
+    assert len(entries) == 1, f"{entries=}"
+    assert entries[0]["origin"].endswith("ORMEmployeeService.get_employee_count")
+    assert "%Иван%" in entries[0]["params"]
+    if connection.vendor == "postgresql":
+        assert entries[0]["plan"][0]["Plan"]["Node Type"] == "Aggregate"
+
+
+def test_normalize_sql():
+    """Test IN lists of different length have the same shape."""
+    assert normalize_sql("WHERE id IN (%s, %s, %s)") == normalize_sql(
+        "WHERE id IN (%s, %s)"
+    )
@@ -0,0 +1,21 @@
+from django.core.cache import caches
+
+import pytest
+
+from core.apps.common.routers import use_primary
+
+
+@pytest.fixture(autouse=True)
+def read_from_primary():
+    # Зеркало реплики не видит транзакцию теста. Без этого закрепление за
+    # основной базой протекало бы из теста в тест через контекст потока
+    with use_primary():
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Кеши переживают откат транзакции теста: страницы сотрудников, rate limit
+    yield
+    for cache in caches.all():
+        cache.clear()
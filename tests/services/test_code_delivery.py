@@ -0,0 +1,153 @@
+"""Test queued auth code delivery.
+
+1. Test queued codes are delivered in one gateway batch
+2. Test failed deliveries are retried with backoff and then given up
+3. Test enqueue is rejected when the queue is full
+4. Test finished deliveries drop the code and are purged after retention
+5. Test a lease that runs out counts as an attempt, up to giving up
+6. Test a new code supersedes the one still waiting for the same phone
+
+"""
+
+from datetime import timedelta
+
+from django.utils import timezone
+
+import pytest
+
+from core.apps.customers.entities import CustomerEntity
+from core.apps.customers.exceptions.delivery import CodeDeliveryQueueFullException
+from core.apps.customers.models import CodeDeliveryModel
+from core.apps.customers.services.delivery import (
+    CodeDeliveryQueue,
+    CodeDeliveryWorkerPool,
+)
+from core.apps.customers.services.gateways import (
+    BaseSmsGateway,
+    CodeMessage,
+)
+from core.apps.customers.services.sender import QueuedSendService
+
+
+class RecordingGateway(BaseSmsGateway):
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.batches: list[list[CodeMessage]] = []
+
+    def send_batch(self, messages: list[CodeMessage]) -> list[bool]:
+        self.batches.append(messages)
+        if self.fail:
+            raise ConnectionError("gateway is down")
+        return [True] * len(messages)
+
+
+def make_customer(phone: str) -> CustomerEntity:
+    now = timezone.now()
+    return CustomerEntity(
+        id=1, username="", phone=phone, created_at=now, updated_at=now
+    )
+
+
+@pytest.mark.django_db
+def test_codes_delivered_in_batch():
+    """Test send_code only enqueues and the worker delivers a batch."""
+    gateway = RecordingGateway()
+    queue = CodeDeliveryQueue()
+    pool = CodeDeliveryWorkerPool(queue=queue, gateway=gateway, batch_size=10)
+    sender = QueuedSendService(queue=queue)
+
+    for number in range(3):
+        sender.send_code("1234", make_customer(f"+7999000000{number}"))
+
+    assert gateway.batches == []
+    assert pool.run_once() == 3
+    assert len(gateway.batches) == 1
+    assert (
+        CodeDeliveryModel.objects.filter(status=CodeDeliveryModel.STATUS_SENT).count()
+        == 3
+    )
+    assert pool.run_once() == 0
+
+
+@pytest.mark.django_db
+def test_failed_delivery_retried_then_given_up():
+    """Test gateway errors reschedule messages until max attempts."""
+    gateway = RecordingGateway(fail=True)
+    queue = CodeDeliveryQueue(max_attempts=2, retry_backoff=0)
+    pool = CodeDeliveryWorkerPool(queue=queue, gateway=gateway)
+    queue.enqueue("+79990000010", "1234")
+
+    assert pool.run_once() == 1
+    delivery = CodeDeliveryModel.objects.get()
+    assert delivery.status == CodeDeliveryModel.STATUS_PENDING
+    assert delivery.attempts == 1
+    assert "gateway is down" in delivery.last_error
+
+    assert pool.run_once() == 1
+    delivery.refresh_from_db()
+    assert delivery.status == CodeDeliveryModel.STATUS_FAILED
+    assert pool.run_once() == 0
+
+
+@pytest.mark.django_db
+def test_enqueue_rejected_when_full():
+    """Test backpressure once max_pending codes are waiting."""
+    queue = CodeDeliveryQueue(max_pending=2)
+    queue.enqueue("+79990000020", "1234")
+    queue.enqueue("+79990000021", "1234")
+
+    with pytest.raises(CodeDeliveryQueueFullException):
+        queue.enqueue("+79990000022", "1234")
+
+    assert CodeDeliveryModel.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_finished_deliveries_purged():
+    """Test sent rows keep no code and only old finished rows are purged."""
+    queue = CodeDeliveryQueue(retention=timedelta(hours=1))
+    pool = CodeDeliveryWorkerPool(queue=queue, gateway=RecordingGateway())
+    queue.enqueue("+79990000040", "1234")
+    pool.run_once()
+    queue.enqueue("+79990000041", "1234")
+
+    sent = CodeDeliveryModel.objects.get(status=CodeDeliveryModel.STATUS_SENT)
+    assert sent.code == ""
+    assert queue.purge_finished() == 0
+
+    CodeDeliveryModel.objects.update(updated_at=timezone.now() - timedelta(hours=2))
+
+    assert queue.purge_finished() == 1
+    assert CodeDeliveryModel.objects.get().status == CodeDeliveryModel.STATUS_PENDING
+
+
+@pytest.mark.django_db
+def test_expired_lease_counts_as_attempt():
+    """Test a message whose worker never reports back ends up failed."""
+    queue = CodeDeliveryQueue(max_attempts=2, lease_seconds=0)
+    queue.enqueue("+79990000050", "1234")
+
+    # Воркер забирает сообщение и падает, не отчитавшись: аренда истекает
+    assert [message.attempts for message in queue.claim(10)] == [1]
+    assert [message.attempts for message in queue.claim(10)] == [2]
+    assert queue.claim(10) == []
+
+    delivery = CodeDeliveryModel.objects.get()
+    assert delivery.status == CodeDeliveryModel.STATUS_FAILED
+    assert delivery.attempts == 2
+    assert delivery.code == ""
+    assert delivery.last_error == "Lease expired"
+
+
+@pytest.mark.django_db
+def test_new_code_supersedes_pending():
+    """Test only the latest code of a phone is sent."""
+    queue = CodeDeliveryQueue()
+    queue.enqueue("+79990000060", "1111")
+    queue.enqueue("+79990000061", "2222")
+    queue.enqueue("+79990000060", "3333")
+
+    assert sorted(message.code for message in queue.claim(10)) == ["2222", "3333"]
+    superseded = CodeDeliveryModel.objects.get(status=CodeDeliveryModel.STATUS_FAILED)
+    assert superseded.code == ""
+    assert superseded.last_error == "Superseded by a newer code"
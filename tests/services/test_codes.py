@@ -0,0 +1,100 @@
+"""Test shared auth code store.
+
+1. Test a code can be used only once
+2. Test wrong guesses are counted and block the phone after the limit,
+   a new code does not reset them until the window is over
+3. Test codes requested per phone are capped within the window
+4. Test expired codes are rejected and purged after the window
+
+"""
+
+from django.utils import timezone
+
+import pytest
+
+from core.apps.customers.entities import CustomerEntity
+from core.apps.customers.exceptions.codes import (
+    CodeAttemptsExceededException,
+    CodeNotFoundException,
+    CodeRequestsExceededException,
+    CodesNotEqualException,
+)
+from core.apps.customers.models import AuthCodeModel
+from core.apps.customers.services.codes import DatabaseCodeService
+
+
+def make_customer(phone: str) -> CustomerEntity:
+    now = timezone.now()
+    return CustomerEntity(
+        id=1, username="", phone=phone, created_at=now, updated_at=now
+    )
+
+
+@pytest.mark.django_db
+def test_code_used_once(django_assert_num_queries):
+    """Test a valid code is consumed by one statement."""
+    service = DatabaseCodeService()
+    code = service.generate_code(make_customer("+79990000030"))
+
+    with django_assert_num_queries(1):
+        service.validate_code(code, "+79990000030")
+
+    with pytest.raises(CodeNotFoundException):
+        service.validate_code(code, "+79990000030")
+
+
+@pytest.mark.django_db
+def test_code_attempts_limited():
+    """Test brute force is stopped even when the right code comes later."""
+    service = DatabaseCodeService(max_attempts=2)
+    code = service.generate_code(make_customer("+79990000031"))
+    wrong_code = "0000" if code != "0000" else "0001"
+
+    for _ in range(2):
+        with pytest.raises(CodesNotEqualException):
+            service.validate_code(wrong_code, "+79990000031")
+
+    with pytest.raises(CodeAttemptsExceededException):
+        service.validate_code(code, "+79990000031")
+
+    # Новый код в том же окне попыток не добавляет
+    code = service.generate_code(make_customer("+79990000031"))
+    with pytest.raises(CodeAttemptsExceededException):
+        service.validate_code(code, "+79990000031")
+
+    # Окно закончилось: счётчики с нуля
+    service.window = 0
+    code = service.generate_code(make_customer("+79990000031"))
+    service.validate_code(code, "+79990000031")
+
+
+@pytest.mark.django_db
+def test_code_requests_limited():
+    """Test a phone gets at most max_requests codes per window."""
+    service = DatabaseCodeService(max_requests=2)
+    customer = make_customer("+79990000033")
+
+    service.generate_code(customer)
+    code = service.generate_code(customer)
+
+    with pytest.raises(CodeRequestsExceededException):
+        service.generate_code(customer)
+
+    # Отказ не трогает уже выданный код
+    service.validate_code(code, customer.phone)
+
+
+@pytest.mark.django_db
+def test_expired_code_rejected_and_purged():
+    """Test codes past their TTL cannot be used."""
+    service = DatabaseCodeService(ttl=0)
+    code = service.generate_code(make_customer("+79990000032"))
+
+    with pytest.raises(CodeNotFoundException):
+        service.validate_code(code, "+79990000032")
+
+    # Счётчики окна хранятся до его конца
+    assert service.purge_expired() == 0
+    service.window = 0
+    assert service.purge_expired() == 1
+    assert not AuthCodeModel.objects.exists()
@@ -0,0 +1,149 @@
+"""Test customer services.
+
+1. Test cached token lookup issues no queries on a hit
+2. Test token rotation invalidates the cached token immediately, even after
+   the cache has cycled through other entries
+3. Test token cache is bounded and entries expire
+4. Test upsert and token rotation take one statement each
+5. Test only the token digest is stored
+
+"""
+
+import pytest
+
+from core.apps.common.cache import TTLCache
+from core.apps.customers.exceptions.customer import (
+    CustomerNotFoundException,
+    CustomerTokenInvalidException,
+)
+from core.apps.customers.models import (
+    CustomerModel,
+    hash_token,
+)
+from core.apps.customers.services.customers import (
+    CachedCustomerService,
+    ORMCustomerService,
+)
+
+
+@pytest.fixture
+def cached_customer_service() -> CachedCustomerService:
+    return CachedCustomerService(
+        customer_service=ORMCustomerService(),
+        cache=TTLCache(name="test_customer_tokens", maxsize=100, ttl=60),
+    )
+
+
+@pytest.mark.django_db
+def test_get_by_token_cache_hit(
+    cached_customer_service: CachedCustomerService,
+    django_assert_num_queries,
+):
+    """Test repeated token lookups are served from the cache."""
+    customer = cached_customer_service.get_or_create("+79990000001")
+    token = cached_customer_service.generate_token(customer.phone)
+
+    with django_assert_num_queries(1):
+        cached_customer_service.get_by_token(token)
+
+    with django_assert_num_queries(0):
+        cached = cached_customer_service.get_by_token(token)
+
+    assert cached.phone == customer.phone
+
+
+@pytest.mark.django_db
+def test_generate_token_invalidates_cache(
+    cached_customer_service: CachedCustomerService,
+):
+    """Test old token stops working right after rotation."""
+    customer = cached_customer_service.get_or_create("+79990000002")
+    old_token = cached_customer_service.generate_token(customer.phone)
+    cached_customer_service.get_by_token(old_token)
+
+    new_token = cached_customer_service.generate_token(customer.phone)
+
+    with pytest.raises(CustomerTokenInvalidException):
+        cached_customer_service.get_by_token(old_token)
+    assert cached_customer_service.get_by_token(new_token).phone == customer.phone
+
+
+@pytest.mark.django_db
+def test_generate_token_invalidates_busy_cache():
+    """Test a token in constant use keeps its index through LRU eviction."""
+    service = CachedCustomerService(
+        customer_service=ORMCustomerService(),
+        cache=TTLCache(name="test_customer_tokens_lru", maxsize=4, ttl=60),
+    )
+    phones = ("+79990000011", "+79990000012", "+79990000013")
+    tokens = []
+    for phone in phones:
+        service.get_or_create(phone)
+        tokens.append(service.generate_token(phone))
+
+    # Первый токен используется постоянно, остальные вытесняют всё, к чему
+    # давно не обращались
+    service.get_by_token(tokens[0])
+    for token in tokens[1:] * 2:
+        service.get_by_token(tokens[0])
+        service.get_by_token(token)
+
+    service.generate_token(phones[0])
+
+    with pytest.raises(CustomerTokenInvalidException):
+        service.get_by_token(tokens[0])
+
+
+def test_ttl_cache_bounded_and_expiring():
+    """Test least recently used entries are evicted and expired ones
+    dropped."""
+    cache = TTLCache(name="test", maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+    cache.set("d", 4, ttl=0)
+    assert cache.get("d") is None
+    assert len(cache) == 1
+
+
+@pytest.mark.django_db
+def test_upsert_and_rotate_single_statement(django_assert_num_queries):
+    """Test get_or_create and generate_token issue one query each."""
+    service = ORMCustomerService()
+
+    with django_assert_num_queries(1):
+        created = service.get_or_create("+79990000003")
+    with django_assert_num_queries(1):
+        existing = service.get_or_create("+79990000003")
+    with django_assert_num_queries(1):
+        token = service.generate_token("+79990000003")
+
+    assert existing.id == created.id
+    assert existing.created_at == created.created_at
+    assert bytes(CustomerModel.objects.get(phone="+79990000003").token_hash) == (
+        hash_token(token)
+    )
+
+    with pytest.raises(CustomerNotFoundException):
+        service.generate_token("+79990000004")
+
+
+@pytest.mark.django_db
+def test_token_stored_as_digest():
+    """Test the raw token is not stored and is found by its digest."""
+    service = ORMCustomerService()
+    customer = service.get_or_create("+79990000005")
+    token = service.generate_token(customer.phone)
+
+    token_hash = bytes(CustomerModel.objects.get(phone=customer.phone).token_hash)
+
+    assert len(token_hash) == 32
+    assert service.get_by_token(token).id == customer.id
+    with pytest.raises(CustomerTokenInvalidException):
+        service.get_by_token(token.upper())
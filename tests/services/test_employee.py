@@ -2,6 +2,10 @@
 
 1. Test employees count zero, employee count with existing employees
 2. Test employee returns all/paginated employees, filters
+3. Test ids filter uses one statement shape for any number of ids
+4. Test batch lookup keeps order, marks missing ids and batches managers
+5. Test includes load managers and limited subordinates with a fixed query count
+6. Test the list and the count of one request build the predicate once
 
 """
 
@@ -10,15 +14,24 @@ from datetime import (
     timedelta,
 )
 
+from django.db import connection
 from django.utils import timezone
 
 import pytest
 from tests.factories.employee import EmployeeModelFactory
 
 from core.api.filters import PaginationIn
-from core.apps.employee.filters import EmployeeFilters
+from core.apps.employee.filters import (
+    EmployeeFilters,
+    EmployeeIncludes,
+)
+from core.apps.employee.filters.compiler import FILTER_LOOKUPS
 from core.apps.employee.models import EmployeeModel
-from core.apps.employee.services import BaseEmployeeService
+from core.apps.employee.services import (
+    BaseEmployeeService,
+    ORMEmployeeService,
+)
+from core.apps.employee.services.loader import EmployeeLoader
 
 
 @pytest.mark.django_db
@@ -592,3 +605,137 @@ def test_get_employees_filter_combined(employee_service: BaseEmployeeService):
     assert employee2.id not in fetched_employees_ids
     assert employee3.id not in fetched_employees_ids
     assert len(fetched_employees_ids) == 1
+
+
+@pytest.mark.django_db
+def test_get_employees_filter_by_ids_query_shape(employee_service: BaseEmployeeService):
+    """Test ids filter returns only requested employees with one query
+    shape for any number of ids."""
+    employees = EmployeeModelFactory.create_batch(size=4)
+
+    statements = []
+
+    def capture(execute, sql, params, many, context):
+        statements.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(capture):
+        fetched_pair = employee_service.get_employee_list(
+            EmployeeFilters(ids=[employees[0].id, employees[1].id]),
+            PaginationIn(),
+        )
+        fetched_triple = employee_service.get_employee_list(
+            EmployeeFilters(ids=[employee.id for employee in employees[1:]]),
+            PaginationIn(),
+        )
+
+    assert {employee.id for employee in fetched_pair} == {
+        employees[0].id,
+        employees[1].id,
+    }
+    assert {employee.id for employee in fetched_triple} == {
+        employee.id for employee in employees[1:]
+    }
+    if connection.vendor == "postgresql":
+        assert statements[0] == statements[1], statements
+
+    assert employee_service.get_employee_count(EmployeeFilters(ids=[])) == 0
+
+
+@pytest.mark.django_db
+def test_get_employees_by_ids_order_and_missing(
+    employee_service: BaseEmployeeService,
+    django_assert_num_queries,
+):
+    """Test batch lookup returns employees in requested order with missing
+    ids as None and managers loaded in one extra query."""
+    director = EmployeeModelFactory()
+    managers = EmployeeModelFactory.create_batch(size=2, manager=director)
+    employees = [EmployeeModelFactory(manager=manager) for manager in managers]
+    missing_id = max(employee.id for employee in employees) + 100
+    ids = [employees[1].id, missing_id, employees[0].id, employees[1].id]
+
+    # Сотрудники, затем начальники, затем директор - по запросу на уровень
+    with django_assert_num_queries(3):
+        fetched = employee_service.get_employees_by_ids(ids)
+
+    assert [employee.id if employee else None for employee in fetched] == [
+        employees[1].id,
+        None,
+        employees[0].id,
+        employees[1].id,
+    ]
+    assert fetched[0].manager.id == managers[1].id
+    assert fetched[0].manager.manager.id == director.id
+    assert fetched[2].manager_id == managers[0].id
+
+
+@pytest.mark.django_db
+def test_get_employees_by_ids_chunked(django_assert_num_queries):
+    """Test large id lists are split into chunks and reused rows are not
+    queried again."""
+    employees = EmployeeModelFactory.create_batch(size=5)
+    ids = [employee.id for employee in employees]
+    service = ORMEmployeeService(loader=EmployeeLoader(chunk_size=2))
+
+    with django_assert_num_queries(3):
+        fetched = service.get_employees_by_ids(ids)
+
+    with django_assert_num_queries(0):
+        service.get_employees_by_ids(list(reversed(ids)))
+
+    assert [employee.id for employee in fetched] == ids
+
+
+@pytest.mark.django_db
+def test_get_employees_with_includes(
+    employee_service: BaseEmployeeService,
+    django_assert_num_queries,
+    settings,
+):
+    """Test include=manager,subordinates does not depend on page size."""
+    settings.EMPLOYEE_SUBORDINATES_LIMIT = 2
+    managers = EmployeeModelFactory.create_batch(size=3)
+    for manager in managers:
+        EmployeeModelFactory.create_batch(size=3, manager=manager)
+
+    includes = EmployeeIncludes(include=["manager,subordinates"])
+    assert includes.manager and includes.subordinates
+
+    for limit in (2, 12):
+        with django_assert_num_queries(2):
+            fetched = employee_service.get_employee_list(
+                EmployeeFilters(),
+                PaginationIn(limit=limit),
+                includes=includes,
+            )
+
+        assert len(fetched) == limit
+
+    by_id = {employee.id: employee for employee in fetched}
+    for manager in managers:
+        assert len(by_id[manager.id].subordinates) == 2
+        subordinate = by_id[by_id[manager.id].subordinates[0].id]
+        assert subordinate.manager.id == manager.id
+        assert subordinate.subordinates == []
+
+
+@pytest.mark.django_db
+def test_predicate_built_once(employee_service: BaseEmployeeService, monkeypatch):
+    """Test list and count reuse the predicate of the same filters."""
+    EmployeeModelFactory.create_batch(size=2, last_name="Иванов")
+    lookup = FILTER_LOOKUPS["last_name"]
+    built = []
+
+    def counting_lookup(value):
+        built.append(value)
+        return lookup(value)
+
+    monkeypatch.setitem(FILTER_LOOKUPS, "last_name", counting_lookup)
+    filters = EmployeeFilters(last_name="иванов")
+
+    employees = employee_service.get_employee_list(filters, PaginationIn())
+    count = employee_service.get_employee_count(filters)
+
+    assert len(employees) == count == 2
+    assert built == ["иванов"]
@@ -0,0 +1,234 @@
+"""Test the employee cache and its warm-up.
+
+1. Test repeated list and count calls are served from the cache
+2. Test invalidation makes every cached page a miss, even once the
+   generation counter is evicted
+3. Test reads pinned to the primary after a write skip the cache
+4. Test the warmer fills the hot pages and the tree roots from the primary
+5. Test a process waits for the result of another holding the miss lock
+6. Test notifications reset a process-local cache but leave a shared one
+
+"""
+
+import threading
+
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+
+import pytest
+from tests.factories.employee import EmployeeModelFactory
+
+from core.api.filters import PaginationIn
+from core.apps.common.routers import (
+    is_pinned_to_primary,
+    use_primary,
+)
+from core.apps.employee.filters import (
+    EmployeeFilters,
+    EmployeeIncludes,
+)
+from core.apps.employee.services import (
+    BaseEmployeeService,
+    CachedEmployeeService,
+    ORMEmployeeService,
+)
+from core.apps.employee.services.employee import EMPLOYEE_CACHE_GENERATION_KEY
+from core.apps.employee.services.warmup import EmployeeCacheWarmer
+from core.apps.employee.signals import invalidate_employee_cache_by_ids
+
+
+@pytest.fixture
+def cached_employee_service(settings) -> CachedEmployeeService:
+    # Закреплённые за основной базой чтения идут мимо кеша, а зеркало реплики
+    # не видит транзакцию теста: без реплики незакреплённые чтения идут в default
+    settings.DATABASE_REPLICA_ALIAS = "no-replica"
+    # Хранилище locmem общее для экземпляров с одним именем: чистим между тестами
+    cache = LocMemCache("test-employees", {})
+    cache.clear()
+    return CachedEmployeeService(
+        employee_service=ORMEmployeeService(),
+        cache=cache,
+    )
+
+
+@pytest.mark.django_db
+def test_cached_list_and_count(
+    cached_employee_service: CachedEmployeeService,
+    django_assert_num_queries,
+):
+    """Test identical requests after the first one issue no queries."""
+    EmployeeModelFactory.create_batch(size=3)
+
+    with use_primary(pinned=False), django_assert_num_queries(2):
+        employees = cached_employee_service.get_employee_list(
+            EmployeeFilters(),
+            PaginationIn(),
+        )
+        count = cached_employee_service.get_employee_count(EmployeeFilters())
+
+    with use_primary(pinned=False), django_assert_num_queries(0):
+        cached = cached_employee_service.get_employee_list(
+            EmployeeFilters(),
+            PaginationIn(),
+        )
+        cached_count = cached_employee_service.get_employee_count(EmployeeFilters())
+
+    assert [employee.id for employee in cached] == [
+        employee.id for employee in employees
+    ]
+    assert cached_count == count == 3
+
+
+@pytest.mark.django_db
+def test_cache_invalidate(
+    cached_employee_service: CachedEmployeeService,
+    django_assert_num_queries,
+):
+    """Test a new employee is visible right after invalidation."""
+
+    def count() -> int:
+        with use_primary(pinned=False):
+            return cached_employee_service.get_employee_count(EmployeeFilters())
+
+    EmployeeModelFactory.create_batch(size=2)
+    count()
+
+    EmployeeModelFactory()
+    assert count() == 2
+
+    cached_employee_service.invalidate()
+
+    with django_assert_num_queries(1):
+        assert count() == 3
+
+    # Вытесненный счётчик не возвращает ни одно из прежних поколений
+    EmployeeModelFactory()
+    cached_employee_service.cache.delete(EMPLOYEE_CACHE_GENERATION_KEY)
+    assert count() == 4
+
+
+@pytest.mark.django_db
+def test_pinned_read_skips_cache(cached_employee_service: CachedEmployeeService):
+    """Test a read after a write in the same context sees the write."""
+    EmployeeModelFactory.create_batch(size=2)
+
+    with use_primary(pinned=False):
+        # Страница, прочитанная до записи (как с отстающей реплики)
+        assert cached_employee_service.get_employee_count(EmployeeFilters()) == 2
+        EmployeeModelFactory()
+
+        assert is_pinned_to_primary()
+        assert cached_employee_service.get_employee_count(EmployeeFilters()) == 3
+
+
+@pytest.mark.django_db
+def test_warmer(
+    cached_employee_service: CachedEmployeeService,
+    django_assert_num_queries,
+):
+    """Test warmed pages and roots are served without queries."""
+    root = EmployeeModelFactory()
+    EmployeeModelFactory.create_batch(size=3, manager=root)
+    warmer = EmployeeCacheWarmer(service=cached_employee_service, pages=2, page_size=2)
+
+    assert not warmer.ready
+    with use_primary(pinned=False):
+        assert warmer.warm() == 3
+    assert warmer.ready
+
+    with use_primary(pinned=False), django_assert_num_queries(0):
+        second_page = cached_employee_service.get_employee_list(
+            EmployeeFilters(),
+            PaginationIn(offset=2, limit=2),
+        )
+        roots = cached_employee_service.get_employee_list(
+            EmployeeFilters(has_manager=False),
+            PaginationIn(limit=2),
+            EmployeeIncludes(include=["subordinates"]),
+        )
+
+    assert len(second_page) == 2
+    assert [employee.id for employee in roots] == [root.id]
+    assert len(roots[0].subordinates) == 3
+
+
+class CountingEmployeeService(BaseEmployeeService):
+    def __init__(self):
+        self.counts = 0
+        self.pinned = []
+
+    def get_employee_count(self, filters: EmployeeFilters) -> int:
+        self.counts += 1
+        self.pinned.append(is_pinned_to_primary())
+        return 7
+
+    def get_employee_list(self, filters, pagination, includes=None):
+        return []
+
+    def get_employees_by_ids(self, ids):
+        return [None] * len(ids)
+
+
+def test_warm_reads_primary():
+    """Test the warm-up after a write does not read the lagging replica."""
+    counting_service = CountingEmployeeService()
+    service = CachedEmployeeService(
+        employee_service=counting_service,
+        cache=LocMemCache("test-employees-warm", {}),
+    )
+
+    # Таймер прогрева запускается в новом потоке, без закрепления
+    with use_primary(pinned=False):
+        service.warm(EmployeeFilters(), PaginationIn())
+
+    assert counting_service.pinned == [True]
+
+
+@use_primary(pinned=False)
+def test_cache_lock_waits_for_holder():
+    """Test a miss under someone else's lock reads the holder's result."""
+    counting_service = CountingEmployeeService()
+    service = CachedEmployeeService(
+        employee_service=counting_service,
+        cache=LocMemCache("test-employees-lock", {}),
+        lock_timeout=2,
+        lock_poll_interval=0.01,
+    )
+    key = service._count_key(EmployeeFilters())
+    # Блокировку держит "другой процесс", результат появится позже
+    service.cache.add(f"{key}:lock", 1)
+    threading.Timer(0.1, service.cache.set, args=(key, 42)).start()
+
+    assert service.get_employee_count(EmployeeFilters()) == 42
+    assert counting_service.counts == 0
+
+    service.lock_timeout = 0.05
+    service.cache.clear()
+    service.cache.add(f"{key}:lock", 1)
+
+    assert service.get_employee_count(EmployeeFilters()) == 7
+    assert counting_service.counts == 1
+
+
+def test_notify_resets_local_cache_only(monkeypatch, tmp_path):
+    """Test only a locmem cache gets a new generation from a notification."""
+    local_cache = LocMemCache("test-employees-notify", {})
+    local_cache.clear()
+    # Общий для процессов кеш сбрасывает записавший процесс, а не слушатели
+    shared_cache = FileBasedCache(str(tmp_path), {})
+
+    for cache, reset in ((local_cache, True), (shared_cache, False)):
+        service = CachedEmployeeService(
+            employee_service=CountingEmployeeService(),
+            cache=cache,
+        )
+        warmer = EmployeeCacheWarmer(service=service, rewarm=False)
+        monkeypatch.setattr(
+            "core.apps.employee.signals.get_employee_cache_warmer",
+            lambda: warmer,
+        )
+        generation = service._generation()
+
+        invalidate_employee_cache_by_ids(None)
+
+        assert (service._generation() != generation) is reset
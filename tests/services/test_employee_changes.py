@@ -0,0 +1,130 @@
+"""Test the employee change feed.
+
+1. Test cursors survive an encode/decode round trip and reject garbage
+2. Test the feed pages through every change exactly once, an empty page
+   moves the cursor forward
+3. Test a deletion yields a tombstone and touches the orphaned subordinates
+4. Test a cursor older than the tombstone retention expires
+5. Test changes are held back while an older transaction is still open
+
+"""
+
+from datetime import (
+    datetime,
+    timedelta,
+    timezone,
+)
+
+import pytest
+from django.db import (
+    connections,
+    DEFAULT_DB_ALIAS,
+)
+from tests.factories.employee import EmployeeModelFactory
+
+from core.apps.employee.exceptions.changes import (
+    ChangeCursorExpiredException,
+    ChangeCursorInvalidException,
+)
+from core.apps.employee.services import ORMEmployeeChangesService
+from core.apps.employee.services.changes import ChangeCursor
+
+
+@pytest.fixture
+def changes_service() -> ORMEmployeeChangesService:
+    return ORMEmployeeChangesService(settle_seconds=0)
+
+
+def test_cursor_round_trip():
+    """Test microseconds and id are preserved, malformed input is rejected."""
+    cursor = ChangeCursor(
+        changed_at=datetime(2026, 10, 19, 8, 14, 59, 999999, tzinfo=timezone.utc),
+        id=42,
+    )
+
+    assert ChangeCursor.decode(cursor.encode()) == cursor
+
+    for malformed in ("", "not a cursor", "MQ"):
+        with pytest.raises(ChangeCursorInvalidException):
+            ChangeCursor.decode(malformed)
+
+
+@pytest.mark.django_db
+def test_changes_pages(changes_service: ORMEmployeeChangesService):
+    """Test following cursors returns each employee once, in order."""
+    employees = EmployeeModelFactory.create_batch(size=3)
+
+    first = changes_service.get_changes(cursor=None, limit=2)
+    second = changes_service.get_changes(cursor=first.cursor, limit=2)
+    last = changes_service.get_changes(cursor=second.cursor, limit=2)
+
+    assert first.has_more
+    assert not second.has_more
+    assert [change.id for change in first.items + second.items] == [
+        employee.id for employee in employees
+    ]
+    assert second.items[-1].employee.last_name == employees[-1].last_name
+    # Новых изменений нет: курсор сдвигается к границе отстоявшихся изменений
+    assert last.items == []
+    assert ChangeCursor.decode(last.cursor).changed_at > second.items[-1].changed_at
+
+    hired = EmployeeModelFactory()
+    after_idle = changes_service.get_changes(cursor=last.cursor, limit=2)
+
+    assert [change.id for change in after_idle.items] == [hired.id]
+
+
+@pytest.mark.django_db
+def test_changes_deletion(changes_service: ORMEmployeeChangesService):
+    """Test a deleted manager is reported and the subordinate loses it."""
+    manager = EmployeeModelFactory()
+    subordinate = EmployeeModelFactory(manager=manager)
+    # delete() обнуляет pk у экземпляра
+    manager_id = manager.id
+    manager.delete()
+
+    changes = {
+        change.id: change
+        for change in changes_service.get_changes(cursor=None, limit=10).items
+    }
+
+    assert changes[manager_id].deleted
+    assert changes[manager_id].employee is None
+    assert not changes[subordinate.id].deleted
+    assert changes[subordinate.id].employee.manager_id is None
+
+
+def test_changes_cursor_expired():
+    """Test the feed refuses to resume past purged deletions."""
+    service = ORMEmployeeChangesService(tombstone_retention=timedelta(days=1))
+    cursor = ChangeCursor(
+        changed_at=datetime.now(timezone.utc) - timedelta(days=2),
+        id=1,
+    ).encode()
+
+    with pytest.raises(ChangeCursorExpiredException):
+        service.get_changes(cursor=cursor, limit=10)
+
+
+@pytest.mark.django_db
+def test_changes_wait_for_open_transactions(
+    changes_service: ORMEmployeeChangesService,
+):
+    """Test rows are not delivered past the start of a running transaction."""
+    other = connections.create_connection(DEFAULT_DB_ALIAS)
+    other.set_autocommit(False)
+    try:
+        with other.cursor() as cursor:
+            # Транзакция, начатая раньше записи и ещё не закоммиченная
+            cursor.execute("SELECT 1")
+
+        hired = EmployeeModelFactory()
+        held = changes_service.get_changes(cursor=None, limit=10)
+
+        other.rollback()
+        released = changes_service.get_changes(cursor=None, limit=10)
+    finally:
+        other.close()
+
+    assert held.items == []
+    assert [change.id for change in released.items] == [hired.id]
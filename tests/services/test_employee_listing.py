@@ -0,0 +1,92 @@
+"""Test the materialized employee listing.
+
+1. Test a refresh makes changes visible with depth and flattened manager
+2. Test the listing matches live reads, including relations, in fixed
+   query count
+
+"""
+
+import pytest
+from tests.factories.employee import EmployeeModelFactory
+
+from core.api.filters import PaginationIn
+from core.apps.employee.filters import (
+    EmployeeFilters,
+    EmployeeIncludes,
+)
+from core.apps.employee.models import EmployeeListingModel
+from core.apps.employee.services import (
+    EmployeeListingRefresher,
+    MVEmployeeService,
+    ORMEmployeeService,
+)
+
+
+@pytest.mark.django_db
+def test_refresh_listing():
+    """Test rows appear after a refresh with computed columns."""
+    director = EmployeeModelFactory(middle_name="")
+    manager = EmployeeModelFactory(manager=director)
+    employee = EmployeeModelFactory(manager=manager)
+
+    assert not EmployeeListingModel.objects.filter(id=employee.id).exists()
+    assert EmployeeListingRefresher().refresh()
+
+    rows = EmployeeListingModel.objects.in_bulk([director.id, manager.id, employee.id])
+
+    assert [rows[pk].depth for pk in (director.id, manager.id, employee.id)] == [0, 1, 2]
+    assert rows[director.id].full_name == director.get_full_name()
+    assert rows[employee.id].manager_last_name == manager.last_name
+    assert rows[employee.id].manager_manager_id == director.id
+
+
+@pytest.mark.django_db
+def test_listing_matches_live(django_assert_num_queries):
+    """Test the materialized listing returns what the live service does."""
+    managers = EmployeeModelFactory.create_batch(size=2)
+    for manager in managers:
+        EmployeeModelFactory.create_batch(size=2, manager=manager)
+    EmployeeListingRefresher().refresh()
+
+    includes = EmployeeIncludes(include=["manager,subordinates"])
+    filters = EmployeeFilters(has_manager=False)
+
+    with django_assert_num_queries(2):
+        materialized = MVEmployeeService().get_employee_list(
+            filters,
+            PaginationIn(),
+            includes,
+        )
+    live = ORMEmployeeService().get_employee_list(filters, PaginationIn(), includes)
+
+    def project(entities):
+        # Сравниваем без рекурсии: подчинённый ссылается на начальника
+        return sorted(
+            (
+                entity.id,
+                entity.last_name,
+                entity.salary,
+                entity.manager,
+                [subordinate.id for subordinate in entity.subordinates],
+            )
+            for entity in entities
+        )
+
+    assert MVEmployeeService().get_employee_count(EmployeeFilters()) == 6
+    assert project(materialized) == project(live)
+
+    children = EmployeeFilters(manager_id=managers[0].id)
+    materialized_children = MVEmployeeService().get_employee_list(
+        children,
+        PaginationIn(),
+        includes,
+    )
+    live_children = ORMEmployeeService().get_employee_list(
+        children,
+        PaginationIn(),
+        includes,
+    )
+    # Начальник из плоских колонок строки совпадает с загруженным join-ом
+    assert [entity.manager for entity in materialized_children] == [
+        entity.manager for entity in live_children
+    ]
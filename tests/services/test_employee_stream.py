@@ -0,0 +1,252 @@
+"""Test the employee change stream.
+
+1. Test the in-memory filter predicates agree with the SQL filters
+2. Test subscriptions get compact events for their filters and subtree
+3. Test a subscription that falls behind gets a reset
+4. Test the trigger announces changed fields and the chain of managers,
+   and a reset for a statement over 50 rows
+5. Test the endpoint streams events under ASGI (with profiling on) and
+   refuses WSGI
+
+"""
+
+import asyncio
+import json
+from decimal import Decimal
+
+from django.db import connection
+from django.test import (
+    AsyncClient,
+    Client,
+)
+
+import pytest
+from tests.factories.employee import EmployeeModelFactory
+
+from core.apps.employee.filters import EmployeeFilters
+from core.apps.employee.filters.compiler import (
+    compile_employee_filters,
+    FILTER_LOOKUPS,
+)
+from core.apps.employee.filters.matcher import (
+    FILTER_PREDICATES,
+    match_employee_filters,
+)
+from core.apps.employee.models import EmployeeModel
+from core.apps.employee.services.stream import (
+    EmployeeChangeBroadcaster,
+    EmployeeChangeListener,
+    EmployeeRowChange,
+    get_employee_change_listener,
+)
+
+
+def _row(employee_id: int, manager_id: int | None = None, **fields) -> dict:
+    return {
+        "id": employee_id,
+        "first_name": "Иван",
+        "last_name": "Петров",
+        "middle_name": "Сергеевич",
+        "position": "Инженер",
+        "date_hired": "2020-01-15",
+        "salary": 100000.0,
+        "manager_id": manager_id,
+        "created_at": "2026-10-19T08:00:00+00:00",
+        "updated_at": "2026-10-19T09:00:00+00:00",
+        **fields,
+    }
+
+
+@pytest.mark.django_db
+def test_predicates_match_sql():
+    """Test each filter selects the same employees in Python and in SQL."""
+    assert FILTER_PREDICATES.keys() == FILTER_LOOKUPS.keys()
+
+    manager = EmployeeModelFactory(position="Директор", salary=Decimal("300000"))
+    EmployeeModelFactory.create_batch(size=3, manager=manager)
+    employees = [employee.to_entity() for employee in EmployeeModel.objects.all()]
+
+    for filters in (
+        EmployeeFilters(position="дИрек"),
+        EmployeeFilters(search=manager.last_name[:3]),
+        EmployeeFilters(salary_min=200000),
+        EmployeeFilters(has_manager=False),
+        EmployeeFilters(manager_id=manager.id, ids=[manager.id, employees[-1].id]),
+        EmployeeFilters(date_hired_from=manager.date_hired),
+    ):
+        expected = set(
+            EmployeeModel.objects.filter(
+                compile_employee_filters(filters),
+            ).values_list("id", flat=True),
+        )
+        matched = {
+            employee.id
+            for employee in employees
+            if match_employee_filters(filters, employee)
+        }
+        assert matched == expected, filters
+
+
+def test_subscription_events():
+    """Test events are filtered by subscription and carry only changes."""
+
+    async def scenario():
+        broadcaster = EmployeeChangeBroadcaster()
+        engineers = broadcaster.subscribe(EmployeeFilters(position="инженер"))
+        team = broadcaster.subscribe(EmployeeFilters(), subtree=1)
+
+        broadcaster.publish(
+            [
+                # Повышение: уходит из подписки на инженеров
+                EmployeeRowChange(
+                    op="update",
+                    row=_row(5, manager_id=2, position="Архитектор"),
+                    old={"position": "Инженер"},
+                    ancestors=(2, 1),
+                ),
+                # Перевод в другое подразделение: уходит из поддерева 1
+                EmployeeRowChange(
+                    op="update",
+                    row=_row(6, manager_id=9),
+                    old={"manager_id": 2},
+                    ancestors=(9,),
+                    old_ancestors=(2, 1),
+                ),
+                EmployeeRowChange(op="insert", row=_row(7, manager_id=3), ancestors=(3,)),
+            ],
+        )
+        await asyncio.sleep(0)
+
+        engineer_events = [await engineers.get() for _ in range(3)]
+        team_events = [await team.get() for _ in range(2)]
+        return engineer_events, team_events
+
+    engineer_events, team_events = asyncio.run(scenario())
+
+    promoted, moved, hired = engineer_events
+    assert (promoted.id, promoted.matches) == (5, False)
+    assert promoted.fields == {
+        "position": "Архитектор",
+        "updated_at": "2026-10-19T09:00:00+00:00",
+    }
+    assert (moved.id, moved.manager_id, moved.matches) == (6, 9, True)
+    assert moved.fields.keys() == {"manager_id", "updated_at"}
+    # Новый сотрудник приходит целиком
+    assert hired.event == "insert"
+    assert hired.fields["last_name"] == "Петров"
+
+    assert [(event.id, event.matches) for event in team_events] == [
+        (5, True),
+        (6, False),
+    ]
+
+
+def test_subscription_overflow():
+    """Test a full queue is replaced by a single reset event."""
+
+    async def scenario():
+        broadcaster = EmployeeChangeBroadcaster(queue_size=2)
+        subscription = broadcaster.subscribe(EmployeeFilters())
+
+        broadcaster.publish(
+            [
+                EmployeeRowChange(op="insert", row=_row(employee_id), ancestors=())
+                for employee_id in range(1, 4)
+            ],
+        )
+        await asyncio.sleep(0)
+
+        return await subscription.get(), subscription._queue.qsize()
+
+    event, left = asyncio.run(scenario())
+
+    assert event.event == "reset"
+    assert left == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_trigger_changes():
+    """Test updates report changed fields with old values and ancestors."""
+    director = EmployeeModelFactory()
+    manager = EmployeeModelFactory(manager=director)
+    employee = EmployeeModelFactory(manager=manager)
+    received = []
+    listener = EmployeeChangeListener(using=connection.alias)
+    listener.broadcaster.publish = received.append
+
+    with listener.connect() as notifications:
+        EmployeeModel.objects.filter(id=employee.id).update(position="Архитектор")
+        EmployeeModel.objects.filter(id=employee.id).update(manager=director)
+        EmployeeModel.objects.filter(id=employee.id).delete()
+
+        for notify in notifications.notifies(timeout=2, stop_after=3):
+            listener.dispatch(notify.payload)
+
+    promoted, moved, deleted = (changes[0] for changes in received)
+
+    assert promoted.old == {"position": employee.position}
+    assert promoted.row["position"] == "Архитектор"
+    assert promoted.ancestors == (manager.id, director.id)
+    assert promoted.old_ancestors is None
+    assert moved.old == {"manager_id": manager.id}
+    assert moved.ancestors == (director.id,)
+    assert moved.old_ancestors == (manager.id, director.id)
+    assert deleted.op == "delete"
+    assert deleted.row["id"] == employee.id
+
+
+@pytest.mark.django_db(transaction=True)
+def test_trigger_bulk_reset():
+    """Test a bulk statement sends a single reset instead of row events."""
+    EmployeeModelFactory.create_batch(size=51)
+    received = []
+    listener = EmployeeChangeListener(using=connection.alias)
+    listener.broadcaster.publish = received.append
+
+    with listener.connect() as notifications:
+        EmployeeModel.objects.update(position="Архитектор")
+
+        for notify in notifications.notifies(timeout=2, stop_after=1):
+            listener.dispatch(notify.payload)
+
+    assert received == [None]
+
+
+def test_stream_endpoint(settings, tmp_path):
+    """Test published changes reach an ASGI client as SSE frames."""
+    settings.INVALIDATION_BUS_ENABLED = False
+    # Профилирование каждого запроса не должно ломать асинхронный хендлер
+    settings.PROFILING_ENABLED = True
+    settings.PROFILING_SAMPLE_RATE = 1
+    settings.PROFILING_DIR = str(tmp_path)
+    broadcaster = get_employee_change_listener().broadcaster
+
+    async def scenario():
+        response = await AsyncClient().get(
+            "/api/v1/employees/stream",
+            {"position": "инженер"},
+        )
+        stream = aiter(response.streaming_content)
+        first = asyncio.ensure_future(anext(stream))
+        # Подписка появляется с первым чтением потока
+        while not len(broadcaster):
+            await asyncio.sleep(0.01)
+
+        broadcaster.publish(
+            [EmployeeRowChange(op="insert", row=_row(42), ancestors=())],
+        )
+        frame = await asyncio.wait_for(first, timeout=2)
+        await stream.aclose()
+        return response, frame
+
+    response, frame = asyncio.run(scenario())
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "text/event-stream"
+    event, data = frame.decode().strip().split("\n")
+    assert event == "event: insert"
+    assert json.loads(data.removeprefix("data: "))["id"] == 42
+    assert not len(broadcaster)
+
+    assert Client().get("/api/v1/employees/stream").status_code == 501
+    assert not any(tmp_path.iterdir())